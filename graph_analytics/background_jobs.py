@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Background Job Runner
+Runs long explorer operations on a bounded worker pool with progress reporting and cooperative
+cancellation, so a slow request never holds a request thread and an abandoned one stops early
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = 4
+MAX_PENDING_JOBS = 16  # Jobs queued or running before new submissions are refused
+POLL_INTERVAL = 0.25  # Seconds between progress updates streamed to a waiting caller
+
+class JobCancelled(Exception):
+    """Raised inside a job at its next progress report once it has been cancelled"""
+
+class QueueFull(Exception):
+    """Raised by JobRunner.submit when MAX_PENDING_JOBS jobs are already queued or running"""
+
+class Job:
+    """Handle for one submitted operation: progress, outcome and cancellation"""
+
+    def __init__(self, name):
+        self.name = name
+        self.progress = 0.0
+        self.message = 'Queued'
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.finished = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.submitted
+
+    def cancel(self):
+        """Ask the job to stop; it raises JobCancelled at its next report (no-op once finished)"""
+        if not self.done:
+            self._cancelled.set()
+
+    def report(self, fraction, message):
+        """Called by the running operation: record progress, and stop here if cancelled"""
+        if self.cancelled:
+            raise JobCancelled(self.name)
+        self.progress = min(max(fraction, 0.0), 1.0)
+        self.message = message
+
+    def updates(self, interval=POLL_INTERVAL):
+        """Yield (progress, message) whenever they change, until the job finishes"""
+        last = None
+        while not self._done.wait(interval):
+            state = (self.progress, self.message)
+            if state != last:
+                last = state
+                yield state
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns its result, raising its error if it failed"""
+        self._done.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+def report(job, fraction, message):
+    """Job.report for operations that may also run without a job (job=None)"""
+    if job is not None:
+        job.report(fraction, message)
+
+class JobRunner:
+    """
+    Thread pool for jobs fn(*args, job=job) with a bounded backlog
+    Jobs submitted under a slot (e.g. one session's graph view) supersede each other: a new job
+    cancels the slot's previous one, so abandoned requests stop instead of finishing unseen
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='explorer-job')
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._slots = {}  # slot -> its latest job
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, name='job', slot=None, **kwargs):
+        if not self._pending.acquire(blocking=False):
+            raise QueueFull(f"{name}: job queue is full")
+        job = Job(name)
+        if slot is not None:
+            with self._lock:
+                previous = self._slots.get(slot)
+                self._slots[slot] = job
+            if previous is not None:
+                previous.cancel()
+
+        def run():
+            try:
+                if job.cancelled:
+                    raise JobCancelled(name)
+                job.message = 'Running'
+                job.result = fn(*args, job=job, **kwargs)
+                job.progress = 1.0
+            except JobCancelled:
+                pass
+            except Exception as e:
+                job.error = e
+            finally:
+                job.finished = time.perf_counter()
+                if slot is not None:
+                    with self._lock:
+                        if self._slots.get(slot) is job:
+                            del self._slots[slot]
+                self._pending.release()
+                job._done.set()
+
+        self.executor.submit(run)
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._slots.values())
+        for job in jobs:
+            job.cancel()
+        self.executor.shutdown(wait=False)
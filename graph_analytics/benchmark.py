@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Scaling Benchmark Suite
+Times and memory-profiles loading, every detector, the visualizations and the explorer
+graph on synthetic graphs of increasing size, and reports regressions against a baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
+from detector_scheduler import DETECTOR_PLAN, run_detector
+from fraud_detector import FraudDetector
+from graph_loader import load_graph
+from graph_snapshot import build_snapshot
+from synthetic_graph import generate_graph_file
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+DEFAULT_SCALES = (10000, 100000, 1000000)
+MAX_RENDER_NODES = 10000  # Artist-drawn stages are skipped above this size (layout and raster scale)
+REGRESSION_TOLERANCE = 0.25  # Slowdown (or memory growth) treated as a regression
+
+MEASUREMENT_NOTE = ("seconds come from an untraced run of each stage; peak_mb from a second, "
+                    "separate run of the same stage under tracemalloc (tracing would skew the timing)")
+
+def measure(fn, profile_memory=True):
+    """
+    Run fn once for wall time, then (optionally) again under tracemalloc for peak memory
+    The two are separate runs because tracemalloc slows the traced code down several times
+    Returns (result of the timed run, seconds, peak MB or None)
+    """
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if profile_memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1 << 20)
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak_mb
+
+class ScalingBenchmark:
+    """Runs every stage at each scale and collects one record per (scale, stage)"""
+
+    def __init__(self, work_dir=BENCHMARK_DIR, seed=0, profile_memory=True,
+                 max_render_nodes=MAX_RENDER_NODES, stages=None):
+        self.work_dir = work_dir
+        self.seed = seed
+        self.profile_memory = profile_memory
+        self.max_render_nodes = max_render_nodes
+        self.stages = set(stages) if stages else None
+        self.records = []
+
+    def _wanted(self, stage):
+        return self.stages is None or stage in self.stages or stage.split(':')[0] in self.stages
+
+    def _record(self, scale, stage, fn, profile_memory=None, skip_reason=None):
+        if not self._wanted(stage):
+            return None
+        record = {'scale': scale, 'stage': stage}
+        if skip_reason:
+            record.update(status='skipped', reason=skip_reason)
+            print(f"  {stage:<40} skipped ({skip_reason})")
+            self.records.append(record)
+            return None
+
+        if profile_memory is None:
+            profile_memory = self.profile_memory
+        result, seconds, peak_mb = measure(fn, profile_memory)
+        record.update(status='ok', seconds=round(seconds, 6))
+        if peak_mb is not None:
+            record['peak_mb'] = round(peak_mb, 3)
+        print(f"  {stage:<40} {seconds:10.3f}s" + (f" {peak_mb:10.1f} MB" if peak_mb is not None else ''))
+        self.records.append(record)
+        return result
+
+    def data_file(self, scale):
+        """Generate (or reuse) the synthetic data file for a scale"""
+        data_dir = os.path.join(self.work_dir, 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        path = os.path.join(data_dir, f'synthetic-{scale}-seed{self.seed}.json')
+        if not os.path.exists(path):
+            if self._wanted('generate'):
+                self._record(scale, 'generate', lambda: generate_graph_file(path, scale, seed=self.seed),
+                             profile_memory=False)
+            else:
+                generate_graph_file(path, scale, seed=self.seed)
+        return path
+
+    def run_scale(self, scale):
+        print(f"Scale {scale:,} nodes")
+        path = self.data_file(scale)
+
+        # Loading: text parse, snapshot compile, snapshot load
+        graph = self._record(scale, 'parse', lambda: load_graph(path, use_snapshot=False))
+        self._record(scale, 'snapshot_build', lambda: build_snapshot(path))
+        snapshot_graph = self._record(scale, 'snapshot_load', lambda: load_graph(path))
+        nodes, edges = graph or snapshot_graph or load_graph(path)
+        self.records.append({'scale': scale, 'stage': 'graph_size', 'status': 'ok',
+                             'nodes': len(nodes), 'edges': len(edges)})
+
+        detector = self._record(scale, 'detector_init', lambda: FraudDetector(nodes, edges))
+        if detector is None:
+            detector = FraudDetector(nodes, edges)
+
+        # Each detector against the flags of the detectors before it, as in a sequential run
+        flags = {}
+        findings = {}
+        for key, method, kwargs, _ in DETECTOR_PLAN:
+            outcome = self._record(scale, f'detector:{key}',
+                                   lambda: run_detector(detector, method, kwargs, flags))
+            if outcome is None:
+                outcome = run_detector(detector, method, kwargs, flags)
+            findings[key], appended, _ = outcome
+            for name, new_flags in appended.items():
+                flags[name] = flags.get(name, []) + new_flags
+        findings['statistical_outliers'] = findings['statistical_outliers'][0]
+        fraud_flags = {name: list(set(v)) for name, v in flags.items()}
+        detector.fraud_flags = defaultdict(list, fraud_flags)
+        risk_scores = self._record(scale, 'risk_propagation', lambda: detector.compute_risk_scores())
+        if risk_scores is not None:
+            self._record(scale, 'risk_propagation:warm',
+                         lambda: detector.compute_risk_scores(initial=risk_scores))
+
+        self._record(scale, 'run_all_detections',
+                     lambda: FraudDetector(nodes, edges).run_all_detections(verbose=False))
+        self._record(scale, 'run_all_detections:parallel',
+                     lambda: FraudDetector(nodes, edges).run_all_detections(verbose=False, parallel=True),
+                     profile_memory=False)  # Worker memory is not visible to tracemalloc
+
+        self._render_stages(scale, nodes, edges, findings, fraud_flags)
+
+    def _render_stages(self, scale, nodes, edges, findings, fraud_flags):
+        too_large = None
+        if len(nodes) > self.max_render_nodes:
+            too_large = f"{len(nodes)} nodes > max render nodes {self.max_render_nodes}"
+        render_dir = os.path.join(self.work_dir, 'renders')
+        os.makedirs(render_dir, exist_ok=True)
+        # visualize_graph saves relative to the project directory
+        import visualize_graph
+        prefix = os.path.relpath(os.path.realpath(render_dir),
+                                 os.path.dirname(os.path.realpath(visualize_graph.__file__)))
+
+        render_stages = [s for s in ('visualize', 'explorer') if self._wanted(s)]
+        if not render_stages:
+            return
+
+        if 'visualize' in render_stages:
+            self._record(scale, 'visualize:full_graph',
+                         lambda: visualize_graph.create_full_graph_visualization(
+                             nodes, edges, fraud_flags, output_file=f'{prefix}/{scale}_graph_full.png'))
+            self._record(scale, 'visualize:fraud_subgraph',
+                         lambda: visualize_graph.create_fraud_subgraph_visualization(
+                             nodes, edges, fraud_flags, output_file=f'{prefix}/{scale}_graph_fraud.png'),
+                         skip_reason=too_large)
+            self._record(scale, 'visualize:statistics_chart',
+                         lambda: visualize_graph.create_fraud_statistics_chart(
+                             {'findings': findings}, output_file=f'{prefix}/{scale}_fraud_statistics.png'))
+
+        if 'explorer' in render_stages:
+            try:
+                from interactive_fraud_explorer import InteractiveFraudExplorer, LRUCache
+            except ImportError as e:
+                for stage in ('explorer:layout', 'explorer:lod_build', 'explorer:lod_overview',
+                              'explorer:all', 'explorer:suspicious_only'):
+                    self._record(scale, stage, None, skip_reason=f"explorer unavailable ({e})")
+                return
+            from graph_layout import compute_layout
+
+            layout = self._record(scale, 'explorer:layout', lambda: compute_layout(nodes, edges))
+            if layout is None:
+                layout = compute_layout(nodes, edges)
+            explorer = InteractiveFraudExplorer(nodes, edges, {'findings': findings, 'fraud_flags': fraud_flags},
+                                                layout)
+
+            # Level-of-detail overview is bounded by MAX_MARKERS, so it runs at every scale
+            from graph_lod import LODHierarchy
+            lod = self._record(scale, 'explorer:lod_build', lambda: LODHierarchy(
+                nodes, edges, layout, explorer.fraud_nodes, explorer.search_index.labels))
+            if lod is not None:
+                explorer.lod = lod
+            self._record(scale, 'explorer:lod_overview', lambda: explorer._build_lod_figure(()))
+
+            def uncached(fraud_filter):
+                explorer.graph_cache, explorer.figure_cache = LRUCache(), LRUCache()
+                return explorer.create_interactive_graph(fraud_filter, "All", 500)
+
+            for fraud_filter, stage in (("All", 'explorer:all'), ("Suspicious Only", 'explorer:suspicious_only')):
+                self._record(scale, stage, lambda: uncached(fraud_filter), skip_reason=too_large)
+                self._record(scale, f'{stage}:cached',
+                             lambda: explorer.create_interactive_graph(fraud_filter, "All", 500),
+                             skip_reason=too_large)
+
+    def run(self, scales):
+        for scale in scales:
+            self.run_scale(scale)
+        return self.results()
+
+    def results(self):
+        return {
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'seed': self.seed,
+            'measurement': MEASUREMENT_NOTE if self.profile_memory else "seconds from one untraced run",
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'runs': self.records,
+        }
+
+def find_regressions(baseline, current, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compare two result files stage by stage
+    Returns [(scale, stage, metric, baseline value, current value)] that grew by more than tolerance
+    """
+    previous = {(r['scale'], r['stage']): r for r in baseline['runs'] if r.get('status') == 'ok'}
+    regressions = []
+    for record in current['runs']:
+        old = previous.get((record['scale'], record['stage']))
+        if old is None or record.get('status') != 'ok':
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if metric in record and old.get(metric):
+                if record[metric] > old[metric] * (1 + tolerance):
+                    regressions.append((record['scale'], record['stage'], metric, old[metric], record[metric]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks on synthetic graphs")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help="node counts to benchmark (10k to 10M)")
+    parser.add_argument('--stages', nargs='+', default=None,
+                        help="only run these stages or stage groups (e.g. parse detector visualize explorer)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass (faster)")
+    parser.add_argument('--max-render-nodes', type=int, default=MAX_RENDER_NODES)
+    parser.add_argument('--benchmark-dir', default=BENCHMARK_DIR,
+                        help="directory for the synthetic data files and renders")
+    parser.add_argument('--output', default=None,
+                        help="results file (default: benchmark_results.json in the benchmark directory)")
+    parser.add_argument('--compare', default=None, help="baseline results file to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.benchmark_dir, 'benchmark_results.json')
+    benchmark = ScalingBenchmark(work_dir=args.benchmark_dir, seed=args.seed, profile_memory=not args.no_memory,
+                                 max_render_nodes=args.max_render_nodes, stages=args.stages)
+    if benchmark.profile_memory:
+        print(f"Note: {MEASUREMENT_NOTE}")
+    results = benchmark.run(args.scales)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(baseline, results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for scale, stage, metric, old, new in regressions:
+                print(f"  - {scale:,} nodes, {stage}: {metric} {old} -> {new}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == "__main__":
+    main()
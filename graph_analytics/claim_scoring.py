@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Claim Scoring Service
+Long-running local HTTP service that keeps the detector state of the whole graph in memory and
+checks one proposed accident (or a batch of them) against it before the claim is accepted,
+without changing that state
+
+POST /score with a claim object (or a JSON list of claims for a batch):
+    {"claim_id": "C-1001", "date": "2024-03-01",
+     "cars": [{"plate": "GL 4128",
+               "driver": {"name": "LAUREN A. ADAMS", "lawyer": "MATTHEW F. ANN", "doctor": "SARAH K. MARTIN"},
+               "passengers": [{"name": "CADENCE X. ANN", "lawyer": "MATTHEW F. ANN"}]}],
+     "witnesses": ["CARL X. PHILLIPS"]}
+GET /health reports the loaded data version; GET /stats the request latency percentiles
+"""
+
+import argparse
+import json
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from graph_loader import load_graph
+from hot_reload import WATCH_INTERVAL, HotReloader
+from incremental_detector import IncrementalFraudDetector
+from results_store import SEVERITIES
+from time_clusters import parse_day
+
+DATA_FILE = '/home/user/existing_project/graph_analytics/insurance-fraud-data.json'
+DEFAULT_PORT = 8765
+MAX_BATCH = 1000  # Claims per request
+MAX_BODY_BYTES = 16 * 1024 * 1024
+LATENCY_WINDOW = 10000  # Most recent requests kept for the latency percentiles
+PROFESSIONAL_ROLES = {'lawyer': 'Lawyer', 'doctor': 'Doctor'}  # Claim person field -> node type
+
+class ClaimError(ValueError):
+    """A claim that is malformed (reported to the caller as HTTP 400)"""
+
+def _claim_day(value):
+    """Day ordinal of a claim's date (parsed directly, so client input never enters the shared date cache)"""
+    if not isinstance(value, str):
+        raise ClaimError("date must be a 'YYYY-MM-DD' string")
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').toordinal()
+    except ValueError:
+        raise ClaimError("date must be a 'YYYY-MM-DD' string") from None
+
+def _name(value, what):
+    if not isinstance(value, str) or not value.strip():
+        raise ClaimError(f"{what} must be a non-empty string")
+    return value.strip()
+
+class ClaimScorer:
+    """
+    Read-only checks of proposed accidents against an IncrementalFraudDetector's state
+    Each check answers what the batch detector would report for the claim's cars and people if
+    the accident were added: accident counts against the current outlier threshold, accidents
+    within each time window around the claim date, earlier accidents of the same plate or
+    witness, driver/passenger role switches, and the suspicious clients of its professionals
+    """
+
+    def __init__(self, detector, risk_scores=None):
+        self.detector = detector
+        self.threshold = detector.outlier_stats['threshold']
+        self.days_window = detector.days_window
+        self.windows = detector.windows
+        self.min_suspicious_clients = detector.min_suspicious_clients
+        self.risk_scores = risk_scores or {}
+
+    @classmethod
+    def from_file(cls, data_file=DATA_FILE, risk=True):
+        nodes, edges = load_graph(data_file)
+        detector = IncrementalFraudDetector(nodes, edges)
+        return cls(detector, detector.compute_risk_scores() if risk else None)
+
+    def _person_days(self, name):
+        """Sorted accident day ordinals of a person's participant nodes"""
+        days = []
+        for node in self.detector.person_to_nodes.get(name, ()):
+            if node['type'] == 'Participant':
+                days.extend(day for day in map(parse_day, node.get('enter', [])) if day is not None)
+        days.sort()
+        return days
+
+    @staticmethod
+    def _max_window_count(days, day, window):
+        """Most accidents in any [start, start + window] span that contains day"""
+        best = 0
+        for start in days[bisect_left(days, day - window):bisect_right(days, day)]:
+            best = max(best, bisect_right(days, start + window) - bisect_left(days, start))
+        return best
+
+    def _risk(self, name):
+        nodes = self.detector.person_to_nodes.get(name, ())
+        return max((self.risk_scores.get(node['id'], 0.0) for node in nodes), default=0.0)
+
+    def _flagged(self, name):
+        """Whether a person already has a participant-level flag (what makes a client suspicious)"""
+        return bool(set(self.detector.fraud_flags.get(name, ())) - {'SUSPICIOUS_PROFESSIONAL'})
+
+    def _professional_nodes(self, name, node_type):
+        return [node for node in self.detector.person_to_nodes.get(name, ()) if node['type'] == node_type]
+
+    def _professional_clients(self, name, node_type):
+        """IDs of the flagged participants an existing professional represents or treats"""
+        clients = set()
+        for node in self._professional_nodes(name, node_type):
+            for client_id in self.detector.adjacency.successors(node['id'], ('represents', 'heals')):
+                client = self.detector.node_dict.get(client_id)
+                if (client and client['type'] == 'Participant' and isinstance(client.get('info'), dict)
+                        and self._flagged(client['info']['name'])):
+                    clients.add(client_id)
+        return clients
+
+    def _parse(self, claim):
+        """(claim ID, date, day ordinal, [(plate, [(name, role, person)])], witnesses)"""
+        if not isinstance(claim, dict):
+            raise ClaimError("a claim must be a JSON object")
+        day = _claim_day(claim.get('date'))
+        cars = []
+        for car in claim.get('cars') or []:
+            if not isinstance(car, dict):
+                raise ClaimError("each car must be an object with a plate")
+            people = []
+            if car.get('driver'):
+                people.append(('Driver', car['driver']))
+            people.extend(('Passenger', passenger) for passenger in car.get('passengers') or [])
+            riders = []
+            for role, person in people:
+                if not isinstance(person, dict):
+                    raise ClaimError("drivers and passengers must be objects with a name")
+                riders.append((_name(person.get('name'), f"{role.lower()} name"), role, person))
+            cars.append((_name(car.get('plate'), "plate"), riders))
+        witnesses = [_name(witness, "witness name") for witness in claim.get('witnesses') or []]
+        if not cars and not witnesses:
+            raise ClaimError("a claim needs at least one car or witness")
+        date = datetime.fromordinal(day).strftime('%Y-%m-%d')  # As the data file writes dates
+        return claim.get('claim_id'), date, day, cars, witnesses
+
+    def score(self, claim):
+        """
+        Findings for one proposed accident, in the shapes FraudDetector reports them, plus per
+        entity the flags it already has ('known_flags'), the flags this claim's evidence raises
+        ('claim_flags', possibly repeating known ones) and its current risk score
+        Nothing in the detector state is modified
+        """
+        claim_id, date, day, cars, witnesses = self._parse(claim)
+        detector = self.detector
+        findings = []
+        new_flags = {}  # name -> flags this claim raises
+
+        def flag(name, finding):
+            findings.append(finding)
+            new_flags.setdefault(name, []).append(finding['type'])
+
+        people = {}  # name -> roles in this claim, in claim order
+        professionals = {}  # (name, node type) -> names of their clients in this claim
+        for plate, riders in cars:
+            accident_count = len(detector.car_to_accidents.get(plate, ())) + 1
+            if accident_count > 1:
+                findings.append(detector._repeated_car_finding(plate, accident_count))
+            for name, role, person in riders:
+                people.setdefault(name, set()).add(role)
+                if accident_count > 1 and 'REPEATED_CAR' not in new_flags.get(name, ()):
+                    new_flags.setdefault(name, []).append('REPEATED_CAR')
+                for field, node_type in PROFESSIONAL_ROLES.items():
+                    if person.get(field):
+                        professional = _name(person[field], f"{field} name")
+                        professionals.setdefault((professional, node_type), []).append(name)
+
+        for name, roles in people.items():
+            dates = detector.person_dates.get(name, set()) | {date}
+            if len(dates) > self.threshold:
+                flag(name, detector._outlier_finding(name, len(dates), self.threshold))
+
+            days = self._person_days(name)
+            days.insert(bisect_right(days, day), day)
+            max_counts = {w: self._max_window_count(days, day, w) for w in self.windows}
+            if max_counts[self.days_window] >= 2:
+                flag(name, detector._time_cluster_finding(name, max_counts[self.days_window],
+                                                          self.days_window, max_counts))
+
+            all_roles = detector.person_roles.get(name, set()) | roles
+            if len(all_roles) > 1:
+                flag(name, detector._role_switching_finding(name, sorted(all_roles)))
+
+        for name in dict.fromkeys(witnesses):
+            accident_count = len(detector.witness_to_accidents.get(name, ())) + 1
+            if accident_count > 1:
+                flag(name, detector._repeated_witness_finding(name, accident_count))
+
+        # Claim clients count as suspicious if flagged already or by this claim
+        for (name, node_type), clients in professionals.items():
+            count = len(self._professional_clients(name, node_type)) + len(
+                {client for client in clients if new_flags.get(client) or self._flagged(client)})
+            if count >= self.min_suspicious_clients:
+                nodes = self._professional_nodes(name, node_type)
+                node = nodes[0] if nodes else {'id': None, 'type': node_type, 'info': {'name': name}}
+                flag(name, detector._professional_finding(node, count))
+
+        entities = {}
+        for name in [*people, *witnesses, *(name for name, _ in professionals)]:
+            if name not in entities:
+                entities[name] = {'known_flags': sorted(set(detector.fraud_flags.get(name, ()))),
+                                  'claim_flags': new_flags.get(name, []),
+                                  'risk': self._risk(name)}
+
+        severity = max((SEVERITIES.index(finding['severity']) for finding in findings), default=None)
+        return {
+            'claim_id': claim_id,
+            'flagged': bool(findings),
+            'max_severity': SEVERITIES[severity] if severity is not None else None,
+            'findings': findings,
+            'entities': entities,
+        }
+
+class LatencyStats:
+    """Request latencies (seconds) of the most recent LATENCY_WINDOW requests"""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.requests += 1
+
+    def summary(self):
+        with self.lock:
+            samples = np.array(self.samples)
+            requests = self.requests
+        if not len(samples):
+            return {'requests': requests}
+        p50, p99 = np.percentile(samples, [50, 99]) * 1000
+        return {'requests': requests, 'window': len(samples), 'p50_ms': round(float(p50), 3),
+                'p99_ms': round(float(p99), 3), 'max_ms': round(float(samples.max()) * 1000, 3)}
+
+class ClaimRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive: intake clients reuse one connection
+    disable_nagle_algorithm = True  # Small responses go out immediately
+
+    def log_message(self, format, *args):
+        pass  # Per-request logging would cost more than the scoring itself
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'version': service.version, 'loaded': service.loaded_at,
+                             'nodes': len(service.current.detector.nodes)})
+        elif self.path == '/stats':
+            self._send(200, self.server.latency.summary())
+        else:
+            self._send(404, {'error': f"no such endpoint: {self.path}"})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.close_connection = True  # The body's extent is unknown
+            self._send(400, {'error': "Content-Length must be a non-negative integer"})
+            return
+        if self.path != '/score':
+            self.rfile.read(length)
+            self._send(404, {'error': f"no such endpoint: {self.path}"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {'error': f"request body over {MAX_BODY_BYTES} bytes"})
+            return
+
+        scorer = self.server.service.current  # One data version for the whole request
+        try:
+            claims = json.loads(self.rfile.read(length))
+            if isinstance(claims, list):
+                if len(claims) > MAX_BATCH:
+                    raise ClaimError(f"at most {MAX_BATCH} claims per request")
+                result = [scorer.score(claim) for claim in claims]
+            else:
+                result = scorer.score(claims)
+        except (ClaimError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            self._send(400, {'error': str(e)})
+            return
+        except Exception as e:  # Always answer; a dropped connection tells the client nothing
+            self._send(500, {'error': f"internal error: {type(e).__name__}: {e}"})
+            return
+        self._send(200, result)
+        self.server.latency.add(time.perf_counter() - started)
+
+class ClaimScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        super().__init__(address, ClaimRequestHandler)
+        self.service = service  # HotReloader (or anything with .current) holding a ClaimScorer
+        self.latency = LatencyStats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident claim scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data', default=DATA_FILE, help="graph data file to score claims against")
+    parser.add_argument('--no-reload', action='store_true',
+                        help="keep the data loaded at startup instead of reloading it when the file changes")
+    args = parser.parse_args()
+
+    print("Loading insurance fraud data and detector state...")
+    service = HotReloader(lambda previous: ClaimScorer.from_file(args.data), [args.data],
+                          WATCH_INTERVAL, name='scoring-reload')
+    if not args.no_reload:
+        service.start()
+    detector = service.current.detector
+    print(f"Loaded {len(detector.nodes)} nodes and {len(detector.edges)} edges "
+          f"({len(detector.fraud_flags)} flagged entities)")
+
+    server = ClaimScoringServer((args.host, args.port), service)
+    print(f"Scoring claims on http://{args.host}:{args.port}/score")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
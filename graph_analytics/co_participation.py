@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Sparse Co-Participation Engine
+Holds person x accident, person x car and person x professional incidence matrices and
+counts how often every pair of people co-occurs with one sparse product per matrix
+"""
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+MAX_SHARED = 50  # Columns with more people than this are left out of the pair counts
+
+def incidence_matrix(rows, cols, num_rows, max_shared=MAX_SHARED):
+    """
+    Binary CSR matrix with a 1 at every (row, column key); keys are renumbered densely
+    Columns holding more than max_shared rows are dropped: a pair sharing a hub (a lawyer
+    with hundreds of clients) says little, and the product would grow quadratically with it
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    keys, cols = np.unique(np.asarray(cols, dtype=np.int64), return_inverse=True)
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                               shape=(num_rows, len(keys)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    if max_shared is not None:
+        keep = np.flatnonzero(np.diff(matrix.tocsc().indptr) <= max_shared)
+        matrix = matrix[:, keep]
+    return matrix
+
+class CoParticipationEngine:
+    """
+    Incidence matrices of people (rows) against accidents, cars, professionals or any other kind
+    of column; co_occurrence(kind) is M @ M.T, the number of columns each pair shares
+    """
+
+    def __init__(self, num_people, incidences, max_shared=MAX_SHARED):
+        """incidences: {kind: (person rows, column keys)}"""
+        self.num_people = num_people
+        self.matrices = {kind: incidence_matrix(rows, cols, num_people, max_shared)
+                         for kind, (rows, cols) in incidences.items()}
+        self._counts = {}
+
+    def co_occurrence(self, kind):
+        """Upper-triangular CSR of shared columns per pair of people (i < j)"""
+        if kind not in self._counts:
+            matrix = self.matrices[kind]
+            self._counts[kind] = sparse.triu(matrix @ matrix.T, k=1, format='csr')
+        return self._counts[kind]
+
+    def pair_counts(self, kind, i, j):
+        """Shared columns of the pairs (i[k], j[k]), with i < j"""
+        if not len(i):
+            return np.zeros(0, dtype=np.int64)
+        return np.asarray(self.co_occurrence(kind)[i, j]).ravel().astype(np.int64)
+
+    def pairs(self, min_counts):
+        """
+        Pairs meeting any of the thresholds in min_counts ({kind: minimum shared columns})
+        Returns (i, j, {kind: shared columns}) over every kind, pairs sorted by (i, j)
+        """
+        n = self.num_people
+        found = [np.zeros(0, dtype=np.int64)]
+        for kind, threshold in min_counts.items():
+            counts = self.co_occurrence(kind).tocoo()
+            keep = counts.data >= threshold
+            found.append(counts.row[keep].astype(np.int64) * n + counts.col[keep])
+        keys = np.unique(np.concatenate(found))
+        i, j = keys // n, keys % n
+        return i, j, {kind: self.pair_counts(kind, i, j) for kind in self.matrices}
+
+def cliques(i, j, min_size=3):
+    """Maximal cliques of at least min_size people in the graph of the given pairs, largest first"""
+    graph = nx.Graph()
+    graph.add_edges_from(zip(i.tolist(), j.tolist()))
+    found = [sorted(clique) for clique in nx.find_cliques(graph) if len(clique) >= min_size]
+    return sorted(found, key=lambda clique: (-len(clique), clique))
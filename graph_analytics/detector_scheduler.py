@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Dependency-Aware Detector Scheduler
+Runs FraudDetector detectors in dependency waves; detectors within a wave run
+concurrently on a process pool and their flags are merged in plan order
+"""
+
+import multiprocessing
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from run_metrics import measure_stage
+
+# Findings key, detector method, keyword arguments, findings keys it depends on
+DETECTOR_PLAN = [
+    ('statistical_outliers', 'detect_statistical_outliers', {}, ()),
+    ('time_patterns', 'detect_time_based_patterns', {'days_window': 30}, ()),
+    ('repeated_cars', 'detect_repeated_cars', {}, ()),
+    ('repeated_witnesses', 'detect_repeated_witnesses', {}, ()),
+    ('role_switching', 'detect_role_switching', {}, ()),
+    # Reads self.fraud_flags, so it must see every participant-level flag first
+    ('suspicious_professionals', 'detect_suspicious_professionals', {'min_suspicious_clients': 2},
+     ('statistical_outliers', 'time_patterns', 'repeated_cars', 'repeated_witnesses', 'role_switching')),
+    # Scores rings by flag density, so it runs after every flagging detector
+    ('fraud_rings', 'detect_fraud_rings', {'min_members': 3, 'min_score': 0.5},
+     ('statistical_outliers', 'time_patterns', 'repeated_cars', 'repeated_witnesses', 'role_switching',
+      'suspicious_professionals')),
+    # Findings only, no flags, so it needs no other detector
+    ('co_participation', 'detect_co_participation',
+     {'min_accidents': 2, 'min_cars': 2, 'min_professionals': 3, 'min_clique': 3}, ()),
+]
+
+_worker_detector = None
+
+def _init_worker(detector):
+    global _worker_detector
+    if detector is not None:
+        _worker_detector = detector
+
+def run_detector(detector, method, kwargs, base_flags, profile=False):
+    """
+    Run one detector against a copy of base_flags
+    Returns (result, flags it appended, stats); stats holds items scanned and flags emitted,
+    plus wall time and peak memory when profiling
+    """
+    detector.fraud_flags = defaultdict(list, {name: list(flags) for name, flags in base_flags.items()})
+    detector.items_scanned = 0
+    before = {name: len(flags) for name, flags in detector.fraud_flags.items()}
+    stats = {}
+    with measure_stage(stats) if profile else nullcontext():
+        result = getattr(detector, method)(**kwargs)
+    appended = {}
+    for name, flags in detector.fraud_flags.items():
+        new_flags = flags[before.get(name, 0):]
+        if new_flags:
+            appended[name] = new_flags
+    stats['items_scanned'] = detector.items_scanned
+    stats['flags_emitted'] = sum(len(flags) for flags in appended.values())
+    return result, appended, stats
+
+def _run_in_worker(method, kwargs, base_flags, profile):
+    return run_detector(_worker_detector, method, kwargs, base_flags, profile)
+
+def dependency_waves(plan=DETECTOR_PLAN):
+    """Group the plan into waves whose detectors only depend on earlier waves"""
+    done = set()
+    remaining = list(plan)
+    waves = []
+    while remaining:
+        wave = [entry for entry in remaining if set(entry[3]) <= done]
+        if not wave:
+            raise ValueError("Detector plan has a dependency cycle")
+        waves.append(wave)
+        done.update(entry[0] for entry in wave)
+        remaining = [entry for entry in remaining if entry not in wave]
+    return waves
+
+def run_detectors(detector, parallel=False, max_workers=None, plan=DETECTOR_PLAN, metrics=None):
+    """
+    Run every detector in the plan and return {findings key: result}
+    Flags are merged into detector.fraud_flags in plan order, so the outcome is the
+    same as a sequential run regardless of which worker finishes first
+    If a metrics dict is given, each detector is profiled into metrics[findings key]
+    """
+    profile = metrics is not None
+    global _worker_detector
+    waves = dependency_waves(plan)
+    merged_flags = defaultdict(list, {name: list(flags) for name, flags in detector.fraud_flags.items()})
+    results = {}
+
+    pool = None
+    if parallel and max(len(wave) for wave in waves) > 1:
+        max_workers = max_workers or min(os.cpu_count() or 1, max(len(wave) for wave in waves))
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # Forked workers share the parent's graph and index pages copy-on-write
+            _worker_detector = detector
+            pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(detector,))
+
+    try:
+        for wave in waves:
+            base_flags = dict(merged_flags)
+            if pool is not None and len(wave) > 1:
+                futures = [pool.submit(_run_in_worker, method, kwargs, base_flags, profile)
+                           for _, method, kwargs, _ in wave]
+                outcomes = [future.result() for future in futures]
+            else:
+                outcomes = [run_detector(detector, method, kwargs, base_flags, profile)
+                            for _, method, kwargs, _ in wave]
+
+            for (key, _, _, _), (result, appended, stats) in zip(wave, outcomes):
+                results[key] = result
+                if profile:
+                    metrics[key] = stats
+                for name, flags in appended.items():
+                    merged_flags[name].extend(flags)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            _worker_detector = None
+
+    detector.fraud_flags = merged_flags
+    return results
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Blocked Fuzzy Entity Resolution for Person Names
+Groups spelling variants of the same person (e.g. 'JAMES K. CLARKE' / 'JAMES CLARKE')
+under one canonical name; candidate pairs come from blocking keys instead of all pairs
+"""
+
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+MAX_BLOCK_SIZE = 200  # Larger blocks are split by first initial, then by first-name Soundex
+MATCH_THRESHOLD = 0.9
+MIN_FIRST_NAME_SIMILARITY = 0.9  # Misspelled first names must be this close ('MARIA'/'MARIO' is 0.8)
+
+# Common short forms of first names; a nickname and its full name count as the same first name
+NICKNAMES = {
+    'ALEX': 'ALEXANDER', 'ANDY': 'ANDREW', 'BEN': 'BENJAMIN', 'BETH': 'ELIZABETH',
+    'BILL': 'WILLIAM', 'BOB': 'ROBERT', 'CHRIS': 'CHRISTOPHER', 'DAN': 'DANIEL', 'DAVE': 'DAVID',
+    'ED': 'EDWARD', 'JIM': 'JAMES', 'JOE': 'JOSEPH', 'JOHNNY': 'JOHN', 'KATE': 'KATHERINE',
+    'LIZ': 'ELIZABETH', 'MATT': 'MATTHEW', 'MIKE': 'MICHAEL', 'NICK': 'NICHOLAS', 'PAT': 'PATRICK',
+    'PEGGY': 'MARGARET', 'RICK': 'RICHARD', 'ROB': 'ROBERT', 'SAM': 'SAMUEL', 'STEVE': 'STEVEN',
+    'SUE': 'SUSAN', 'TOM': 'THOMAS', 'TONY': 'ANTHONY', 'WILL': 'WILLIAM',
+}
+
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ['AEIOUYHW', 'BFPV', 'CGJKQSXZ', 'DT', 'L', 'MN', 'R']) for c in letters}
+
+def soundex(word):
+    """American Soundex code of a word ('' for words without letters)"""
+    word = re.sub(r'[^A-Z]', '', word.upper())
+    if not word:
+        return ''
+    code = word[0]
+    previous = _SOUNDEX_CODES.get(word[0])
+    for c in word[1:]:
+        digit = _SOUNDEX_CODES[c]
+        if digit != '0' and digit != previous:
+            code += digit
+        if c not in 'HW':
+            previous = digit
+    return (code + '000')[:4]
+
+def parse_name(name):
+    """
+    Split a name into (first, middle initials, surname), upper-cased without punctuation
+    'JAMES K. CLARKE' -> ('JAMES', ('K',), 'CLARKE')
+    """
+    tokens = re.sub(r"[^A-Z' -]", ' ', name.upper().replace('.', ' ')).split()
+    tokens = [t.strip("'-") for t in tokens if t.strip("'-")]
+    if not tokens:
+        return '', (), ''
+    if len(tokens) == 1:
+        return '', (), tokens[0]
+    return tokens[0], tuple(t[0] for t in tokens[1:-1]), tokens[-1]
+
+def blocking_keys(parsed):
+    """Keys under which a parsed name is compared with others"""
+    first, _, surname = parsed
+    keys = []
+    if surname:
+        keys.append(('surname', surname))
+        keys.append(('phonetic', soundex(surname), first[:1]))
+    if first and surname:
+        keys.append(('initials', first[0], surname[0], soundex(first)))
+    return keys
+
+def _similarity(a, b):
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def first_name_score(first_a, first_b):
+    """
+    Score in [0, 1] for two first names; 0 unless they agree (same name, an initial, a known
+    nickname or a near-identical spelling), since a close surname must not carry two different
+    people over the threshold
+    """
+    if first_a == first_b:
+        return 1.0
+    if first_a[:1] == first_b[:1] and min(len(first_a), len(first_b)) == 1:
+        return 0.9  # Initial only, e.g. 'J. CLARKE'
+    if NICKNAMES.get(first_a, first_a) == NICKNAMES.get(first_b, first_b):
+        return 0.9  # e.g. 'JIM CLARKE' / 'JAMES CLARKE'
+    score = _similarity(first_a, first_b)
+    return score if score >= MIN_FIRST_NAME_SIMILARITY else 0.0
+
+def score_pair(a, b):
+    """Match score in [0, 1] for two parsed names"""
+    first_a, middle_a, surname_a = a
+    first_b, middle_b, surname_b = b
+
+    # Different middle initials on both sides means different people
+    if middle_a and middle_b and middle_a != middle_b:
+        return 0.0
+
+    first_score = first_name_score(first_a, first_b)
+    if not first_score:
+        return 0.0
+
+    middle_score = 1.0 if middle_a == middle_b else 0.8
+    return 0.45 * first_score + 0.45 * _similarity(surname_a, surname_b) + 0.1 * middle_score
+
+def split_block(members, parsed, max_size):
+    """
+    Sub-blocks of at most max_size names from an oversized block: by first initial, then by
+    first-name Soundex (initial-only names join every sub-block of their initial)
+    Returns (sub-blocks, number of sub-blocks still too large to compare)
+    """
+    by_initial = defaultdict(list)
+    for name in members:
+        by_initial[parsed[name][0][:1]].append(name)
+
+    sub_blocks = []
+    skipped = 0
+    for group in by_initial.values():
+        if len(group) <= max_size:
+            sub_blocks.append(group)
+            continue
+        initials_only = [name for name in group if len(parsed[name][0]) <= 1]
+        by_sound = defaultdict(list)
+        for name in group:
+            if len(parsed[name][0]) > 1:
+                by_sound[soundex(parsed[name][0])].append(name)
+        for sub_block in list(by_sound.values()) or [[]]:
+            sub_block = sub_block + initials_only
+            if len(sub_block) <= max_size:
+                sub_blocks.append(sub_block)
+            else:
+                skipped += 1
+    return sub_blocks, skipped
+
+class UnionFind:
+    """Disjoint sets with path halving and union by size"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent == item:
+            self.size.setdefault(item, 1)
+            return item
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+class EntityResolver:
+    """
+    Resolves person names to canonical names
+    canonical maps every name to its cluster representative (the most complete,
+    then most frequent variant); aliases lists the variants merged into each one
+    """
+
+    def __init__(self, threshold=MATCH_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.canonical = {}
+        self.aliases = {}
+        self.candidate_pairs = 0
+        self.skipped_blocks = 0  # Blocks still oversized after splitting, left uncompared
+
+    def fit(self, names):
+        """Resolve an iterable of names (repeats count toward the representative choice)"""
+        frequency = Counter(names)
+        parsed = {name: parse_name(name) for name in frequency}
+
+        blocks = defaultdict(list)
+        for name, parts in parsed.items():
+            for key in blocking_keys(parts):
+                blocks[key].append(name)
+
+        candidates = set()
+        self.skipped_blocks = 0
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            sub_blocks = [members]
+            if len(members) > self.max_block_size:
+                sub_blocks, skipped = split_block(members, parsed, self.max_block_size)
+                self.skipped_blocks += skipped
+            for block in sub_blocks:
+                for i in range(len(block)):
+                    for j in range(i + 1, len(block)):
+                        a, b = block[i], block[j]
+                        candidates.add((a, b) if a < b else (b, a))
+        self.candidate_pairs = len(candidates)
+
+        scored = []
+        for a, b in candidates:
+            score = score_pair(parsed[a], parsed[b])
+            if score >= self.threshold:
+                scored.append((-score, a, b))
+        scored.sort()
+
+        # Best matches first; never join clusters holding different middle initials
+        # ('JAMES CLARKE' may join 'JAMES K. CLARKE' or 'JAMES T. CLARKE', not both) or first
+        # names that do not agree ('J. SMITH' may join 'JOHN SMITH' or 'JANE SMITH', not both)
+        clusters = UnionFind()
+        middles = {name: {parts[1]} - {()} for name, parts in parsed.items()}
+        firsts = {name: {parts[0]} for name, parts in parsed.items()}
+        for _, a, b in scored:
+            root_a, root_b = clusters.find(a), clusters.find(b)
+            if root_a == root_b or len(middles[root_a] | middles[root_b]) > 1:
+                continue
+            if not all(first_name_score(first_a, first_b)
+                       for first_a in firsts[root_a] for first_b in firsts[root_b]):
+                continue
+            root = clusters.union(a, b)
+            middles[root] = middles[root_a] | middles[root_b]
+            firsts[root] = firsts[root_a] | firsts[root_b]
+
+        members_by_root = defaultdict(list)
+        for name in frequency:
+            members_by_root[clusters.find(name)].append(name)
+
+        self.canonical = {}
+        self.aliases = {}
+        for members in members_by_root.values():
+            representative = max(members, key=lambda n: (len(parsed[n][1]) + bool(parsed[n][0]),
+                                                         len(n), frequency[n], n))
+            for name in members:
+                self.canonical[name] = representative
+            if len(members) > 1:
+                self.aliases[representative] = sorted(n for n in members if n != representative)
+        return self
+
+    def resolve(self, name):
+        return self.canonical.get(name, name)
+
+def expand_aliases(fraud_flags, aliases):
+    """
+    Copy of fraud_flags that also answers for every recorded name variant
+    aliases maps variant -> canonical name, as stored under 'entity_aliases' in the results
+    """
+    expanded = dict(fraud_flags)
+    for variant, canonical in aliases.items():
+        if canonical in fraud_flags:
+            expanded[variant] = fraud_flags[canonical]
+    return expanded
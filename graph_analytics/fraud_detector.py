@@ -4,65 +4,241 @@ Insurance Fraud Detection System
 Analyzes insurance claim data to identify suspicious patterns and fraud indicators
 """
 
+import argparse
 import json
-import re
+import os
+from array import array
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta
 import statistics
-
-def parse_js_object_file(filepath):
-    """Parse JavaScript object notation file to Python dict"""
-    with open(filepath, 'r') as f:
-        content = f.read()
-
-    # Convert JavaScript object notation to valid JSON
-    # Replace single quotes with double quotes for strings
-    content = re.sub(r"(\w+):", r'"\1":', content)  # Add quotes to keys
-    content = content.replace("'", '"')  # Replace single quotes
-
-    # Parse as JSON
-    data = json.loads(content)
-    return data
+from contextlib import nullcontext
+
+import numpy as np
+
+from co_participation import MAX_SHARED, CoParticipationEngine, cliques
+from detector_scheduler import DETECTOR_PLAN, run_detectors
+from entity_resolution import EntityResolver
+from graph_index import AdjacencyIndex
+from graph_loader import load_graph
+from graph_store import NodeSequence
+from results_store import finding_counts, open_flag_table, results_paths, write_findings_jsonl, write_flag_table
+from ring_detection import MAX_COMPONENT, RING_WEIGHTS, communities
+from risk_propagation import DAMPING, MAX_ITERATIONS, personalized_pagerank, transition_matrix
+from run_metrics import JsonlMetricsSink, iter_stage_metrics, measure_stage
+from time_clusters import DEFAULT_WINDOWS, TimeClusterEngine
+from time_index import TimeIndex
+
+# Finding field used as the metric of each per-entity flag in the flag table
+FLAG_METRICS = {
+    'STATISTICAL_OUTLIER': 'accident_count',
+    'TIME_CLUSTER': 'accidents_in_window',
+    'REPEATED_CAR': 'accident_count',
+    'REPEATED_WITNESS': 'accident_count',
+    'ROLE_SWITCHING': 'roles',
+    'SUSPICIOUS_PROFESSIONAL': 'suspicious_clients',
+}
 
 class FraudDetector:
-    def __init__(self, nodes, edges):
+    def __init__(self, nodes, edges, resolve_entities=False, profile=False):
         self.nodes = nodes
         self.edges = edges
-        self.node_dict = {node['id']: node for node in nodes}
+        if isinstance(nodes, NodeSequence):
+            self.node_dict = nodes.node_dict  # ID lookups straight from the compact store
+        else:
+            self.node_dict = {node['id']: node for node in nodes}
         self.fraud_flags = defaultdict(list)
 
+        # Profiling: per-stage wall time, peak memory, items scanned and flags emitted
+        self.profile = profile
+        self.metrics = {}
+        self.items_scanned = 0  # Incremented by the running detector
+        self.risk_stats = None  # Set by compute_risk_scores
+
+        # Spelling variants of a person's name -> canonical name (empty unless resolving)
+        self.entity_resolver = None
+        self.canonical_names = {}
+        if resolve_entities:
+            with self._profile_stage('entity_resolution', items_scanned=len(nodes)):
+                self.entity_resolver = EntityResolver().fit(
+                    node['info']['name'] for node in nodes
+                    if isinstance(node.get('info'), dict) and 'name' in node['info'])
+            self.canonical_names = {name: canonical
+                                    for name, canonical in self.entity_resolver.canonical.items()
+                                    if name != canonical}
+
         # Build reverse index structures
         self.person_to_nodes = defaultdict(list)  # person name -> node IDs
         self.car_to_accidents = defaultdict(list)  # car -> accident IDs
         self.witness_to_accidents = defaultdict(list)  # witness -> accident IDs
         self.accident_participants = defaultdict(list)  # accident -> participants
+        self.car_to_nodes = defaultdict(list)  # car plate -> car node IDs
+        self.witness_to_nodes = defaultdict(list)  # witness name -> witness node IDs
+
+        with self._profile_stage('index_construction', items_scanned=len(nodes) + len(edges)):
+            self._build_indexes()
 
-        self._build_indexes()
+    def _profile_stage(self, stage, trace_memory=True, **counts):
+        """Context measuring a stage into self.metrics[stage] when profiling"""
+        if not self.profile:
+            return nullcontext()
+        self.metrics[stage] = dict(counts)
+        return measure_stage(self.metrics[stage], trace_memory=trace_memory)
 
     def _build_indexes(self):
         """Build index structures for faster fraud detection"""
+        # Typed forward/reverse adjacency (CSR per edge type) for O(degree) neighbor lookups
+        if isinstance(self.nodes, NodeSequence) and self.edges is self.nodes.store.edges:
+            self.adjacency = AdjacencyIndex.from_snapshot(self.nodes.store)
+        else:
+            self.adjacency = AdjacencyIndex.from_records(self.nodes, self.edges)
+
         # Index all people (Participants, Lawyers, Doctors, Witnesses)
         for node in self.nodes:
             if isinstance(node.get('info'), dict) and 'name' in node['info']:
-                name = node['info']['name']
+                name = self._person_name(node)
                 self.person_to_nodes[name].append(node)
 
             # Index cars to accidents via edges
             if node['type'] == 'Car':
                 car_plate = node['info']
-                # Find all accidents this car is involved in
-                for edge in self.edges:
-                    if edge['from'] == node['id'] and edge['type'] == 'involves':
-                        accident_id = edge['to']
-                        self.car_to_accidents[car_plate].append(accident_id)
+                self.car_to_nodes[car_plate].append(node['id'])
+                self.car_to_accidents[car_plate].extend(
+                    self.adjacency.successors(node['id'], 'involves'))
 
             # Index witnesses to accidents
-            if node['type'] == 'Witness':
-                witness_name = node['info']['name']
-                for edge in self.edges:
-                    if edge['from'] == node['id'] and edge['type'] == 'witnesses':
-                        accident_id = edge['to']
-                        self.witness_to_accidents[witness_name].append(accident_id)
+            if self._is_witness(node):
+                witness_name = self._person_name(node)
+                self.witness_to_nodes[witness_name].append(node['id'])
+                self.witness_to_accidents[witness_name].extend(
+                    self.adjacency.successors(node['id'], 'witnesses'))
+
+    @staticmethod
+    def _is_witness(node):
+        """Whether a node counts as a witness (shared by the batch, incremental and streaming detectors)"""
+        return node is not None and node['type'] == 'Witness'
+
+    @staticmethod
+    def _driver_passenger_roles(role_string):
+        """Driver/Passenger roles in a role field; roles can be comma-separated like 'Driver,Passenger,Witness,Witness'"""
+        if not role_string:
+            return []
+        return [r.strip() for r in role_string.split(',') if r.strip() in ['Driver', 'Passenger']]
+
+    def _person_name(self, node):
+        """Canonical name of a person node (its own name when entities are not resolved)"""
+        name = node['info']['name']
+        return self.canonical_names.get(name, name)
+
+    def _professional_name(self, professional):
+        info = professional.get('info', '')
+        return self._person_name(professional) if isinstance(info, dict) else str(info)
+
+    @staticmethod
+    def _outlier_finding(name, count, threshold):
+        return {
+            'name': name,
+            'type': 'STATISTICAL_OUTLIER',
+            'accident_count': count,
+            'threshold': threshold,
+            'severity': 'HIGH',
+            'details': f'Involved in {count} accidents (threshold: {threshold:.2f})'
+        }
+
+    @staticmethod
+    def _time_cluster_finding(name, count_in_window, days_window, max_counts):
+        return {
+            'name': name,
+            'type': 'TIME_CLUSTER',
+            'accidents_in_window': count_in_window,
+            'window_days': days_window,
+            'max_accidents_in_window': {str(w): c for w, c in max_counts.items()},
+            'severity': 'MEDIUM' if count_in_window == 2 else 'HIGH',
+            'details': f'{count_in_window} accidents within {days_window} days'
+        }
+
+    @staticmethod
+    def _repeated_car_finding(car_plate, accident_count):
+        return {
+            'car': car_plate,
+            'type': 'REPEATED_CAR',
+            'accident_count': accident_count,
+            'severity': 'HIGH' if accident_count >= 3 else 'MEDIUM',
+            'details': f'Car {car_plate} involved in {accident_count} accidents'
+        }
+
+    @staticmethod
+    def _repeated_witness_finding(name, accident_count):
+        return {
+            'name': name,
+            'type': 'REPEATED_WITNESS',
+            'accident_count': accident_count,
+            'severity': 'HIGH' if accident_count >= 3 else 'MEDIUM',
+            'details': f'Witnessed {accident_count} different accidents'
+        }
+
+    @staticmethod
+    def _role_switching_finding(name, roles):
+        return {
+            'name': name,
+            'type': 'ROLE_SWITCHING',
+            'roles': list(roles),
+            'severity': 'MEDIUM',
+            'details': f'Appears as both {" and ".join(roles)} in different accidents'
+        }
+
+    def _professional_finding(self, professional, suspicious_clients):
+        return {
+            'name': self._professional_name(professional),
+            'id': professional['id'],
+            'type': 'SUSPICIOUS_PROFESSIONAL',
+            'professional_type': professional['type'],
+            'suspicious_clients': suspicious_clients,
+            'severity': 'HIGH' if suspicious_clients >= 4 else 'MEDIUM',
+            'details': f"{professional['type']} with {suspicious_clients} suspicious clients"
+        }
+
+    @staticmethod
+    def _ring_finding(members, professionals, accidents, shared_accidents, repeat_members, flagged, score):
+        return {
+            'members': members,
+            'type': 'FRAUD_RING',
+            'size': len(members),
+            'flagged_members': flagged,
+            'flag_density': round(flagged / len(members), 3),
+            'shared_professionals': professionals,
+            'accidents': accidents,
+            'shared_accidents': shared_accidents,
+            'repeat_members': repeat_members,
+            'score': round(score, 3),
+            'severity': 'HIGH' if score >= 0.75 else 'MEDIUM',
+            'details': f'{len(members)} people across {accidents} accidents: {flagged} flagged, '
+                       f'{len(professionals)} shared professional(s), {repeat_members} in several shared accidents'
+        }
+
+    @staticmethod
+    def _pair_finding(names, shared_accidents, shared_cars, shared_professionals):
+        return {
+            'names': names,
+            'type': 'CO_PARTICIPATION',
+            'shared_accidents': shared_accidents,
+            'shared_cars': shared_cars,
+            'shared_professionals': shared_professionals,
+            'severity': 'HIGH' if shared_accidents >= 3 else 'MEDIUM',
+            'details': f'Together in {shared_accidents} accidents; shared {shared_cars} car(s) '
+                       f'and {shared_professionals} professional(s)'
+        }
+
+    @staticmethod
+    def _clique_finding(names, min_shared_accidents):
+        return {
+            'names': names,
+            'type': 'CO_PARTICIPATION_CLIQUE',
+            'size': len(names),
+            'min_shared_accidents': min_shared_accidents,
+            'severity': 'HIGH' if len(names) >= 4 else 'MEDIUM',
+            'details': f'{len(names)} people who all repeatedly co-occur '
+                       f'(every pair together in {min_shared_accidents}+ accidents)'
+        }
 
     def detect_statistical_outliers(self):
         """
@@ -72,9 +248,10 @@ class FraudDetector:
         # Count accidents per person (Participants only)
         person_accident_counts = defaultdict(set)
 
+        self.items_scanned += len(self.nodes)
         for node in self.nodes:
             if node['type'] == 'Participant' and isinstance(node.get('info'), dict):
-                name = node['info']['name']
+                name = self._person_name(node)
                 # Each enter date represents involvement in an accident
                 accident_count = len(node.get('enter', []))
                 person_accident_counts[name].update(node.get('enter', []))
@@ -96,57 +273,32 @@ class FraudDetector:
         for name, dates in person_accident_counts.items():
             count = len(dates)
             if count > threshold:
-                suspicious.append({
-                    'name': name,
-                    'type': 'STATISTICAL_OUTLIER',
-                    'accident_count': count,
-                    'threshold': threshold,
-                    'severity': 'HIGH',
-                    'details': f'Involved in {count} accidents (threshold: {threshold:.2f})'
-                })
+                suspicious.append(self._outlier_finding(name, count, threshold))
                 self.fraud_flags[name].append('STATISTICAL_OUTLIER')
 
         return suspicious, {'mean': statistics.mean(counts) if counts else 0,
                            'threshold': threshold,
                            'max': max(counts) if counts else 0}
 
-    def detect_time_based_patterns(self, days_window=30):
+    def detect_time_based_patterns(self, days_window=30, density_windows=DEFAULT_WINDOWS):
         """
         Detect people involved in multiple accidents within a short time period
+        All windows (days_window plus density_windows) are evaluated in one vectorized pass;
+        each finding also reports the person's maximum accident density per window
         """
         suspicious = []
 
-        for name, node_list in self.person_to_nodes.items():
-            all_dates = []
-            for node in node_list:
-                if node['type'] == 'Participant':
-                    for date_str in node.get('enter', []):
-                        try:
-                            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                            all_dates.append(date_obj)
-                        except:
-                            pass
-
-            all_dates.sort()
-
-            # Check for multiple accidents within time window
-            for i in range(len(all_dates)):
-                count_in_window = 1
-                for j in range(i + 1, len(all_dates)):
-                    if (all_dates[j] - all_dates[i]).days <= days_window:
-                        count_in_window += 1
-
-                if count_in_window >= 2:  # 2 or more accidents in time window
-                    suspicious.append({
-                        'name': name,
-                        'type': 'TIME_CLUSTER',
-                        'accidents_in_window': count_in_window,
-                        'window_days': days_window,
-                        'severity': 'MEDIUM' if count_in_window == 2 else 'HIGH',
-                        'details': f'{count_in_window} accidents within {days_window} days'
-                    })
-                    self.fraud_flags[name].append('TIME_CLUSTER')
-                    break  # Only flag once per person
+        engine = TimeClusterEngine.from_person_nodes(self.person_to_nodes)
+        self.items_scanned += len(engine.days)
+        windows = sorted(set(density_windows) | {days_window})
+        results = engine.evaluate(windows)
+        first_counts = results[days_window]['first']
+
+        for group in np.flatnonzero(first_counts >= 2):
+            name = engine.names[group]
+            max_counts = {w: int(results[w]['max'][group]) for w in windows}
+            suspicious.append(self._time_cluster_finding(name, int(first_counts[group]), days_window, max_counts))
+            self.fraud_flags[name].append('TIME_CLUSTER')
 
         return suspicious
 
@@ -156,27 +308,20 @@ class FraudDetector:
         """
         suspicious = []
 
+        self.items_scanned += len(self.car_to_accidents)
         for car_plate, accident_ids in self.car_to_accidents.items():
             if len(accident_ids) > 1:
-                suspicious.append({
-                    'car': car_plate,
-                    'type': 'REPEATED_CAR',
-                    'accident_count': len(accident_ids),
-                    'severity': 'HIGH' if len(accident_ids) >= 3 else 'MEDIUM',
-                    'details': f'Car {car_plate} involved in {len(accident_ids)} accidents'
-                })
+                suspicious.append(self._repeated_car_finding(car_plate, len(accident_ids)))
                 # Flag all participants associated with this car
-                for node in self.nodes:
-                    if node['type'] == 'Car' and node['info'] == car_plate:
-                        car_node_id = node['id']
-                        # Find participants connected to this car
-                        for edge in self.edges:
-                            if edge['to'] == car_node_id and edge['type'] in ['drives', 'isPassenger']:
-                                participant_id = edge['from']
-                                participant = self.node_dict.get(participant_id)
-                                if participant and isinstance(participant.get('info'), dict):
-                                    name = participant['info']['name']
-                                    self.fraud_flags[name].append('REPEATED_CAR')
+                for car_node_id in self.car_to_nodes[car_plate]:
+                    # Find participants connected to this car
+                    participant_ids = self.adjacency.predecessors(car_node_id, ('drives', 'isPassenger'))
+                    self.items_scanned += len(participant_ids)
+                    for participant_id in participant_ids:
+                        participant = self.node_dict.get(participant_id)
+                        if participant and isinstance(participant.get('info'), dict):
+                            name = self._person_name(participant)
+                            self.fraud_flags[name].append('REPEATED_CAR')
 
         return suspicious
 
@@ -186,15 +331,10 @@ class FraudDetector:
         """
         suspicious = []
 
+        self.items_scanned += len(self.witness_to_accidents)
         for witness_name, accident_ids in self.witness_to_accidents.items():
             if len(accident_ids) > 1:
-                suspicious.append({
-                    'name': witness_name,
-                    'type': 'REPEATED_WITNESS',
-                    'accident_count': len(accident_ids),
-                    'severity': 'HIGH' if len(accident_ids) >= 3 else 'MEDIUM',
-                    'details': f'Witnessed {len(accident_ids)} different accidents'
-                })
+                suspicious.append(self._repeated_witness_finding(witness_name, len(accident_ids)))
                 self.fraud_flags[witness_name].append('REPEATED_WITNESS')
 
         return suspicious
@@ -206,28 +346,16 @@ class FraudDetector:
         suspicious = []
         person_roles = defaultdict(set)
 
+        self.items_scanned += len(self.nodes)
         for node in self.nodes:
             if node['type'] == 'Participant' and isinstance(node.get('info'), dict):
-                name = node['info']['name']
-                role_string = node['info'].get('role', '')
-
-                # Role can be comma-separated like 'Driver,Passenger,Witness,Witness'
-                # Parse and extract individual roles
-                if role_string:
-                    roles = [r.strip() for r in role_string.split(',')]
-                    for role in roles:
-                        if role in ['Driver', 'Passenger']:
-                            person_roles[name].add(role)
+                name = self._person_name(node)
+                for role in self._driver_passenger_roles(node['info'].get('role', '')):
+                    person_roles[name].add(role)
 
         for name, roles in person_roles.items():
             if len(roles) > 1:  # Has both Driver and Passenger roles
-                suspicious.append({
-                    'name': name,
-                    'type': 'ROLE_SWITCHING',
-                    'roles': list(roles),
-                    'severity': 'MEDIUM',
-                    'details': f'Appears as both {" and ".join(roles)} in different accidents'
-                })
+                suspicious.append(self._role_switching_finding(name, roles))
                 self.fraud_flags[name].append('ROLE_SWITCHING')
 
         return suspicious
@@ -241,60 +369,366 @@ class FraudDetector:
 
         # First, get all suspicious participant node IDs
         suspicious_participant_ids = set()
+        self.items_scanned += len(self.nodes)
         for node in self.nodes:
             if node['type'] == 'Participant' and isinstance(node.get('info'), dict):
-                name = node['info']['name']
+                name = self._person_name(node)
                 if name in self.fraud_flags:
                     suspicious_participant_ids.add(node['id'])
 
-        # Now check doctors and lawyers
+        # Now check doctors and lawyers pointing at those participants (reverse adjacency)
         professional_connections = defaultdict(set)
+        first_connection = {}  # professional ID -> earliest edge index, to keep edge-list order
 
-        for edge in self.edges:
-            source_node = self.node_dict.get(edge['from'])
-            target_node = self.node_dict.get(edge['to'])
+        for participant_id in suspicious_participant_ids:
+            in_edges = self.adjacency.in_edges(participant_id)
+            self.items_scanned += len(in_edges)
+            for edge_index, source_id in in_edges:
+                source_node = self.node_dict.get(source_id)
 
-            if not source_node or not target_node:
-                continue
+                # Check if professional (doctor/lawyer) connects to suspicious participant
+                if source_node and source_node['type'] in ['Doctor', 'Lawyer']:
+                    professional_connections[source_id].add(participant_id)
+                    if edge_index < first_connection.get(source_id, self.adjacency.num_edges):
+                        first_connection[source_id] = edge_index
 
-            # Check if professional (doctor/lawyer) connects to suspicious participant
-            if source_node['type'] in ['Doctor', 'Lawyer']:
-                if edge['to'] in suspicious_participant_ids:
-                    professional_connections[edge['from']].add(edge['to'])
+        professional_connections = {
+            professional_id: professional_connections[professional_id]
+            for professional_id in sorted(professional_connections, key=first_connection.get)
+        }
 
         # Flag professionals with multiple suspicious connections
         for professional_id, connected_participants in professional_connections.items():
             if len(connected_participants) >= min_suspicious_clients:
                 professional = self.node_dict[professional_id]
-                name = professional['info']['name'] if isinstance(professional.get('info'), dict) else str(professional.get('info', ''))
-
-                suspicious.append({
-                    'name': name,
-                    'id': professional_id,
-                    'type': 'SUSPICIOUS_PROFESSIONAL',
-                    'professional_type': professional['type'],
-                    'suspicious_clients': len(connected_participants),
-                    'severity': 'HIGH' if len(connected_participants) >= 4 else 'MEDIUM',
-                    'details': f"{professional['type']} with {len(connected_participants)} suspicious clients"
-                })
+                name = self._professional_name(professional)
+
+                suspicious.append(self._professional_finding(professional, len(connected_participants)))
                 self.fraud_flags[name].append('SUSPICIOUS_PROFESSIONAL')
 
         return suspicious
 
-    def run_all_detections(self):
-        """Run all fraud detection algorithms"""
+    def _entity_graph(self):
+        """
+        People (by name), cars (by plate) and accidents as entity vertices, from one pass over the
+        nodes and one over the edges. Returns a dict of the vertex names, the non-professional
+        'people' and the 'professionals' vertex arrays, the entity links (src, dst) and the typed
+        pairs used for scoring: rides (person, car vertex, car node index), involves (car node index,
+        accident), witnessed (person, accident) and clients (professional, client)
+        """
+        vertex = {}  # ('person' | 'car' | 'accident', key) -> entity vertex
+        names = []  # entity vertex -> person name or key
+        node_vertex = {}  # node ID -> entity vertex
+        car_nodes = {}  # car node ID -> dense car node index (node IDs need not be integers)
+        professional_vertices = set()
+
+        self.items_scanned += len(self.nodes) + len(self.edges)
+        for node in self.nodes:
+            if node['type'] == 'Car':
+                key = ('car', node['info'])
+            elif node['type'] == 'Accident':
+                key = ('accident', node['id'])
+            elif node['type'] in ['Doctor', 'Lawyer']:
+                key = ('person', self._professional_name(node))
+            elif isinstance(node.get('info'), dict) and 'name' in node['info']:
+                key = ('person', self._person_name(node))
+            else:
+                continue
+            v = vertex.get(key)
+            if v is None:
+                v = vertex[key] = len(names)
+                names.append(key[1])
+            node_vertex[node['id']] = v
+            if node['type'] in ['Doctor', 'Lawyer']:
+                professional_vertices.add(v)
+
+        src, dst = array('q'), array('q')
+        ride_people, ride_cars, ride_car_ids = array('q'), array('q'), array('q')
+        involved_car_ids, involved_accidents = array('q'), array('q')
+        witness_people, witnessed_accidents = array('q'), array('q')
+        professionals, clients = array('q'), array('q')
+        for edge in self.edges:
+            u = node_vertex.get(edge['from'])
+            v = node_vertex.get(edge['to'])
+            if u is None or v is None:
+                continue
+            src.append(u)
+            dst.append(v)
+            edge_type = edge['type']
+            if edge_type in ('drives', 'isPassenger'):
+                ride_people.append(u)
+                ride_cars.append(v)
+                ride_car_ids.append(car_nodes.setdefault(edge['to'], len(car_nodes)))
+            elif edge_type == 'involves':
+                involved_car_ids.append(car_nodes.setdefault(edge['from'], len(car_nodes)))
+                involved_accidents.append(v)
+            elif edge_type == 'witnesses':
+                witness_people.append(u)
+                witnessed_accidents.append(v)
+            elif edge_type in ('heals', 'represents'):
+                professionals.append(u)
+                clients.append(v)
+
+        is_person = np.zeros(len(names), dtype=bool)
+        is_person[[v for key, v in vertex.items() if key[0] == 'person']] = True
+        is_professional = np.zeros(len(names), dtype=bool)
+        is_professional[list(professional_vertices)] = True
+
+        def as_array(values):
+            return np.frombuffer(values, dtype=np.int64)
+
+        return {
+            'names': names,
+            'people': np.flatnonzero(is_person & ~is_professional),
+            'professionals': np.flatnonzero(is_professional),
+            'src': as_array(src), 'dst': as_array(dst),
+            'rides': (as_array(ride_people), as_array(ride_cars), as_array(ride_car_ids)),
+            'involves': (as_array(involved_car_ids), as_array(involved_accidents)),
+            'witnessed': (as_array(witness_people), as_array(witnessed_accidents)),
+            'clients': (as_array(professionals), as_array(clients)),
+        }
+
+    @staticmethod
+    def _person_accidents(graph):
+        """
+        Distinct (person, accident) vertex pairs of an entity graph: each ride joined with the
+        accidents of that car node, plus witnessing
+        """
+        ride_people, _, ride_car_ids = graph['rides']
+        involved_car_ids, involved_accidents = graph['involves']
+        order = np.argsort(involved_car_ids, kind='stable')
+        involved_car_ids, involved_accidents = involved_car_ids[order], involved_accidents[order]
+        lo = np.searchsorted(involved_car_ids, ride_car_ids, side='left')
+        counts = np.searchsorted(involved_car_ids, ride_car_ids, side='right') - lo
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        witness_people, witnessed_accidents = graph['witnessed']
+        person = np.concatenate([np.repeat(ride_people, counts), witness_people])
+        accident = np.concatenate([involved_accidents[np.repeat(lo, counts) + offsets], witnessed_accidents])
+        n = len(graph['names'])
+        pairs = np.unique(person * n + accident)
+        return pairs // n, pairs % n
+
+    def detect_fraud_rings(self, min_members=3, min_score=0.5, max_component=MAX_COMPONENT):
+        """
+        Detect groups of people tied together by shared accidents, cars and professionals
+        People (by name), cars (by plate) and accidents form one entity graph; union-find splits it
+        into components and label propagation splits components too large to be a single ring.
+        Rings are scored by flag density, professionals serving several members, and members
+        meeting again in more than one of the ring's accidents. Members are not flagged individually
+        """
+        graph = self._entity_graph()
+        names = graph['names']
+        n = len(names)
+        community = communities(n, graph['src'], graph['dst'], max_component)
+
+        # Ring members are the non-professional people; each ring is one community
+        members = graph['people']
+        ring_keys, member_ring = np.unique(community[members], return_inverse=True)
+        ring_of = np.full(n, -1, dtype=np.int64)
+        ring_of[members] = member_ring
+        num_rings = len(ring_keys)
+        size = np.bincount(member_ring, minlength=num_rings)
+        is_flagged = np.array([names[v] in self.fraud_flags for v in members.tolist()], dtype=bool)
+        flagged = np.bincount(member_ring, is_flagged, minlength=num_rings).astype(np.int64)
+
+        person, accident = self._person_accidents(graph)
+        keep = ring_of[person] >= 0
+        person, accident = person[keep], accident[keep]
+
+        # Accidents reused by the ring: those with two or more members, and members in several of them
+        ring_accidents, position, per_accident = np.unique(
+            ring_of[person] * n + accident, return_inverse=True, return_counts=True)
+        accident_count = np.bincount(ring_accidents // n, minlength=num_rings)
+        shared = per_accident >= 2
+        shared_count = np.bincount(ring_accidents[shared] // n, minlength=num_rings)
+        shared_per_person = np.bincount(person[shared[position]], minlength=n)
+        repeat = np.bincount(member_ring, shared_per_person[members] >= 2, minlength=num_rings).astype(np.int64)
+
+        # Professionals serving two or more members of the same ring
+        professionals, clients = graph['clients']
+        served = np.unique((professionals * n + clients)[ring_of[clients] >= 0])
+        ring_professionals, client_count = np.unique(ring_of[served % n] * n + served // n, return_counts=True)
+        ring_professionals = ring_professionals[client_count >= 2]
+        professional_count = np.bincount(ring_professionals // n, minlength=num_rings)
+
+        score = (RING_WEIGHTS['flag_density'] * flagged / np.maximum(size, 1)
+                 + RING_WEIGHTS['shared_professionals'] * np.minimum(professional_count, 2) / 2
+                 + RING_WEIGHTS['accident_reuse'] * repeat / np.maximum(size, 1))
+
+        suspicious = []
+        for ring in np.flatnonzero((size >= min_members) & (score >= min_score)).tolist():
+            ring_members = sorted(names[v] for v in members[member_ring == ring].tolist())
+            shared_professionals = sorted(
+                names[v] for v in (ring_professionals[ring_professionals // n == ring] % n).tolist())
+            suspicious.append(self._ring_finding(
+                ring_members, shared_professionals, int(accident_count[ring]), int(shared_count[ring]),
+                int(repeat[ring]), int(flagged[ring]), float(score[ring])))
+
+        suspicious.sort(key=lambda ring: (-ring['score'], -ring['size'], ring['members'][0]))
+        return suspicious
+
+    def detect_co_participation(self, min_accidents=2, min_cars=2, min_professionals=3, min_clique=3,
+                                max_shared=MAX_SHARED):
+        """
+        Detect pairs and cliques of people who keep turning up together
+        Person x accident, person x car and person x professional incidence matrices are multiplied
+        by their transposes to count shared accidents, cars and professionals for every pair at once.
+        Pairs meeting any threshold are reported, then maximal cliques of such pairs; people are
+        not flagged individually
+        """
+        graph = self._entity_graph()
+        names = graph['names']
+        people = graph['people']
+        row = np.full(len(names), -1, dtype=np.int64)
+        row[people] = np.arange(len(people))
+
+        person, accident = self._person_accidents(graph)
+        ride_people, ride_cars, _ = graph['rides']
+        professionals, clients = graph['clients']
+        incidences = {}
+        for kind, (rows, cols) in (('accidents', (row[person], accident)),
+                                   ('cars', (row[ride_people], ride_cars)),
+                                   ('professionals', (row[clients], professionals))):
+            keep = rows >= 0
+            incidences[kind] = (rows[keep], cols[keep])
+        engine = CoParticipationEngine(len(people), incidences, max_shared)
+
+        i, j, counts = engine.pairs({'accidents': min_accidents, 'cars': min_cars,
+                                     'professionals': min_professionals})
+        self.items_scanned += len(i)
+
+        suspicious = []
+        strong = counts['accidents'] >= min_accidents
+        pair_accidents = dict(zip(zip(i[strong].tolist(), j[strong].tolist()), counts['accidents'][strong].tolist()))
+        for clique in cliques(i[strong], j[strong], min_clique):
+            shared = min(pair_accidents[a, b] for k, a in enumerate(clique) for b in clique[k + 1:])
+            suspicious.append(self._clique_finding(sorted(names[people[p]] for p in clique), shared))
+
+        pairs = [(sorted([names[people[a]], names[people[b]]]), accidents, cars, shared_professionals)
+                 for a, b, accidents, cars, shared_professionals in zip(
+                     i.tolist(), j.tolist(), counts['accidents'].tolist(), counts['cars'].tolist(),
+                     counts['professionals'].tolist())]
+        pairs.sort(key=lambda pair: (-pair[1], -pair[2], -pair[3], pair[0]))
+        suspicious.extend(self._pair_finding(*pair) for pair in pairs)
+        return suspicious
+
+    def compute_risk_scores(self, initial=None, damping=DAMPING, max_iterations=MAX_ITERATIONS):
+        """
+        Continuous guilt-by-association risk for every node: personalized PageRank over the
+        undirected graph, restarting at flagged people weighted by their number of distinct flags
+        initial ({node ID: score}, e.g. a previous run's scores) warm-starts the power iteration
+        Returns {node ID: risk} scaled so the riskiest node is 1 (zero scores are left out)
+        """
+        node_ids = [node['id'] for node in self.nodes]
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+        src, dst = array('q'), array('q')
+        for edge in self.edges:
+            u = position.get(edge['from'])
+            v = position.get(edge['to'])
+            if u is not None and v is not None:
+                src.append(u)
+                dst.append(v)
+
+        seeds = np.zeros(len(node_ids))
+        for i, node in enumerate(self.nodes):
+            if isinstance(node.get('info'), dict) and 'name' in node['info']:
+                flags = self.fraud_flags.get(self._person_name(node))
+                if flags:
+                    seeds[i] = len(set(flags))
+
+        start = None
+        if initial:
+            start = np.array([initial.get(node_id, 0.0) for node_id in node_ids])
+        transition, dangling = transition_matrix(len(node_ids), np.frombuffer(src, dtype=np.int64),
+                                                 np.frombuffer(dst, dtype=np.int64))
+        scores, iterations, converged = personalized_pagerank(
+            transition, dangling, seeds, damping, start, max_iterations)
+        self.risk_stats = {'seeds': int(np.count_nonzero(seeds)), 'damping': damping,
+                           'iterations': iterations, 'converged': converged}
+
+        if scores.max(initial=0) > 0:
+            scores = np.round(scores / scores.max(), 6)
+        return {node_id: score for node_id, score in zip(node_ids, scores.tolist()) if score > 0}
+
+    def flag_rows(self, findings, risk_scores=None):
+        """
+        One (entity name, entity ID, flag, severity, metric, risk) row per distinct flag of every
+        flagged entity, for the flag table. Severity and metric come from the entity's finding
+        (a person's REPEATED_CAR row from the busiest car they rode in), the entity ID is its
+        first node (-1 if it has none) and risk is the highest risk score over its nodes
+        """
+        by_entity = {}
+        for items in findings.values():
+            for item in items:
+                metric = FLAG_METRICS.get(item['type'])
+                if metric is None or 'name' not in item:
+                    continue
+                value = item[metric]
+                if isinstance(value, list):
+                    value = len(value)
+                by_entity[item['name'], item['type']] = (item['severity'], value)
+        for item in findings.get('repeated_cars', []):
+            for car_node_id in self.car_to_nodes[item['car']]:
+                for participant_id in self.adjacency.predecessors(car_node_id, ('drives', 'isPassenger')):
+                    participant = self.node_dict.get(participant_id)
+                    if participant and isinstance(participant.get('info'), dict):
+                        key = (self._person_name(participant), 'REPEATED_CAR')
+                        if by_entity.get(key, (None, 0))[1] < item['accident_count']:
+                            by_entity[key] = (item['severity'], item['accident_count'])
+
+        risk_scores = risk_scores or {}
+        rows = []
+        for name, flags in self.fraud_flags.items():
+            node_ids = [node['id'] for node in self.person_to_nodes.get(name, [])]
+            risk = max((risk_scores.get(node_id, 0.0) for node_id in node_ids), default=0.0)
+            for flag in dict.fromkeys(flags):
+                severity, metric = by_entity.get((name, flag), ('MEDIUM', 0))
+                rows.append((name, node_ids[0] if node_ids else -1, flag, severity, metric, risk))
+        return rows
+
+    def run_all_detections(self, verbose=True, parallel=False, max_workers=None, metrics_sink=None):
+        """
+        Run all fraud detection algorithms
+        Independent detectors can run concurrently (parallel=True); the suspicious professional
+        pass runs after their flags are merged, and the fraud ring pass after that.
+        Reporting is separate from computation
+        When profiling, self.metrics is passed to metrics_sink (any callable) after the run
+        """
+        detector_metrics = None
+        if self.profile:
+            detector_metrics = self.metrics['detectors'] = {}
+
+        # Time only: detectors trace their own peak memory inside this stage
+        with self._profile_stage('detection', trace_memory=False, parallel=parallel):
+            results = run_detectors(self, parallel=parallel, max_workers=max_workers,
+                                    metrics=detector_metrics)
+
+        all_findings = {key: results[key] for key, _, _, _ in DETECTOR_PLAN}
+        all_findings['statistical_outliers'], self.outlier_stats = results['statistical_outliers']
+
+        if self.profile:
+            self.metrics['detection']['flags_emitted'] = sum(len(flags) for flags in self.fraud_flags.values())
+            if metrics_sink is not None:
+                metrics_sink(self.metrics)
+
+        if verbose:
+            self.print_report(all_findings)
+            if self.profile:
+                self.print_profile()
+        return all_findings, self.fraud_flags
+
+    def print_report(self, all_findings):
+        """Print the console report for findings produced by run_all_detections"""
         print("=" * 80)
         print("INSURANCE FRAUD DETECTION REPORT")
         print("=" * 80)
         print()
 
-        all_findings = {}
-
         # 1. Statistical Outliers
         print("1. STATISTICAL OUTLIER DETECTION (Participants in Multiple Accidents)")
         print("-" * 80)
-        outliers, stats = self.detect_statistical_outliers()
-        all_findings['statistical_outliers'] = outliers
+        outliers = all_findings['statistical_outliers']
+        stats = self.outlier_stats
         print(f"Statistics: Mean={stats['mean']:.2f}, Threshold={stats['threshold']:.2f}, Max={stats['max']}")
         print(f"Found {len(outliers)} suspicious participant(s):")
         for item in outliers:
@@ -304,8 +738,7 @@ class FraudDetector:
         # 2. Time-based Patterns
         print("2. TIME-BASED PATTERN DETECTION (Frequent Accidents)")
         print("-" * 80)
-        time_patterns = self.detect_time_based_patterns(days_window=30)
-        all_findings['time_patterns'] = time_patterns
+        time_patterns = all_findings['time_patterns']
         print(f"Found {len(time_patterns)} suspicious time pattern(s):")
         for item in time_patterns:
             print(f"  - {item['name']}: {item['details']} [{item['severity']}]")
@@ -314,8 +747,7 @@ class FraudDetector:
         # 3. Repeated Cars
         print("3. REPEATED CAR DETECTION (Same Vehicle in Multiple Accidents)")
         print("-" * 80)
-        repeated_cars = self.detect_repeated_cars()
-        all_findings['repeated_cars'] = repeated_cars
+        repeated_cars = all_findings['repeated_cars']
         print(f"Found {len(repeated_cars)} suspicious car(s):")
         for item in repeated_cars:
             print(f"  - {item['car']}: {item['details']} [{item['severity']}]")
@@ -324,8 +756,7 @@ class FraudDetector:
         # 4. Repeated Witnesses
         print("4. REPEATED WITNESS DETECTION")
         print("-" * 80)
-        repeated_witnesses = self.detect_repeated_witnesses()
-        all_findings['repeated_witnesses'] = repeated_witnesses
+        repeated_witnesses = all_findings['repeated_witnesses']
         print(f"Found {len(repeated_witnesses)} suspicious witness(es):")
         for item in repeated_witnesses:
             print(f"  - {item['name']}: {item['details']} [{item['severity']}]")
@@ -334,23 +765,46 @@ class FraudDetector:
         # 5. Role Switching
         print("5. ROLE SWITCHING DETECTION (Driver/Passenger Switch)")
         print("-" * 80)
-        role_switching = self.detect_role_switching()
-        all_findings['role_switching'] = role_switching
+        role_switching = all_findings['role_switching']
         print(f"Found {len(role_switching)} suspicious role switcher(s):")
         for item in role_switching:
             print(f"  - {item['name']}: {item['details']} [{item['severity']}]")
         print()
 
-        # 6. Suspicious Professionals (must run AFTER participant detection)
+        # 6. Suspicious Professionals (computed AFTER participant detection)
         print("6. SUSPICIOUS PROFESSIONAL DETECTION (Doctors/Lawyers with Multiple Suspicious Clients)")
         print("-" * 80)
-        suspicious_professionals = self.detect_suspicious_professionals(min_suspicious_clients=2)
-        all_findings['suspicious_professionals'] = suspicious_professionals
+        suspicious_professionals = all_findings['suspicious_professionals']
         print(f"Found {len(suspicious_professionals)} suspicious professional(s):")
         for item in suspicious_professionals:
             print(f"  - {item['name']} (ID: {item['id']}): {item['details']} [{item['severity']}]")
         print()
 
+        # 7. Fraud Rings (scored with every flag above)
+        print("7. FRAUD RING DETECTION (Groups Sharing Accidents, Cars and Professionals)")
+        print("-" * 80)
+        fraud_rings = all_findings['fraud_rings']
+        print(f"Found {len(fraud_rings)} suspicious ring(s):")
+        for item in fraud_rings:
+            print(f"  - Score {item['score']:.2f}: {item['details']} [{item['severity']}]")
+            print(f"    Members: {', '.join(item['members'])}")
+        print()
+
+        # 8. Co-Participation (pairs and cliques of people who keep turning up together)
+        print("8. CO-PARTICIPATION DETECTION (People Repeatedly in Accidents Together)")
+        print("-" * 80)
+        co_participation = all_findings['co_participation']
+        groups = [item for item in co_participation if item['type'] == 'CO_PARTICIPATION_CLIQUE']
+        pairs = [item for item in co_participation if item['type'] == 'CO_PARTICIPATION']
+        print(f"Found {len(groups)} clique(s) and {len(pairs)} pair(s):")
+        for item in groups:
+            print(f"  - {', '.join(item['names'])}: {item['details']} [{item['severity']}]")
+        for item in pairs[:10]:  # Top 10
+            print(f"  - {' & '.join(item['names'])}: {item['details']} [{item['severity']}]")
+        if len(pairs) > 10:
+            print(f"  ... and {len(pairs) - 10} more pair(s)")
+        print()
+
         # Summary
         print("=" * 80)
         print("SUMMARY")
@@ -368,36 +822,127 @@ class FraudDetector:
                 print(f"  - {name}: {len(flags)} indicators - {', '.join(set(flags))}")
 
         print()
-        return all_findings, self.fraud_flags
+
+    def print_profile(self):
+        """Print the per-stage metrics collected in profile mode"""
+        print("=" * 80)
+        print("PROFILE")
+        print("=" * 80)
+        print(f"{'Stage':<42}{'Time (s)':>10}{'Peak MB':>10}{'Scanned':>10}{'Flags':>8}")
+        for stage, values in iter_stage_metrics(self.metrics):
+            peak = values.get('peak_mb')
+            print(f"{stage:<42}{values.get('seconds', 0):>10.3f}{peak if peak is not None else '-':>10}"
+                  f"{values.get('items_scanned', '-'):>10}{values.get('flags_emitted', '-'):>8}")
+        print()
 
 def main():
-    print("Loading insurance fraud data...")
-    data = parse_js_object_file('/home/user/existing_project/graph_analytics/insurance-fraud-data.json')
+    parser = argparse.ArgumentParser(description="Insurance fraud detection")
+    parser.add_argument('--parallel', action='store_true',
+                        help="run independent detectors concurrently on a process pool")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --parallel (default: one per detector, up to CPU count)")
+    parser.add_argument('--quiet', action='store_true', help="suppress the console report")
+    parser.add_argument('--resolve-entities', action='store_true',
+                        help="merge spelling variants of person names before detection")
+    parser.add_argument('--compact', action='store_true',
+                        help="keep the graph in the columnar GraphStore (far less memory, slower detectors)")
+    parser.add_argument('--profile', action='store_true',
+                        help="record time, peak memory, items scanned and flags emitted per stage "
+                             "into the 'metrics' section of the results")
+    parser.add_argument('--results-format', choices=('json', 'columnar', 'both'), default='both',
+                        help="write the results JSON, the streamed findings JSONL plus flag table, or both")
+    parser.add_argument('--metrics-sink', default=None, metavar='PATH',
+                        help="with --profile, also append one JSON line per stage to this file")
+    parser.add_argument('--start', default=None, metavar='YYYY-MM-DD',
+                        help="analyze only the entities active on or after this date (with their edges)")
+    parser.add_argument('--end', default=None, metavar='YYYY-MM-DD',
+                        help="analyze only the entities active on or before this date (with their edges)")
+    args = parser.parse_args()
 
-    nodes = data['nodesSource']
-    edges = data['edgesSource']
+    print("Loading insurance fraud data...")
+    data_file = '/home/user/existing_project/graph_analytics/insurance-fraud-data.json'
+    nodes, edges = load_graph(data_file, compact=args.compact)
 
     print(f"Loaded {len(nodes)} nodes and {len(edges)} edges")
+    time_slice = None
+    if args.start or args.end:
+        time_slice = TimeIndex.for_graph(nodes, edges).slice(nodes, edges, args.start, args.end)
+        nodes, edges = time_slice.nodes, time_slice.edges
+        print("Time slice {} to {}: {} active nodes and {} edges".format(*time_slice.period, len(nodes), len(edges)))
     print()
 
-    detector = FraudDetector(nodes, edges)
-    findings, fraud_flags = detector.run_all_detections()
-
-    # Save results to JSON
-    output = {
-        'summary': {
-            'total_nodes': len(nodes),
-            'total_edges': len(edges),
-            'suspicious_entities': len(fraud_flags)
-        },
-        'findings': findings,
-        'fraud_flags': {k: list(set(v)) for k, v in fraud_flags.items()}
+    detector = FraudDetector(nodes, edges, resolve_entities=args.resolve_entities, profile=args.profile)
+    if detector.entity_resolver is not None:
+        print(f"Resolved {len(detector.canonical_names)} name variant(s) into "
+              f"{len(detector.entity_resolver.aliases)} canonical name(s)")
+        if detector.entity_resolver.skipped_blocks:
+            print(f"Warning: {detector.entity_resolver.skipped_blocks} name block(s) too large to compare "
+                  f"even after splitting; names in them were not resolved")
+        print()
+    metrics_sink = None
+    if args.metrics_sink:
+        metrics_sink = JsonlMetricsSink(args.metrics_sink, source=os.path.basename(data_file),
+                                        nodes=len(nodes), edges=len(edges))
+    findings, fraud_flags = detector.run_all_detections(verbose=not args.quiet, parallel=args.parallel,
+                                                        max_workers=args.workers, metrics_sink=metrics_sink)
+
+    # Warm-start the risk propagation from the previous run's scores when there are any
+    results_file = '/home/user/existing_project/graph_analytics/fraud_detection_results.json'
+    previous_scores = None
+    flag_table = open_flag_table(results_file)
+    if flag_table is not None:
+        previous_scores = flag_table.risk_scores()
+    elif os.path.exists(results_file):
+        with open(results_file, 'r') as f:
+            previous_scores = {int(node_id): score
+                               for node_id, score in json.load(f).get('risk_scores', {}).items()}
+    risk_scores = detector.compute_risk_scores(initial=previous_scores)
+    print(f"Risk propagation: {detector.risk_stats['iterations']} iteration(s) from "
+          f"{detector.risk_stats['seeds']} flagged node(s)")
+
+    summary = {
+        'total_nodes': len(nodes),
+        'total_edges': len(edges),
+        'suspicious_entities': len(fraud_flags)
     }
+    if time_slice is not None:
+        summary['time_slice'] = dict(zip(('start', 'end'), time_slice.period))
 
-    with open('/home/user/existing_project/graph_analytics/fraud_detection_results.json', 'w') as f:
-        json.dump(output, f, indent=2)
-
-    print("Results saved to: fraud_detection_results.json")
+    # Save results to JSON
+    if args.results_format in ('json', 'both'):
+        output = {
+            'summary': summary,
+            'findings': findings,
+            'fraud_flags': {k: list(set(v)) for k, v in fraud_flags.items()},
+            'risk_scores': risk_scores,
+            'risk_propagation': detector.risk_stats
+        }
+        if args.profile:
+            output['metrics'] = detector.metrics
+        if detector.entity_resolver is not None:
+            output['entity_aliases'] = detector.canonical_names  # variant -> canonical name
+
+        # Temp file + rename, so a running explorer never reloads a half-written file
+        tmp_path = f"{results_file}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(output, f, indent=2)
+        os.replace(tmp_path, results_file)
+
+        print("Results saved to: fraud_detection_results.json")
+
+    # Streamed findings and the flag table, for readers that need only some columns or rows
+    # (written after the JSON: readers only trust a flag table at least as new as the JSON)
+    if args.results_format in ('columnar', 'both'):
+        findings_path, flags_path = results_paths(results_file)
+        write_findings_jsonl(findings_path, findings)
+        counts, type_counts = finding_counts(findings)
+        meta = {'summary': summary, 'finding_counts': counts, 'type_counts': type_counts,
+                'risk_propagation': detector.risk_stats}
+        if detector.entity_resolver is not None:
+            meta['entity_aliases'] = detector.canonical_names
+        write_flag_table(flags_path, detector.flag_rows(findings, risk_scores), risk_scores, meta)
+        print(f"Findings streamed to: {os.path.basename(findings_path)}")
+        print(f"Flag table saved to: {os.path.basename(flags_path)}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Typed CSR Adjacency Index
+Forward and reverse compressed-sparse-row arrays per edge type, built in one pass,
+so neighbor lookups cost O(degree) instead of a scan over every edge
+"""
+
+import numpy as np
+
+EDGE_TYPES = ('involves', 'drives', 'isPassenger', 'represents', 'heals', 'witnesses')
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def int64_ids(values):
+    """values as an int64 array if every one is an integer that fits, else None"""
+    if not isinstance(values, np.ndarray) or values.dtype == object:
+        values = list(values)
+        if not all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in values):
+            return None
+        if values and not INT64_MIN <= min(values) <= max(values) <= INT64_MAX:
+            return None
+        return np.array(values, dtype=np.int64)
+    if values.dtype.kind == 'i' or (values.dtype.kind == 'u' and (not len(values) or values.max() <= INT64_MAX)):
+        return values.astype(np.int64, copy=False)
+    return None
+
+class CSR:
+    """Compressed sparse rows: neighbors of row i are indices[indptr[i]:indptr[i + 1]]"""
+
+    def __init__(self, indptr, indices, edge_index):
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_index = edge_index  # Position of each entry in the original edge list
+
+    @classmethod
+    def build(cls, rows, cols, edge_index, num_rows):
+        # Stable sort keeps each row's entries in original edge order
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(num_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+        return cls(indptr, cols[order].astype(np.int32), edge_index[order])
+
+    def row(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.edge_index[start:end]
+
+    def degree(self):
+        return np.diff(self.indptr)
+
+class AdjacencyIndex:
+    """
+    Forward (from -> to) and reverse (to -> from) CSR per edge type
+    Node IDs are mapped to dense positions; IDs referenced only by edges get positions too.
+    Integer IDs are mapped with sorted arrays, any other hashable IDs through a dict
+    Edges appended later with add_edges() live in a small per-node overlay until compact()
+    folds them into the CSR arrays
+    """
+
+    def __init__(self, node_ids, edge_from, edge_to, edge_type_codes, edge_types):
+        edge_type_codes = np.asarray(edge_type_codes)
+        self.edge_types = list(edge_types)
+
+        int_ids = [int64_ids(values) for values in (node_ids, edge_from, edge_to)]
+        if all(values is not None for values in int_ids):
+            node_ids, edge_from, edge_to = int_ids
+            self.ids = np.unique(np.concatenate([node_ids, edge_from, edge_to]))
+            self.position = dict(zip(self.ids.tolist(), range(len(self.ids))))
+            src = np.searchsorted(self.ids, edge_from).astype(np.int32)
+            dst = np.searchsorted(self.ids, edge_to).astype(np.int32)
+        else:
+            # Non-integer IDs (the text parser keeps whatever the file holds): positions in first-seen order
+            edge_from, edge_to = list(edge_from), list(edge_to)
+            self.position = {}
+            for values in (node_ids, edge_from, edge_to):
+                for node_id in values:
+                    self.position.setdefault(node_id, len(self.position))
+            self.ids = np.empty(len(self.position), dtype=object)
+            for node_id, pos in self.position.items():
+                self.ids[pos] = node_id
+            src = np.fromiter((self.position[node_id] for node_id in edge_from), dtype=np.int32, count=len(edge_from))
+            dst = np.fromiter((self.position[node_id] for node_id in edge_to), dtype=np.int32, count=len(edge_to))
+        self.num_edges = len(edge_from)
+        num_rows = len(self.ids)
+
+        # Appended edges: edge type -> node ID -> [(edge index, neighbor ID)]
+        self.forward_overlay = {}
+        self.reverse_overlay = {}
+        self.overlay_edges = 0
+
+        self.forward = {}
+        self.reverse = {}
+        for code, edge_type in enumerate(self.edge_types):
+            edge_index = np.flatnonzero(edge_type_codes == code)
+            self.forward[edge_type] = CSR.build(src[edge_index], dst[edge_index], edge_index, num_rows)
+            self.reverse[edge_type] = CSR.build(dst[edge_index], src[edge_index], edge_index, num_rows)
+
+    @classmethod
+    def from_records(cls, nodes, edges):
+        """Build from the node/edge dict lists produced by graph_loader"""
+        edge_types = list(EDGE_TYPES)
+        type_codes = {t: i for i, t in enumerate(edge_types)}
+        codes = []
+        for edge in edges:
+            code = type_codes.get(edge['type'])
+            if code is None:
+                code = type_codes[edge['type']] = len(edge_types)
+                edge_types.append(edge['type'])
+            codes.append(code)
+
+        return cls([node['id'] for node in nodes],
+                   [edge['from'] for edge in edges],
+                   [edge['to'] for edge in edges],
+                   np.array(codes, dtype=np.int32),
+                   edge_types)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build directly from the typed columns of a GraphSnapshot (or GraphStore)"""
+        return cls(snapshot.node_id, snapshot.edge_from, snapshot.edge_to,
+                   snapshot.edge_type, snapshot.edge_types)
+
+    def _types(self, edge_types):
+        if edge_types is None:
+            return self.edge_types
+        if isinstance(edge_types, str):
+            return (edge_types,)
+        return edge_types
+
+    def add_edges(self, edges):
+        """Append edges (dicts with from/to/type); their indices continue after the existing ones"""
+        for edge in edges:
+            edge_index = self.num_edges
+            self.num_edges += 1
+            if edge['type'] not in self.edge_types:
+                self.edge_types.append(edge['type'])
+            self.forward_overlay.setdefault(edge['type'], {}).setdefault(edge['from'], []).append(
+                (edge_index, edge['to']))
+            self.reverse_overlay.setdefault(edge['type'], {}).setdefault(edge['to'], []).append(
+                (edge_index, edge['from']))
+            self.overlay_edges += 1
+
+    def compact(self):
+        """Fold the add_edges() overlay into the CSR arrays (a full rebuild; edge indices are kept)"""
+        if not self.overlay_edges:
+            return
+        edge_from = np.empty(self.num_edges, dtype=object)
+        edge_to = np.empty(self.num_edges, dtype=object)
+        codes = np.zeros(self.num_edges, dtype=np.int32)
+        for code, edge_type in enumerate(self.edge_types):
+            csr = self.forward.get(edge_type)
+            if csr is not None:
+                rows = np.repeat(np.arange(len(csr.indptr) - 1), np.diff(csr.indptr))
+                edge_from[csr.edge_index] = self.ids[rows]
+                edge_to[csr.edge_index] = self.ids[csr.indices]
+                codes[csr.edge_index] = code
+            for source, pairs in self.forward_overlay.get(edge_type, {}).items():
+                for edge_index, target in pairs:
+                    edge_from[edge_index] = source
+                    edge_to[edge_index] = target
+                    codes[edge_index] = code
+        self.__init__(self.ids, edge_from, edge_to, codes, self.edge_types)
+
+    def _neighbor_edges(self, csr_by_type, overlay_by_type, node_id, edge_types):
+        """(edge index, neighbor ID) pairs in original edge order"""
+        pos = self.position.get(node_id)
+        index_parts = []
+        neighbor_parts = []
+        overlay = []
+        for edge_type in self._types(edge_types):
+            csr = csr_by_type.get(edge_type)
+            if csr is not None and pos is not None:
+                neighbors, edge_index = csr.row(pos)
+                if len(neighbors):
+                    neighbor_parts.append(neighbors)
+                    index_parts.append(edge_index)
+            overlay.extend(overlay_by_type.get(edge_type, {}).get(node_id, ()))
+
+        if len(neighbor_parts) == 1:
+            pairs = list(zip(index_parts[0].tolist(), self.ids[neighbor_parts[0]].tolist()))
+        elif neighbor_parts:
+            edge_index = np.concatenate(index_parts)
+            neighbors = np.concatenate(neighbor_parts)
+            order = np.argsort(edge_index, kind='stable')
+            pairs = list(zip(edge_index[order].tolist(), self.ids[neighbors[order]].tolist()))
+        else:
+            pairs = []
+
+        if overlay:
+            # Overlay edges always come after CSR edges; only their mutual order needs fixing
+            overlay.sort()
+            pairs.extend(overlay)
+        return pairs
+
+    def out_edges(self, node_id, edge_types=None):
+        """(edge index, target ID) for edges leaving node_id"""
+        return self._neighbor_edges(self.forward, self.forward_overlay, node_id, edge_types)
+
+    def in_edges(self, node_id, edge_types=None):
+        """(edge index, source ID) for edges entering node_id"""
+        return self._neighbor_edges(self.reverse, self.reverse_overlay, node_id, edge_types)
+
+    def successors(self, node_id, edge_types=None):
+        """Target IDs of edges leaving node_id (optionally restricted to edge types)"""
+        return [target for _, target in self.out_edges(node_id, edge_types)]
+
+    def predecessors(self, node_id, edge_types=None):
+        """Source IDs of edges entering node_id (optionally restricted to edge types)"""
+        return [source for _, source in self.in_edges(node_id, edge_types)]
+
+    def _degree(self, csr_by_type, overlay_by_type, node_id, edge_types):
+        pos = self.position.get(node_id)
+        degree = 0
+        for edge_type in self._types(edge_types):
+            csr = csr_by_type.get(edge_type)
+            if csr is not None and pos is not None:
+                degree += int(csr.indptr[pos + 1] - csr.indptr[pos])
+            degree += len(overlay_by_type.get(edge_type, {}).get(node_id, ()))
+        return degree
+
+    def out_degree(self, node_id, edge_types=None):
+        return self._degree(self.forward, self.forward_overlay, node_id, edge_types)
+
+    def in_degree(self, node_id, edge_types=None):
+        return self._degree(self.reverse, self.reverse_overlay, node_id, edge_types)
+
+    def ego_network(self, node_id, hops=1, edge_types=None, limit=None):
+        """
+        Bounded breadth-first walk out to hops, following edges in either direction
+        Stops adding nodes once limit is reached. Returns ({node ID: hop distance},
+        [edge indices between those nodes, in edge order], truncated)
+        """
+        distances = {node_id: 0}
+        frontier = [node_id]
+        truncated = False
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for current in frontier:
+                for _, neighbor in self.out_edges(current, edge_types) + self.in_edges(current, edge_types):
+                    if neighbor in distances:
+                        continue
+                    if limit is not None and len(distances) >= limit:
+                        truncated = True
+                        break
+                    distances[neighbor] = hop
+                    next_frontier.append(neighbor)
+                if truncated:
+                    break
+            if truncated or not next_frontier:
+                break
+            frontier = next_frontier
+
+        edge_indices = sorted(edge_index for current in distances
+                              for edge_index, target in self.out_edges(current, edge_types)
+                              if target in distances)
+        return distances, edge_indices, truncated
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Scalable Graph Layout
+Multilevel force-directed layout on NumPy arrays (coarsen by edge matching, refine level by
+level, repulsion approximated on a grid via FFT), with warm starts from earlier positions.
+The global layout is persisted next to the data file, keyed by the source file's fingerprint,
+so views only look positions up
+"""
+
+import io
+import json
+import os
+
+import networkx as nx
+import numpy as np
+
+from graph_snapshot import refreshed_fingerprint, source_fingerprint
+
+LAYOUT_SUFFIX = '.layout.npz'
+SPRING_MAX_NODES = 500  # Larger graphs use the multilevel engine; nx.spring_layout is O(n^2) per iteration
+LAYOUT_PARAMS = {'algorithm': 'auto', 'k': 0.5, 'iterations': 50, 'seed': 42,
+                 'spring_max_nodes': SPRING_MAX_NODES}
+
+COARSEST_NODES = 200  # Coarsening stops below this many nodes...
+MIN_COARSENING = 0.9  # ...or when a level keeps more than this share of the nodes
+MAX_GRID = 1024  # Repulsion grid cells per side
+GRAVITY = 0.5  # Pull toward the center; keeps disconnected components together
+WARM_TEMPERATURE = 0.02  # Starting step (share of the layout extent) when refining given positions
+
+def layout_path(source_path):
+    """Location of the layout cache for a given source file"""
+    return source_path + LAYOUT_SUFFIX
+
+_KERNELS = {}
+
+def _repulsion_kernel(m):
+    """FFTs of the repulsion field r/|r|^2 (in cell units) on a 2m x 2m grid, for linear convolution"""
+    kernel = _KERNELS.get(m)
+    if kernel is None:
+        offsets = np.fft.fftfreq(2 * m, 1 / (2 * m))
+        dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+        r2 = dx * dx + dy * dy
+        r2[0, 0] = 1.0
+        kx, ky = dx / r2, dy / r2
+        kx[0, 0] = ky[0, 0] = 0.0
+        kernel = _KERNELS[m] = (np.fft.rfft2(kx), np.fft.rfft2(ky))
+    return kernel
+
+def _grid_size(n):
+    return int(min(MAX_GRID, max(16, 2 ** int(np.ceil(np.log2(np.sqrt(n)))))))
+
+def _repulsion(pos, mass, m):
+    """
+    Fruchterman-Reingold repulsion (k = 1) on every node from every other, per unit mass
+    Masses are spread over an m x m grid (cloud-in-cell), convolved with the force kernel by FFT
+    and interpolated back, so the cost is O(n + m^2 log m) instead of O(n^2)
+    """
+    low = pos.min(axis=0)
+    h = max(float((pos.max(axis=0) - low).max()), 1e-9) / (m - 3)
+    cell = (pos - low) / h + 1.0
+    corner = np.clip(cell.astype(np.int64), 0, m - 2)
+    fx, fy = (cell - corner).T
+    size = 2 * m
+    base = corner[:, 0] * size + corner[:, 1]
+    index = np.concatenate([base, base + size, base + 1, base + size + 1])
+    weight = np.concatenate([(1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy])
+
+    grid = np.bincount(index, weight * np.tile(mass, 4), minlength=size * size).reshape(size, size)
+    spectrum = np.fft.rfft2(grid)
+    kernel_x, kernel_y = _repulsion_kernel(m)
+    force = np.empty_like(pos)
+    for axis, kernel in ((0, kernel_x), (1, kernel_y)):
+        field = np.fft.irfft2(spectrum * kernel, s=grid.shape).ravel()
+        force[:, axis] = (field[index] * weight).reshape(4, -1).sum(axis=0) / h
+    return force
+
+def _refine(pos, mass, src, dst, iterations, temperature):
+    """Force-directed iterations with a linearly cooling step limit"""
+    n = len(pos)
+    m = _grid_size(n)
+    center = (mass[:, None] * pos).sum(axis=0) / mass.sum()
+    for i in range(iterations):
+        disp = _repulsion(pos, mass, m)
+
+        delta = pos[dst] - pos[src]
+        pull = delta * np.hypot(delta[:, 0], delta[:, 1])[:, None]  # FR attraction d^2 / k
+        for axis in (0, 1):
+            disp[:, axis] += (np.bincount(src, pull[:, axis], minlength=n)
+                              - np.bincount(dst, pull[:, axis], minlength=n)) / mass
+        disp -= GRAVITY * (pos - center)
+
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        step = temperature * (1 - i / iterations)
+        pos += disp * (np.minimum(length, step) / length)[:, None]
+    return pos
+
+def _coarsen(n, src, dst, rng):
+    """
+    Cluster of each node for the next coarser level: nodes whose heaviest (random-weight) edge is
+    mutual pair up, and nodes pointing at a paired node join that pair (folds stars and leaves)
+    """
+    cluster = np.arange(n)
+    if len(src):
+        weight = rng.random(len(src))
+        a = np.concatenate([src, dst])
+        b = np.concatenate([dst, src])
+        order = np.lexsort((-np.concatenate([weight, weight]), a))
+        a, b = a[order], b[order]
+        first = np.ones(len(a), dtype=bool)
+        first[1:] = a[1:] != a[:-1]
+        choice = np.full(n, -1)
+        choice[a[first]] = b[first]
+
+        nodes = np.arange(n)
+        has_choice = choice >= 0
+        mutual = has_choice & (choice[np.maximum(choice, 0)] == nodes)
+        cluster[mutual] = np.minimum(nodes, choice)[mutual]
+        joins = has_choice & ~mutual & mutual[np.maximum(choice, 0)]
+        cluster[joins] = cluster[choice[joins]]
+    return np.unique(cluster, return_inverse=True)[1]
+
+def _coarse_edges(cluster, src, dst):
+    a, b = cluster[src], cluster[dst]
+    keep = a != b
+    pairs = np.unique(np.stack([np.minimum(a, b)[keep], np.maximum(a, b)[keep]], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+def _edge_arrays(node_ids, edge_pairs):
+    """Dense position arrays of the distinct undirected edges between listed nodes"""
+    ids = np.asarray(node_ids, dtype=np.int64)
+    order = np.argsort(ids, kind='stable')
+    pairs = np.asarray(list(edge_pairs), dtype=np.int64).reshape(-1, 2)
+    src = order[np.clip(np.searchsorted(ids, pairs[:, 0], sorter=order), 0, max(len(ids) - 1, 0))]
+    dst = order[np.clip(np.searchsorted(ids, pairs[:, 1], sorter=order), 0, max(len(ids) - 1, 0))]
+    keep = (ids[src] == pairs[:, 0]) & (ids[dst] == pairs[:, 1]) & (src != dst)
+    return _coarse_edges(np.arange(len(ids)), src[keep], dst[keep])
+
+def _warm_positions(node_ids, initial, src, dst, radius, rng):
+    """Scale given positions to the layout radius; place new nodes at their placed neighbors' mean"""
+    n = len(node_ids)
+    pos = np.zeros((n, 2))
+    known = np.zeros(n, dtype=bool)
+    for i, node_id in enumerate(node_ids):
+        point = initial.get(node_id)
+        if point is not None:
+            pos[i] = point
+            known[i] = True
+    if known.any():
+        pos[known] -= pos[known].mean(axis=0)
+        pos[known] *= radius / max(float(np.abs(pos[known]).max()), 1e-9)
+
+    a = np.concatenate([src, dst])
+    b = np.concatenate([dst, src])
+    placed = known[b] & ~known[a]
+    count = np.bincount(a[placed], minlength=n)
+    for axis in (0, 1):
+        total = np.bincount(a[placed], pos[b[placed], axis], minlength=n)
+        pos[count > 0, axis] = total[count > 0] / count[count > 0]
+    rest = ~known
+    pos[rest] += rng.normal(scale=1.0, size=(int(rest.sum()), 2))
+    pos[rest & (count == 0)] = rng.uniform(-radius, radius, size=(int((rest & (count == 0)).sum()), 2))
+    return pos
+
+def force_directed_layout(node_ids, edge_pairs, iterations=50, seed=42, initial=None):
+    """
+    Multilevel force-directed layout; returns {node ID: (x, y)} scaled into [-1, 1]
+    Without initial positions the graph is coarsened down to a few hundred nodes, laid out, and
+    refined level by level. With initial ({node ID: (x, y)}, e.g. a previous layout) those
+    positions are kept as the start and only a gentle refinement runs at full resolution
+    """
+    node_ids = list(node_ids)
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    src, dst = _edge_arrays(node_ids, edge_pairs)
+    radius = np.sqrt(n / GRAVITY)  # Where gravity balances the repulsion of n unit masses
+
+    if initial:
+        pos = _warm_positions(node_ids, initial, src, dst, radius, rng)
+        pos = _refine(pos, np.ones(n), src, dst, iterations, WARM_TEMPERATURE * 2 * radius)
+    else:
+        levels = [(np.ones(n), src, dst)]
+        clusters = []
+        while len(levels[-1][0]) > COARSEST_NODES:
+            mass, level_src, level_dst = levels[-1]
+            cluster = _coarsen(len(mass), level_src, level_dst, rng)
+            coarse_n = int(cluster.max()) + 1
+            if coarse_n > MIN_COARSENING * len(mass):
+                break
+            clusters.append(cluster)
+            levels.append((np.bincount(cluster, mass, minlength=coarse_n),
+                           *_coarse_edges(cluster, level_src, level_dst)))
+
+        mass, level_src, level_dst = levels[-1]
+        pos = rng.uniform(-radius, radius, size=(len(mass), 2))
+        pos = _refine(pos, mass, level_src, level_dst, iterations * 2, 0.1 * 2 * radius)
+        for cluster, (mass, level_src, level_dst) in zip(reversed(clusters), reversed(levels[:-1])):
+            pos = pos[cluster] + rng.normal(scale=0.5, size=(len(cluster), 2))
+            pos = _refine(pos, mass, level_src, level_dst, iterations, 0.02 * 2 * radius)
+
+    pos -= pos.mean(axis=0)
+    pos /= max(float(np.abs(pos).max()), 1e-9)
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(node_ids, pos)}
+
+def graph_layout(G, k=None, iterations=50, seed=42, initial=None, spring_max_nodes=SPRING_MAX_NODES):
+    """
+    Positions for a networkx graph: nx.spring_layout up to spring_max_nodes (warm-started from
+    initial when given), the multilevel engine above that
+    """
+    if len(G) <= spring_max_nodes:
+        start = None
+        if initial:
+            start = {node_id: initial[node_id] for node_id in G if node_id in initial} or None
+        return nx.spring_layout(G, k=k, pos=start, iterations=iterations, seed=seed)
+    return force_directed_layout(G.nodes(), G.edges(), iterations=iterations, seed=seed, initial=initial)
+
+def compute_layout(nodes, edges, params=LAYOUT_PARAMS, initial=None):
+    """Layout of the full graph, optionally warm-started from earlier positions; returns {node ID: (x, y)}"""
+    G = nx.Graph()
+    G.add_nodes_from(node['id'] for node in nodes)
+    G.add_edges_from((edge['from'], edge['to']) for edge in edges
+                     if edge['from'] in G and edge['to'] in G)
+    pos = graph_layout(G, k=params['k'], iterations=params['iterations'], seed=params['seed'],
+                       initial=initial, spring_max_nodes=params.get('spring_max_nodes', SPRING_MAX_NODES))
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in pos.items()}
+
+def save_layout(path, positions, source, params=LAYOUT_PARAMS):
+    """Write positions as ID/coordinate arrays (temp file + rename)"""
+    ids = np.fromiter(positions.keys(), dtype=np.int64, count=len(positions))
+    xy = np.array(list(positions.values()), dtype=np.float64).reshape(-1, 2)
+    meta = json.dumps({'source': source, 'params': params})
+
+    buffer = io.BytesIO()
+    np.savez(buffer, ids=ids, xy=xy, meta=np.array(meta))
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+def _read_layout(path):
+    """(meta, positions) stored at path, or None if missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            ids = data['ids'].tolist()
+            xy = data['xy'].tolist()
+    except (OSError, ValueError, KeyError):
+        return None
+    return meta, {node_id: tuple(point) for node_id, point in zip(ids, xy)}
+
+def _current_positions(source_path, meta, positions):
+    """Stored positions if they were computed from the current data (re-stamping a moved mtime), else None"""
+    cached = meta.get('source', {})
+    source = refreshed_fingerprint(cached, source_path)
+    if source is None:
+        return None
+    if source is not cached:
+        try:
+            save_layout(layout_path(source_path), positions, source, meta.get('params'))
+        except OSError as e:
+            print(f"Warning: could not refresh graph layout fingerprint ({e})")
+    return positions
+
+def load_layout(source_path, params=LAYOUT_PARAMS):
+    """Cached positions for a source file if still valid (same data and parameters), else None"""
+    stored = _read_layout(layout_path(source_path))
+    if stored is None:
+        return None
+    meta, positions = stored
+    if meta.get('params') != params:
+        return None
+    return _current_positions(source_path, meta, positions)
+
+def load_or_compute_layout(source_path, nodes, edges, params=LAYOUT_PARAMS):
+    """
+    Global layout for a data file, computed and persisted on first use
+    When the data changed since the cached layout, the old positions warm-start the new one
+    """
+    stored = _read_layout(layout_path(source_path))
+    initial = None
+    if stored is not None:
+        meta, positions = stored
+        if meta.get('params') == params:
+            current = _current_positions(source_path, meta, positions)
+            if current is not None:
+                return current
+            initial = positions
+
+    print("Computing global graph layout (cached for later runs)...")
+    positions = compute_layout(nodes, edges, params, initial=initial)
+    try:
+        save_layout(layout_path(source_path), positions, source_fingerprint(source_path), params)
+    except OSError as e:
+        print(f"Warning: could not write graph layout ({e})")
+    return positions
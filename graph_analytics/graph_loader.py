@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Streaming Loader for Insurance Claim Graph Data
+Tokenizes the JavaScript-object export (nodesSource/edgesSource) incrementally
+so that arbitrarily large files can be read with constant memory
+"""
+
+import re
+
+CHUNK_SIZE = 1 << 20  # Characters read from disk per refill
+LOOKAHEAD = 32  # Characters kept past a token so numbers/identifiers are never cut at a refill
+
+GRAPH_SECTIONS = ('nodesSource', 'edgesSource')
+
+# One token, preceded by any whitespace or JS comments
+_TOKEN_RE = re.compile(r"""
+    (?:\s+|//[^\n]*\n|/\*.*?\*/)*
+    (?:
+        (?P<punct>[{}\[\]:,])
+      | '(?P<sq>(?:[^'\\]|\\.)*)'
+      | "(?P<dq>(?:[^"\\]|\\.)*)"
+      | (?P<num>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<ident>[A-Za-z_$][\w$]*)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_TRAILING_SPACE_RE = re.compile(r"(?:\s+|//[^\n]*(?:\n|$)|/\*.*?\*/)*\Z", re.DOTALL)
+
+_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+_IDENT_VALUES = {'true': True, 'false': False, 'null': None, 'undefined': None}
+
+def _unescape(match):
+    """Decode a single JS string escape sequence"""
+    seq = match.group(1)
+    if seq[0] in 'ux' and len(seq) > 1:
+        return chr(int(seq[1:], 16))
+    return _SIMPLE_ESCAPES.get(seq, seq)
+
+class _Tokenizer:
+    """Pull tokens from a text file, refilling a bounded buffer as needed"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _refill(self):
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+
+    def next(self):
+        """Return the next ``(kind, value)`` token, or ``(None, None)`` at end of input"""
+        while True:
+            match = _TOKEN_RE.match(self.buf, self.pos)
+            # A token near the end of the buffer may be truncated; read more first
+            if (match is None or match.end() + LOOKAHEAD > len(self.buf)) and not self.eof:
+                self._refill()
+                continue
+            if match is None:
+                if _TRAILING_SPACE_RE.match(self.buf, self.pos):
+                    return None, None
+                snippet = self.buf[self.pos:self.pos + 40]
+                raise ValueError(f"Unexpected input near: {snippet!r}")
+
+            self.pos = match.end()
+            kind = match.lastgroup
+            if kind == 'punct':
+                return match.group('punct'), None
+            if kind in ('sq', 'dq'):
+                text = match.group(kind)
+                if '\\' in text:
+                    text = _ESCAPE_RE.sub(_unescape, text)
+                return 'str', text
+            if kind == 'num':
+                text = match.group('num')
+                if any(c in text for c in '.eE'):
+                    return 'num', float(text)
+                return 'num', int(text)
+            return 'ident', match.group('ident')
+
+def _expect(tokenizer, expected):
+    kind, _ = tokenizer.next()
+    if kind != expected:
+        raise ValueError(f"Expected '{expected}' but found {kind!r}")
+
+def _parse_key(kind, value):
+    if kind in ('str', 'ident'):
+        return value
+    if kind == 'num':
+        return str(value)
+    raise ValueError(f"Invalid object key token: {kind!r}")
+
+def _parse_value(tokenizer, kind, value):
+    """Parse one complete JS value whose first token has already been read"""
+    if kind == '{':
+        obj = {}
+        while True:
+            kind, value = tokenizer.next()
+            if kind == '}':
+                return obj
+            key = _parse_key(kind, value)
+            _expect(tokenizer, ':')
+            obj[key] = _parse_value(tokenizer, *tokenizer.next())
+            kind, _ = tokenizer.next()
+            if kind == '}':
+                return obj
+            if kind != ',':
+                raise ValueError(f"Expected ',' or '}}' in object but found {kind!r}")
+
+    if kind == '[':
+        return list(_iter_array(tokenizer))
+
+    if kind in ('str', 'num'):
+        return value
+    if kind == 'ident':
+        if value not in _IDENT_VALUES:
+            raise ValueError(f"Unsupported identifier value: {value!r}")
+        return _IDENT_VALUES[value]
+    if kind is None:
+        raise ValueError("Unexpected end of input")
+    raise ValueError(f"Unexpected token: {kind!r}")
+
+def _iter_array(tokenizer):
+    """Yield the elements of an array whose opening '[' has already been read"""
+    while True:
+        kind, value = tokenizer.next()
+        if kind == ']':
+            return
+        yield _parse_value(tokenizer, kind, value)
+        kind, _ = tokenizer.next()
+        if kind == ']':
+            return
+        if kind != ',':
+            raise ValueError(f"Expected ',' or ']' in array but found {kind!r}")
+
+def iter_graph_file(filepath, sections=GRAPH_SECTIONS):
+    """
+    Stream records from a nodesSource/edgesSource JS-object file
+    Yields (section, record) pairs one at a time; only one record is held in memory
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        tokenizer = _Tokenizer(f)
+        _expect(tokenizer, '{')
+
+        while True:
+            kind, value = tokenizer.next()
+            if kind == '}':
+                break
+            key = _parse_key(kind, value)
+            _expect(tokenizer, ':')
+
+            kind, value = tokenizer.next()
+            if key in sections and kind == '[':
+                for record in _iter_array(tokenizer):
+                    yield key, record
+            else:
+                # Parse and discard sections we were not asked for
+                _parse_value(tokenizer, kind, value)
+
+            kind, _ = tokenizer.next()
+            if kind == '}':
+                break
+            if kind != ',':
+                raise ValueError(f"Expected ',' or '}}' at top level but found {kind!r}")
+
+def load_graph(filepath, use_snapshot=True, compact=False):
+    """
+    Load all nodes and edges from a graph data file into lists
+    With use_snapshot, the compiled binary snapshot next to the file is used
+    (and written on first load) instead of re-parsing the text; its lists decode
+    each record on first access
+    With compact, nodes and edges are read-only dict-like views over a columnar
+    GraphStore instead of dicts (falls back to lists if the data cannot be compacted)
+    """
+    if use_snapshot or compact:
+        from graph_snapshot import SnapshotUnsupported, load_or_build_snapshot
+        try:
+            if compact:
+                from graph_store import GraphStore
+                store = GraphStore.load(filepath)
+                return store.nodes, store.edges
+            return load_or_build_snapshot(filepath).to_records()
+        except SnapshotUnsupported:
+            pass
+
+    nodes = []
+    edges = []
+    for section, record in iter_graph_file(filepath):
+        if section == 'nodesSource':
+            nodes.append(record)
+        else:
+            edges.append(record)
+    return nodes, edges
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Level-of-Detail Supernode Hierarchy
+Collapses the graph into accident clusters (and, for very large graphs, spatial regions of
+clusters) with aggregated counts and fraud density, so a view only ever holds the markers
+of the supernodes and the few clusters that were expanded
+"""
+
+import numpy as np
+
+from graph_index import int64_ids
+
+MAX_MARKERS = 2000  # Upper bound on markers in one view
+
+def accident_clusters(is_accident, src, dst):
+    """
+    Cluster of every node: the accident it is nearest to (multi-source BFS over edges in either
+    direction, lowest node index wins ties); nodes reaching no accident share one extra cluster
+    Returns (cluster per node, node index of each cluster's accident, -1 for the extra cluster)
+    """
+    n = len(is_accident)
+    roots = np.flatnonzero(is_accident)
+    owner = np.full(n, -1, dtype=np.int64)
+    owner[roots] = np.arange(len(roots))
+
+    a = np.concatenate([src, dst])
+    b = np.concatenate([dst, src])
+    order = np.argsort(a, kind='stable')
+    neighbors = b[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(a, minlength=n), out=indptr[1:])
+
+    frontier = roots
+    while len(frontier):
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        reached = neighbors[np.repeat(starts, counts) + offsets]
+        reached_owner = np.repeat(owner[frontier], counts)
+        new = owner[reached] < 0
+        frontier, first = np.unique(reached[new], return_index=True)
+        owner[frontier] = reached_owner[new][first]
+
+    if (owner < 0).any():
+        owner[owner < 0] = len(roots)
+        roots = np.append(roots, -1)
+    return owner, roots
+
+class LODHierarchy:
+    """
+    Three levels: nodes -> accident clusters -> regions (grid cells over the cluster centroids,
+    only when there are more clusters than fit in one view). Supernode keys are 'C<n>' for
+    clusters and 'R<n>' for regions; view() expands the keys it is given
+    """
+
+    def __init__(self, nodes, edges, layout, fraud_nodes, labels, max_markers=MAX_MARKERS):
+        self.max_markers = max_markers
+        self.node_ids = int64_ids([node['id'] for node in nodes])
+        if self.node_ids is None:  # Non-integer IDs are kept as Python objects
+            self.node_ids = np.empty(len(nodes), dtype=object)
+            self.node_ids[:] = [node['id'] for node in nodes]
+        self.node_types = [node['type'] for node in nodes]
+        self.labels = labels
+        index = {node_id: i for i, node_id in enumerate(self.node_ids.tolist())}
+        pairs = np.array([(index[edge['from']], index[edge['to']]) for edge in edges
+                          if edge['from'] in index and edge['to'] in index], dtype=np.int64).reshape(-1, 2)
+        self.src, self.dst = pairs[:, 0], pairs[:, 1]
+        self.xy = np.array([layout[node_id] for node_id in self.node_ids.tolist()], dtype=np.float64).reshape(-1, 2)
+        self.fraud = np.fromiter((node_id in fraud_nodes for node_id in self.node_ids.tolist()),
+                                 dtype=bool, count=len(self.node_ids))
+
+        is_accident = np.array([node_type == 'Accident' for node_type in self.node_types], dtype=bool)
+        self.cluster, self.cluster_root = accident_clusters(is_accident, self.src, self.dst)
+        self.num_clusters = len(self.cluster_root)
+        self.cluster_size = np.bincount(self.cluster, minlength=self.num_clusters)
+        self.cluster_fraud = np.bincount(self.cluster, self.fraud, minlength=self.num_clusters).astype(np.int64)
+        self.cluster_xy = self._centroids(self.cluster, self.xy, np.ones(len(self.xy)), self.num_clusters)
+
+        self.region = None
+        self.num_regions = 0
+        if self.num_clusters > max_markers // 2:
+            self._build_regions(max_markers // 2)
+
+    @staticmethod
+    def _centroids(group, xy, weight, size):
+        total = np.maximum(np.bincount(group, weight, minlength=size), 1e-12)
+        return np.stack([np.bincount(group, weight * xy[:, axis], minlength=size) / total
+                         for axis in (0, 1)], axis=1)
+
+    def _build_regions(self, target):
+        """Group clusters into at most target non-empty cells of a square grid over their centroids"""
+        side = max(int(np.sqrt(target)), 1)
+        low = self.cluster_xy.min(axis=0)
+        span = np.maximum(self.cluster_xy.max(axis=0) - low, 1e-12)
+        cell = np.minimum(((self.cluster_xy - low) / span * side).astype(np.int64), side - 1)
+        _, self.region = np.unique(cell[:, 0] * side + cell[:, 1], return_inverse=True)
+        self.num_regions = int(self.region.max()) + 1
+        self.region_clusters = np.bincount(self.region, minlength=self.num_regions)
+        self.region_size = np.bincount(self.region, self.cluster_size, minlength=self.num_regions).astype(np.int64)
+        self.region_fraud = np.bincount(self.region, self.cluster_fraud, minlength=self.num_regions).astype(np.int64)
+        self.region_xy = self._centroids(self.region, self.cluster_xy, self.cluster_size, self.num_regions)
+
+    def has_key(self, key):
+        kind, number = key[:1], key[1:]
+        if not number.isdigit():
+            return False
+        if kind == 'C':
+            return int(number) < self.num_clusters
+        return kind == 'R' and int(number) < self.num_regions
+
+    def cluster_of(self, node_id):
+        """Supernode key of the cluster holding a node, or None"""
+        match = np.flatnonzero(self.node_ids == node_id)
+        return f"C{self.cluster[match[-1]]}" if len(match) else None
+
+    def _markers(self, expanded):
+        """Marker of every node: node index, num nodes + cluster, or num nodes + num clusters + region"""
+        n = len(self.node_ids)
+        clusters = np.array(sorted(int(key[1:]) for key in expanded if key.startswith('C')), dtype=np.int64)
+        regions = {int(key[1:]) for key in expanded if key.startswith('R')}
+        marker = n + self.cluster
+        if self.region is not None:
+            regions.update(self.region[clusters].tolist())
+            hidden = ~np.isin(self.region, np.array(sorted(regions), dtype=np.int64))
+            collapsed = hidden[self.cluster]
+            marker[collapsed] = n + self.num_clusters + self.region[self.cluster[collapsed]]
+        open_nodes = np.isin(self.cluster, clusters)
+        marker[open_nodes] = np.flatnonzero(open_nodes)
+        return marker
+
+    def marker_count(self, expanded=()):
+        return len(np.unique(self._markers(expanded)))
+
+    def view(self, expanded=()):
+        """
+        Visible markers and aggregated links for a set of expanded supernode keys
+        Returns (markers, links): markers are dicts with kind ('node', 'cluster', 'region'), key, x, y,
+        size, fraud, label and type; links are (marker a, marker b, edge count) over marker positions
+        """
+        n = len(self.node_ids)
+        marker = self._markers(expanded)
+        visible, position = np.unique(marker, return_inverse=True)
+        node_ids = self.node_ids.tolist()
+
+        markers = []
+        for m in visible.tolist():
+            if m < n:
+                markers.append({'kind': 'node', 'key': node_ids[m], 'x': self.xy[m, 0],
+                                'y': self.xy[m, 1], 'size': 1, 'fraud': int(self.fraud[m]),
+                                'label': self.labels[m], 'type': self.node_types[m],
+                                'cluster': f"C{self.cluster[m]}"})
+            elif m < n + self.num_clusters:
+                c = m - n
+                root = self.cluster_root[c]
+                label = f"{self.labels[root]} cluster" if root >= 0 else "Unattached entities"
+                markers.append({'kind': 'cluster', 'key': f"C{c}", 'x': self.cluster_xy[c, 0],
+                                'y': self.cluster_xy[c, 1], 'size': int(self.cluster_size[c]),
+                                'fraud': int(self.cluster_fraud[c]), 'label': label, 'type': 'Cluster'})
+            else:
+                r = m - n - self.num_clusters
+                markers.append({'kind': 'region', 'key': f"R{r}", 'x': self.region_xy[r, 0],
+                                'y': self.region_xy[r, 1], 'size': int(self.region_size[r]),
+                                'fraud': int(self.region_fraud[r]), 'label': f"Region {r} ({self.region_clusters[r]} clusters)",
+                                'type': 'Region'})
+
+        a, b = position[self.src], position[self.dst]
+        keep = a != b
+        if not keep.any():
+            return markers, []
+        pairs, counts = np.unique(np.stack([np.minimum(a, b)[keep], np.maximum(a, b)[keep]], axis=1),
+                                  axis=0, return_counts=True)
+        links = [(int(x), int(y), int(count)) for (x, y), count in zip(pairs, counts)]
+        return markers, links
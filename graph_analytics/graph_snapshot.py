@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Binary Graph Snapshot Cache
+Compiles the text graph export into typed, memory-mappable arrays so later loads
+skip parsing entirely; snapshots are invalidated by a hash of the source file
+"""
+
+import hashlib
+import json
+import os
+import struct
+from array import array
+from collections.abc import MutableSequence
+from datetime import date
+
+import numpy as np
+
+from graph_loader import iter_graph_file
+
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_MAGIC = b'GRAPHSNP'
+SNAPSHOT_VERSION = 1
+ALIGNMENT = 64
+
+# Bits of the per-node flags column
+HAS_ENTER = 1
+HAS_EXIT = 2
+HAS_INFO = 4
+INFO_IS_DICT = 8
+HAS_NAME = 16
+HAS_ROLE = 32
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1  # Range of the ID columns
+
+_NODE_KEYS = ('id', 'type', 'enter', 'exit', 'info')
+_INFO_KEYS = ('name', 'role')
+_EDGE_KEYS = ('from', 'to', 'type')
+
+class SnapshotUnsupported(ValueError):
+    """Raised when a record cannot be represented in the typed snapshot layout"""
+
+def snapshot_path(source_path):
+    """Location of the snapshot cache for a given source file"""
+    return source_path + SNAPSHOT_SUFFIX
+
+def file_sha256(filepath, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_fingerprint(filepath, with_hash=True):
+    """Size, mtime and (optionally) content hash of a source file"""
+    stat = os.stat(filepath)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        fingerprint['sha256'] = file_sha256(filepath)
+    return fingerprint
+
+def refreshed_fingerprint(cached, source_path):
+    """
+    The fingerprint to keep for a source file, or None if cached no longer describes it
+    A matching size/mtime is trusted without reading the file: a deliberate trade-off that
+    misses same-size edits which also restore the mtime, in exchange for loads that never
+    hash the source. Otherwise the content hash decides; when it still matches (the file was
+    only touched or copied) a fingerprint with the new mtime is returned for the caller to store,
+    so later loads take the cheap path again
+    """
+    current = source_fingerprint(source_path, with_hash=False)
+    if (cached.get('size'), cached.get('mtime_ns')) == (current['size'], current['mtime_ns']):
+        return cached
+    if cached.get('size') != current['size'] or cached.get('sha256') != file_sha256(source_path):
+        return None
+    return {**cached, **current}
+
+class _StringTable:
+    """Interns strings to dense integer IDs"""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.values)
+            self.ids[value] = string_id
+            self.values.append(value)
+        return string_id
+
+    def to_arrays(self):
+        encoded = [value.encode('utf-8') for value in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return offsets, blob
+
+def _date_to_ordinal(value):
+    if not isinstance(value, str):
+        raise SnapshotUnsupported(f"Non-string date: {value!r}")
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        raise SnapshotUnsupported(f"Unparseable date: {value!r}")
+    if parsed.isoformat() != value:
+        raise SnapshotUnsupported(f"Non-canonical date: {value!r}")
+    return parsed.toordinal()
+
+def _extra_json(record, known_keys):
+    extra = {k: v for k, v in record.items() if k not in known_keys}
+    if not extra:
+        return None
+    return json.dumps(extra, sort_keys=True)
+
+class GraphSnapshot:
+    """
+    Typed column view of a graph
+    Nodes: id, type code, flags, label/role string IDs, enter/exit day ordinals (CSR offsets)
+    Edges: from/to node IDs and type code
+    """
+
+    NODE_ARRAYS = ('node_id', 'node_type', 'node_flags', 'node_label', 'node_role',
+                   'node_extra', 'info_extra', 'enter_offsets', 'enter_days',
+                   'exit_offsets', 'exit_days')
+    EDGE_ARRAYS = ('edge_from', 'edge_to', 'edge_type', 'edge_extra')
+    STRING_ARRAYS = ('string_offsets', 'string_blob')
+
+    def __init__(self, arrays, node_types, edge_types, source=None):
+        self.arrays = arrays
+        self.node_types = list(node_types)
+        self.edge_types = list(edge_types)
+        self.source = source or {}
+        self._rows = None
+        self._day_cache = {}
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_id)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_from)
+
+    @classmethod
+    def from_records(cls, records, source=None):
+        """Build a snapshot from an iterable of (section, record) pairs"""
+        strings = _StringTable()
+        node_types = {}
+        edge_types = {}
+
+        node_id = array('q')
+        node_type = array('B')
+        node_flags = array('B')
+        node_label = array('i')
+        node_role = array('i')
+        node_extra = array('i')
+        info_extra = array('i')
+        enter_offsets = array('q', [0])
+        enter_days = array('i')
+        exit_offsets = array('q', [0])
+        exit_days = array('i')
+
+        edge_from = array('q')
+        edge_to = array('q')
+        edge_type = array('B')
+        edge_extra = array('i')
+
+        def type_code(table, value):
+            if not isinstance(value, str):
+                raise SnapshotUnsupported(f"Non-string type: {value!r}")
+            if value not in table:
+                if len(table) >= 255:
+                    raise SnapshotUnsupported("Too many distinct types")
+                table[value] = len(table)
+            return table[value]
+
+        def string_id(value):
+            if not isinstance(value, str):
+                raise SnapshotUnsupported(f"Non-string value: {value!r}")
+            return strings.intern(value)
+
+        def string_or_missing(value):
+            return -1 if value is None else string_id(value)
+
+        def int64_id(value):
+            # bool is an int subclass, and array('q') overflows outside int64
+            return isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX
+
+        def dates(value):
+            if not isinstance(value, list):
+                raise SnapshotUnsupported(f"Non-list dates: {value!r}")
+            return [_date_to_ordinal(d) for d in value]
+
+        for section, record in records:
+            if section == 'nodesSource':
+                if not int64_id(record.get('id')) or 'type' not in record:
+                    raise SnapshotUnsupported(f"Unsupported node: {record!r}")
+                flags = 0
+                node_id.append(record['id'])
+                node_type.append(type_code(node_types, record['type']))
+
+                if 'enter' in record:
+                    flags |= HAS_ENTER
+                    enter_days.extend(dates(record['enter']))
+                enter_offsets.append(len(enter_days))
+                if 'exit' in record:
+                    flags |= HAS_EXIT
+                    exit_days.extend(dates(record['exit']))
+                exit_offsets.append(len(exit_days))
+
+                label = role = extra = -1
+                if 'info' in record:
+                    flags |= HAS_INFO
+                    info = record['info']
+                    if isinstance(info, dict):
+                        flags |= INFO_IS_DICT
+                        if 'name' in info:
+                            flags |= HAS_NAME
+                            label = string_id(info['name'])
+                        if 'role' in info:
+                            flags |= HAS_ROLE
+                            role = string_id(info['role'])
+                        extra = string_or_missing(_extra_json(info, _INFO_KEYS))
+                    else:
+                        label = string_id(info)
+                node_flags.append(flags)
+                node_label.append(label)
+                node_role.append(role)
+                info_extra.append(extra)
+                node_extra.append(string_or_missing(_extra_json(record, _NODE_KEYS)))
+            else:
+                if not int64_id(record.get('from')) or not int64_id(record.get('to')):
+                    raise SnapshotUnsupported(f"Unsupported edge: {record!r}")
+                edge_from.append(record['from'])
+                edge_to.append(record['to'])
+                edge_type.append(type_code(edge_types, record.get('type')))
+                edge_extra.append(string_or_missing(_extra_json(record, _EDGE_KEYS)))
+
+        string_offsets, string_blob = strings.to_arrays()
+        arrays = {
+            'node_id': np.frombuffer(node_id, dtype=np.int64),
+            'node_type': np.frombuffer(node_type, dtype=np.uint8),
+            'node_flags': np.frombuffer(node_flags, dtype=np.uint8),
+            'node_label': np.frombuffer(node_label, dtype=np.int32),
+            'node_role': np.frombuffer(node_role, dtype=np.int32),
+            'node_extra': np.frombuffer(node_extra, dtype=np.int32),
+            'info_extra': np.frombuffer(info_extra, dtype=np.int32),
+            'enter_offsets': np.frombuffer(enter_offsets, dtype=np.int64),
+            'enter_days': np.frombuffer(enter_days, dtype=np.int32),
+            'exit_offsets': np.frombuffer(exit_offsets, dtype=np.int64),
+            'exit_days': np.frombuffer(exit_days, dtype=np.int32),
+            'edge_from': np.frombuffer(edge_from, dtype=np.int64),
+            'edge_to': np.frombuffer(edge_to, dtype=np.int64),
+            'edge_type': np.frombuffer(edge_type, dtype=np.uint8),
+            'edge_extra': np.frombuffer(edge_extra, dtype=np.int32),
+            'string_offsets': string_offsets,
+            'string_blob': string_blob,
+        }
+        return cls(arrays, node_types, edge_types, source=source)
+
+    def save(self, path):
+        """Write the snapshot atomically (temp file + rename)"""
+        layout = {}
+        offset = 0
+        for name in self.NODE_ARRAYS + self.EDGE_ARRAYS + self.STRING_ARRAYS:
+            values = np.ascontiguousarray(self.arrays[name])
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            layout[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+            offset += values.nbytes
+
+        header = json.dumps({
+            'version': SNAPSHOT_VERSION,
+            'source': self.source,
+            'node_types': self.node_types,
+            'edge_types': self.edge_types,
+            'arrays': layout,
+        }).encode('utf-8')
+        data_start = -(-(len(SNAPSHOT_MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, spec in layout.items():
+                f.seek(data_start + spec['offset'])
+                f.write(np.ascontiguousarray(self.arrays[name]).tobytes())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_header(path):
+        """Read only the JSON header of a snapshot file"""
+        with open(path, 'rb') as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a graph snapshot: {path}")
+            (header_len,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        header['data_start'] = -(-(len(SNAPSHOT_MAGIC) + 8 + header_len) // ALIGNMENT) * ALIGNMENT
+        return header
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a snapshot file; arrays are read-only views into the mapping"""
+        header = cls.read_header(path)
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {header.get('version')}")
+
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape']))
+            start = header['data_start'] + spec['offset']
+            arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+        return cls(arrays, header['node_types'], header['edge_types'], source=header['source'])
+
+    def _row_readers(self):
+        """Memoryviews of the columns (per-row indexing is much faster than on numpy scalars), cached"""
+        if self._rows is None:
+            self._rows = {name: memoryview(np.ascontiguousarray(self.arrays[name]))
+                          for name in self.NODE_ARRAYS + self.EDGE_ARRAYS + self.STRING_ARRAYS}
+        return self._rows
+
+    def _string(self, string_id):
+        rows = self._row_readers()
+        offsets = rows['string_offsets']
+        return bytes(rows['string_blob'][offsets[string_id]:offsets[string_id + 1]]).decode('utf-8')
+
+    def _day_strings(self, offsets, days, i):
+        day_cache = self._day_cache
+        result = []
+        for day in days[offsets[i]:offsets[i + 1]].tolist():
+            text = day_cache.get(day)
+            if text is None:
+                text = day_cache[day] = date.fromordinal(day).isoformat()
+            result.append(text)
+        return result
+
+    def node_record(self, i):
+        """Node i as the dict graph_loader would have produced"""
+        rows = self._row_readers()
+        flags = rows['node_flags'][i]
+        node = {'id': rows['node_id'][i], 'type': self.node_types[rows['node_type'][i]]}
+        if flags & HAS_ENTER:
+            node['enter'] = self._day_strings(rows['enter_offsets'], rows['enter_days'], i)
+        if flags & HAS_EXIT:
+            node['exit'] = self._day_strings(rows['exit_offsets'], rows['exit_days'], i)
+        if flags & HAS_INFO:
+            if flags & INFO_IS_DICT:
+                info = {}
+                if flags & HAS_NAME:
+                    info['name'] = self._string(rows['node_label'][i])
+                if flags & HAS_ROLE:
+                    info['role'] = self._string(rows['node_role'][i])
+                if rows['info_extra'][i] >= 0:
+                    info.update(json.loads(self._string(rows['info_extra'][i])))
+                node['info'] = info
+            else:
+                node['info'] = self._string(rows['node_label'][i])
+        if rows['node_extra'][i] >= 0:
+            node.update(json.loads(self._string(rows['node_extra'][i])))
+        return node
+
+    def edge_record(self, i):
+        """Edge i as the dict graph_loader would have produced"""
+        rows = self._row_readers()
+        edge = {'from': rows['edge_from'][i], 'to': rows['edge_to'][i],
+                'type': self.edge_types[rows['edge_type'][i]]}
+        if rows['edge_extra'][i] >= 0:
+            edge.update(json.loads(self._string(rows['edge_extra'][i])))
+        return edge
+
+    def to_records(self):
+        """
+        The node/edge dict lists the scripts use, as LazyRecords: each dict is decoded from the
+        columns on first access, so loading costs nothing up front and untouched records cost nothing
+        """
+        return LazyRecords(self.node_record, self.num_nodes), LazyRecords(self.edge_record, self.num_edges)
+
+class LazyRecords(MutableSequence):
+    """
+    List of records built by build(i) on first access and then kept, so callers may edit them
+    Appending is cheap; inserting or deleting in the middle builds every record first
+    """
+
+    def __init__(self, build, length):
+        self._build = build
+        self._items = [None] * length  # None until built
+
+    def _materialize(self):
+        items = self._items
+        for i in range(len(items)):
+            if items[i] is None:
+                items[i] = self._build(i)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self._items)))]
+        item = self._items[i]
+        if item is None:
+            if i < 0:
+                i += len(self._items)
+            item = self._items[i] = self._build(i)
+        return item
+
+    def __iter__(self):
+        items = self._items
+        build = self._build
+        i = 0
+        while i < len(items):
+            item = items[i]
+            if item is None:
+                item = items[i] = build(i)
+            yield item
+            i += 1
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice):
+            self._materialize()
+        self._items[i] = value
+
+    def __delitem__(self, i):
+        self._materialize()
+        del self._items[i]
+
+    def insert(self, i, value):
+        if i < len(self._items):
+            self._materialize()
+        self._items.insert(i, value)
+
+    def append(self, value):
+        self._items.append(value)
+
+    def extend(self, values):
+        self._items.extend(values)
+
+    def __reduce__(self):
+        # Pickles (e.g. for detector worker processes) as the plain list
+        return list, (list(self),)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def load_snapshot(source_path):
+    """Open the cached snapshot for a source file if it is still valid, else None"""
+    path = snapshot_path(source_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        cached = GraphSnapshot.read_header(path)['source']
+    except (OSError, ValueError, struct.error):
+        return None
+
+    source = refreshed_fingerprint(cached, source_path)
+    if source is None:
+        return None
+    try:
+        snapshot = GraphSnapshot.open(path)
+    except (OSError, ValueError):
+        return None
+    if source is not cached:
+        # Same content under a new mtime: re-stamp the cache so the next load skips the hash
+        snapshot.source = source
+        try:
+            snapshot.save(path)
+        except OSError as e:
+            print(f"Warning: could not refresh graph snapshot fingerprint ({e})")
+    return snapshot
+
+def build_snapshot(source_path, write=True):
+    """Parse a source file into a snapshot and (optionally) write it to the cache"""
+    source = source_fingerprint(source_path)
+    snapshot = GraphSnapshot.from_records(iter_graph_file(source_path), source=source)
+    if write:
+        try:
+            snapshot.save(snapshot_path(source_path))
+        except OSError as e:
+            print(f"Warning: could not write graph snapshot ({e})")
+    return snapshot
+
+def load_or_build_snapshot(source_path):
+    """Return a valid snapshot for the source file, compiling it on first use"""
+    snapshot = load_snapshot(source_path)
+    if snapshot is None:
+        snapshot = build_snapshot(source_path)
+    return snapshot
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Compact Structure-of-Arrays Graph Store
+Keeps nodes and edges as typed columns (type codes, interned string IDs, day-ordinal dates
+with offsets) and hands out lightweight dict-like views so existing detector code keeps working
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from datetime import date
+
+import numpy as np
+
+from graph_snapshot import (HAS_ENTER, HAS_EXIT, HAS_INFO, HAS_NAME, HAS_ROLE, INFO_IS_DICT,
+                            GraphSnapshot, load_or_build_snapshot)
+
+def _narrow_ids(values):
+    """int32 copy of an ID column when every value fits, else the column unchanged"""
+    info = np.iinfo(np.int32)
+    if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return np.asarray(values, dtype=np.int32)
+    return values
+
+class NodeView(Mapping):
+    """Read-only dict-like view of one stored node; 'info' comes back as a plain dict or string"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._store._node_field(self._index, key)
+
+    def get(self, key, default=None):
+        try:
+            return self._store._node_field(self._index, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._store._node_keys(self._index)
+
+    def __iter__(self):
+        return iter(self._store._node_keys(self._index))
+
+    def __len__(self):
+        return len(self._store._node_keys(self._index))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class EdgeView(Mapping):
+    """Read-only dict-like view of one stored edge"""
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._store._edge_field(self._index, key)
+
+    def get(self, key, default=None):
+        try:
+            return self._store._edge_field(self._index, key)
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self._store._edge_keys(self._index))
+
+    def __len__(self):
+        return len(self._store._edge_keys(self._index))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class _ViewSequence(Sequence):
+    """Sequence of views over rows 0..n-1 of the store"""
+
+    def __init__(self, store, view_class, length):
+        self.store = store
+        self._view_class = view_class
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._view_class(self.store, j) for j in range(*i.indices(self._length))]
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return self._view_class(self.store, i)
+
+    def __iter__(self):
+        view_class = self._view_class
+        store = self.store
+        for i in range(self._length):
+            yield view_class(store, i)
+
+class NodeSequence(_ViewSequence):
+    """The store's nodes, in file order; node_dict looks nodes up by ID"""
+
+    @property
+    def node_dict(self):
+        return self.store.node_dict
+
+class NodeMapping(Mapping):
+    """Node ID -> NodeView, answered by binary search over the sorted ID column"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def _position(self, node_id):
+        if not isinstance(node_id, (int, np.integer)):
+            return None
+        ids = self.store.sorted_ids
+        # Rightmost match: with duplicate IDs the last node wins, as in a dict comprehension
+        pos = int(np.searchsorted(ids, node_id, side='right')) - 1
+        if pos < 0 or ids[pos] != node_id:
+            return None
+        return int(self.store.id_order[pos])
+
+    def __getitem__(self, node_id):
+        index = self._position(node_id)
+        if index is None:
+            raise KeyError(node_id)
+        return NodeView(self.store, index)
+
+    def get(self, node_id, default=None):
+        index = self._position(node_id)
+        return default if index is None else NodeView(self.store, index)
+
+    def __contains__(self, node_id):
+        return self._position(node_id) is not None
+
+    def __iter__(self):
+        return iter(np.unique(self.store.node_id).tolist())
+
+    def __len__(self):
+        return len(np.unique(self.store.node_id))
+
+class GraphStore:
+    """
+    Structure-of-arrays graph built on the snapshot columns
+    Nodes: id, uint8 type code, flags, interned label/role string IDs, enter/exit day ordinals
+    with offsets. Edges: from/to IDs (int32 when they fit) and uint8 type codes.
+    Strings stay UTF-8 encoded in one blob and are decoded on access
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.node_types = snapshot.node_types
+        self.edge_types = snapshot.edge_types
+
+        self.node_id = _narrow_ids(snapshot.node_id)
+        self.node_type = snapshot.node_type
+        self.node_flags = snapshot.node_flags
+        self.node_label = snapshot.node_label
+        self.node_role = snapshot.node_role
+        self.node_extra = snapshot.node_extra
+        self.info_extra = snapshot.info_extra
+        self.enter_offsets = snapshot.enter_offsets
+        self.enter_days = snapshot.enter_days
+        self.exit_offsets = snapshot.exit_offsets
+        self.exit_days = snapshot.exit_days
+
+        self.edge_from = _narrow_ids(snapshot.edge_from)
+        self.edge_to = _narrow_ids(snapshot.edge_to)
+        self.edge_type = snapshot.edge_type
+        self.edge_extra = snapshot.edge_extra
+
+        self.string_offsets = snapshot.string_offsets
+        self.string_blob = snapshot.string_blob
+
+        self.id_order = np.argsort(self.node_id, kind='stable').astype(np.int32)
+        self.sorted_ids = self.node_id[self.id_order]
+        self._day_strings = {}
+        self._role_strings = {}  # Roles repeat heavily; decoded once each
+
+        # Per-row access goes through memoryviews, which index much faster than numpy scalars
+        self._rows = {name: memoryview(np.ascontiguousarray(getattr(self, name)))
+                      for name in ('node_id', 'node_type', 'node_flags', 'node_label', 'node_role',
+                                   'node_extra', 'info_extra', 'enter_offsets', 'exit_offsets',
+                                   'edge_from', 'edge_to', 'edge_type', 'edge_extra', 'string_offsets')}
+        self._blob = bytes(self.string_blob)
+
+        self.nodes = NodeSequence(self, NodeView, len(self.node_id))
+        self.edges = _ViewSequence(self, EdgeView, len(self.edge_from))
+        self.node_dict = NodeMapping(self)
+
+    @classmethod
+    def from_records(cls, nodes, edges):
+        """Compact an in-memory node/edge list (raises SnapshotUnsupported for odd records)"""
+        records = [('nodesSource', node) for node in nodes] + [('edgesSource', edge) for edge in edges]
+        return cls(GraphSnapshot.from_records(records))
+
+    @classmethod
+    def load(cls, filepath):
+        """Store over the (memory-mapped) snapshot of a data file, compiling it on first use"""
+        return cls(load_or_build_snapshot(filepath))
+
+    def nbytes(self):
+        """Bytes held by the columns"""
+        return sum(values.nbytes for values in (
+            self.node_id, self.node_type, self.node_flags, self.node_label, self.node_role,
+            self.node_extra, self.info_extra, self.enter_offsets, self.enter_days,
+            self.exit_offsets, self.exit_days, self.edge_from, self.edge_to, self.edge_type,
+            self.edge_extra, self.string_offsets, self.string_blob, self.id_order, self.sorted_ids))
+
+    def string(self, string_id):
+        offsets = self._rows['string_offsets']
+        return self._blob[offsets[string_id]:offsets[string_id + 1]].decode('utf-8')
+
+    def _days(self, offsets, days, i):
+        day_strings = self._day_strings
+        result = []
+        for day in days[offsets[i]:offsets[i + 1]].tolist():
+            text = day_strings.get(day)
+            if text is None:
+                text = day_strings[day] = date.fromordinal(day).isoformat()
+            result.append(text)
+        return result
+
+    def _role(self, string_id):
+        role = self._role_strings.get(string_id)
+        if role is None:
+            role = self.string(string_id)
+            if len(self._role_strings) < 4096:
+                self._role_strings[string_id] = role
+        return role
+
+    def _info(self, i, flags):
+        rows = self._rows
+        if not flags & INFO_IS_DICT:
+            return self.string(rows['node_label'][i])
+        info = {}
+        if flags & HAS_NAME:
+            info['name'] = self.string(rows['node_label'][i])
+        if flags & HAS_ROLE:
+            info['role'] = self._role(rows['node_role'][i])
+        extra = rows['info_extra'][i]
+        if extra >= 0:
+            info.update(json.loads(self.string(extra)))
+        return info
+
+    def _node_extra(self, i):
+        extra = self._rows['node_extra'][i]
+        return json.loads(self.string(extra)) if extra >= 0 else {}
+
+    def _node_field(self, i, key):
+        rows = self._rows
+        if key == 'id':
+            return rows['node_id'][i]
+        if key == 'type':
+            return self.node_types[rows['node_type'][i]]
+        flags = rows['node_flags'][i]
+        if key == 'info':
+            if flags & HAS_INFO:
+                return self._info(i, flags)
+        elif key == 'enter':
+            if flags & HAS_ENTER:
+                return self._days(rows['enter_offsets'], self.enter_days, i)
+        elif key == 'exit':
+            if flags & HAS_EXIT:
+                return self._days(rows['exit_offsets'], self.exit_days, i)
+        else:
+            extra = self._node_extra(i)
+            if key in extra:
+                return extra[key]
+        raise KeyError(key)
+
+    def _node_keys(self, i):
+        flags = self._rows['node_flags'][i]
+        keys = ['id', 'type']
+        if flags & HAS_ENTER:
+            keys.append('enter')
+        if flags & HAS_EXIT:
+            keys.append('exit')
+        if flags & HAS_INFO:
+            keys.append('info')
+        keys.extend(self._node_extra(i))
+        return keys
+
+    def _edge_extra(self, j):
+        extra = self._rows['edge_extra'][j]
+        return json.loads(self.string(extra)) if extra >= 0 else {}
+
+    def _edge_field(self, j, key):
+        rows = self._rows
+        if key == 'from':
+            return rows['edge_from'][j]
+        if key == 'to':
+            return rows['edge_to'][j]
+        if key == 'type':
+            return self.edge_types[rows['edge_type'][j]]
+        extra = self._edge_extra(j)
+        if key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def _edge_keys(self, j):
+        return ['from', 'to', 'type'] + list(self._edge_extra(j))
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Incremental Fraud Detection
+Keeps per-detector state so that each day's new accidents are applied as a delta;
+only the people, cars, witnesses and professionals touched by the delta are re-evaluated
+"""
+
+from bisect import bisect_right
+from collections import Counter, defaultdict
+
+from fraud_detector import FraudDetector
+from time_clusters import DEFAULT_WINDOWS, TimeClusterEngine
+
+FLAG_ORDER = ('STATISTICAL_OUTLIER', 'TIME_CLUSTER', 'REPEATED_CAR', 'REPEATED_WITNESS',
+              'ROLE_SWITCHING', 'SUSPICIOUS_PROFESSIONAL')
+COMPACT_MIN_EDGES = 10000  # Appended edges the adjacency overlay may hold before it is compacted...
+COMPACT_SHARE = 0.25  # ...or this share of all edges, whichever is larger
+
+class _CountHistogram:
+    """Multiset of per-person accident counts supporting the mean + 1.5*IQR threshold"""
+
+    def __init__(self):
+        self.people = defaultdict(set)  # count -> names with that count
+        self.total = 0
+        self.size = 0
+
+    def move(self, name, old_count, new_count):
+        if old_count is not None:
+            self.people[old_count].discard(name)
+            if not self.people[old_count]:
+                del self.people[old_count]
+            self.total -= old_count
+            self.size -= 1
+        self.people[new_count].add(name)
+        self.total += new_count
+        self.size += 1
+
+    def _kth(self, values, cumulative, k):
+        return values[bisect_right(cumulative, k)]
+
+    def threshold(self):
+        """Same result as FraudDetector.detect_statistical_outliers, from the histogram alone"""
+        values = sorted(self.people)
+        if not self.size:
+            return 0, 0
+        # statistics.mean returns an int when the mean is integral
+        mean_val = self.total // self.size if self.total % self.size == 0 else self.total / self.size
+        if self.size < 4:  # Need at least 4 data points for IQR
+            return values[-1], mean_val
+        cumulative = []
+        running = 0
+        for value in values:
+            running += len(self.people[value])
+            cumulative.append(running)
+
+        # statistics.quantiles(counts, n=4) ('exclusive' method) with exact integer indexing
+        quartiles = []
+        m = self.size + 1
+        for i in (1, 3):
+            j = min(max(i * m // 4, 1), self.size - 1)
+            delta = i * m - j * 4
+            low = self._kth(values, cumulative, j - 1)
+            high = self._kth(values, cumulative, j)
+            quartiles.append((low * (4 - delta) + high * delta) / 4)
+
+        return mean_val + 1.5 * (quartiles[1] - quartiles[0]), mean_val
+
+    def above(self, threshold):
+        names = set()
+        for count, people in self.people.items():
+            if count > threshold:
+                names.update(people)
+        return names
+
+class IncrementalFraudDetector(FraudDetector):
+    """
+    FraudDetector that applies appended nodes/edges in place
+    apply_delta() returns only the flags that changed; results() matches a full recompute
+    over the concatenated node and edge lists
+    Names are used as recorded; entity resolution only applies to batch FraudDetector runs
+    """
+
+    def __init__(self, nodes, edges, days_window=30, density_windows=DEFAULT_WINDOWS,
+                 min_suspicious_clients=2):
+        super().__init__(list(nodes), list(edges))
+        self.days_window = days_window
+        self.windows = sorted(set(density_windows) | {days_window})
+        self.min_suspicious_clients = min_suspicious_clients
+
+        # First-appearance order of each finding key, so results() lists them as a full run would
+        self._seq = {'person': {}, 'count': {}, 'role': {}, 'car': {}, 'witness': {}}
+
+        # Per-detector state
+        self.person_dates = defaultdict(set)  # participant name -> distinct enter dates
+        self.person_roles = defaultdict(set)  # participant name -> {'Driver', 'Passenger'}
+        self._accident_counts = {}  # participant name -> accident count in the histogram
+        self._histogram = _CountHistogram()
+        self.outlier_stats = {'mean': 0, 'threshold': 0, 'max': 0}
+        self._outliers = set()
+        self._time_clusters = {}  # name -> (accidents in window, {window: max count})
+        self._car_supporters = {}  # flagged plate -> names driving/riding in its cars
+        self._car_flag_count = Counter()  # name -> number of flagged plates supporting it
+        self._suspicious_participants = set()
+        self._professionals = {}  # professional ID -> (suspicious clients, first edge index)
+        self._professional_flag_count = Counter()  # name -> flagged professional nodes
+        self._flags = {}  # name -> frozenset of flags
+        self.risk_scores = None  # Last compute_risk_scores() result, the next call's warm start
+
+        self._ingest(0, 0, initial=True)
+
+    def apply_delta(self, new_nodes, new_edges):
+        """
+        Append new nodes and edges and update every detector in place
+        Returns [{'name', 'flag', 'change': 'added'|'removed'}] for flags that changed
+        """
+        node_start = len(self.nodes)
+        edge_start = len(self.edges)
+        self.nodes.extend(new_nodes)
+        self.edges.extend(new_edges)
+        for node in new_nodes:
+            self.node_dict[node['id']] = node
+        self.adjacency.add_edges(new_edges)
+        # Overlay lookups sort per call, so fold a grown overlay back into the CSR arrays
+        if self.adjacency.overlay_edges > max(COMPACT_MIN_EDGES, COMPACT_SHARE * self.adjacency.num_edges):
+            self.adjacency.compact()
+        return self._ingest(node_start, edge_start)
+
+    def _ingest(self, node_start, edge_start, initial=False):
+        touched_people = set()  # names whose participant dates changed
+        touched_counts = set()
+        touched_roles = set()
+        touched_plates = set()
+        touched_witnesses = set()
+        touched_participants = set()  # participant node IDs whose suspicion may have changed
+        touched_professionals = set()
+        touched_names = set()
+
+        for pos in range(node_start, len(self.nodes)):
+            node = self.nodes[pos]
+            node_type = node['type']
+            info = node.get('info')
+
+            if isinstance(info, dict) and 'name' in info:
+                name = info['name']
+                if not initial:
+                    self.person_to_nodes[name].append(node)
+                self._seq['person'].setdefault(name, pos)
+                if not initial:
+                    # Edges may have arrived before this node; re-check cars it drives/rides in
+                    for car_id in self.adjacency.successors(node['id'], ('drives', 'isPassenger')):
+                        car = self.node_dict.get(car_id)
+                        if car and car['type'] == 'Car':
+                            touched_plates.add(car['info'])
+
+            if node_type == 'Participant' and isinstance(info, dict):
+                name = info['name']
+                self._seq['count'].setdefault(name, pos)
+                self.person_dates[name].update(node.get('enter', []))
+                touched_counts.add(name)
+                if node.get('enter'):
+                    touched_people.add(name)
+                roles = self._driver_passenger_roles(info.get('role', ''))
+                if roles:
+                    self._seq['role'].setdefault(name, pos)
+                    self.person_roles[name].update(roles)
+                    touched_roles.add(name)
+                touched_participants.add(node['id'])
+
+            elif node_type == 'Car':
+                plate = info
+                if not initial:
+                    self.car_to_nodes[plate].append(node['id'])
+                self._seq['car'].setdefault(plate, pos)
+                touched_plates.add(plate)
+
+            elif self._is_witness(node):
+                name = info['name']
+                if not initial:
+                    self.witness_to_nodes[name].append(node['id'])
+                self._seq['witness'].setdefault(name, pos)
+                touched_witnesses.add(name)
+
+            elif node_type in ['Doctor', 'Lawyer']:
+                touched_professionals.add(node['id'])
+
+        for edge in self.edges[edge_start:]:
+            source = self.node_dict.get(edge['from'])
+            target = self.node_dict.get(edge['to'])
+            if edge['type'] == 'involves' and source and source['type'] == 'Car':
+                touched_plates.add(source['info'])
+            elif edge['type'] == 'witnesses' and self._is_witness(source):
+                touched_witnesses.add(source['info']['name'])
+            if edge['type'] in ['drives', 'isPassenger'] and target and target['type'] == 'Car':
+                touched_plates.add(target['info'])
+            if source and source['type'] in ['Doctor', 'Lawyer']:
+                touched_professionals.add(edge['from'])
+
+        # 1. Statistical outliers: histogram of counts, threshold may move for everyone
+        for name in touched_counts:
+            old_count = self._accident_counts.get(name)
+            new_count = len(self.person_dates[name])
+            if new_count != old_count:
+                self._histogram.move(name, old_count, new_count)
+                self._accident_counts[name] = new_count
+        threshold, mean_val = self._histogram.threshold()
+        self.outlier_stats = {'mean': mean_val, 'threshold': threshold,
+                              'max': max(self._histogram.people) if self._histogram.people else 0}
+        outliers = self._histogram.above(threshold)
+        touched_names |= outliers ^ self._outliers
+        self._outliers = outliers
+
+        # 2. Time clusters: re-evaluate only people with new dates
+        if touched_people:
+            engine = TimeClusterEngine.from_person_nodes(
+                {name: self.person_to_nodes[name] for name in touched_people})
+            results = engine.evaluate(self.windows)
+            for group, name in enumerate(engine.names):
+                first = int(results[self.days_window]['first'][group])
+                if first >= 2:
+                    max_counts = {w: int(results[w]['max'][group]) for w in self.windows}
+                    self._time_clusters[name] = (first, max_counts)
+                else:
+                    self._time_clusters.pop(name, None)
+            touched_names |= touched_people
+
+        # 3. Repeated cars: recount touched plates and their drivers/passengers
+        for plate in touched_plates:
+            if not initial:
+                self.car_to_accidents[plate] = [
+                    accident_id
+                    for car_id in self.car_to_nodes[plate]
+                    for accident_id in self.adjacency.successors(car_id, 'involves')
+                ]
+            old_supporters = self._car_supporters.pop(plate, set())
+            new_supporters = set()
+            if len(self.car_to_accidents[plate]) > 1:
+                for car_id in self.car_to_nodes[plate]:
+                    for participant_id in self.adjacency.predecessors(car_id, ('drives', 'isPassenger')):
+                        participant = self.node_dict.get(participant_id)
+                        if participant and isinstance(participant.get('info'), dict):
+                            new_supporters.add(participant['info']['name'])
+                self._car_supporters[plate] = new_supporters
+            for name in old_supporters - new_supporters:
+                self._car_flag_count[name] -= 1
+                if not self._car_flag_count[name]:
+                    del self._car_flag_count[name]
+            for name in new_supporters - old_supporters:
+                self._car_flag_count[name] += 1
+            touched_names |= old_supporters ^ new_supporters
+
+        # 4. Repeated witnesses
+        for name in touched_witnesses:
+            if not initial:
+                self.witness_to_accidents[name] = [
+                    accident_id
+                    for witness_id in self.witness_to_nodes[name]
+                    for accident_id in self.adjacency.successors(witness_id, 'witnesses')
+                ]
+        touched_names |= touched_witnesses
+
+        # 5. Role switching
+        touched_names |= touched_roles
+
+        # Participant-level flags decide which participant nodes count as suspicious clients
+        for name in touched_names:
+            was_flagged = bool(self._flags.get(name, frozenset()) - {'SUSPICIOUS_PROFESSIONAL'})
+            if was_flagged != bool(self._base_flags(name)):
+                touched_participants.update(
+                    node['id'] for node in self.person_to_nodes.get(name, [])
+                    if node['type'] == 'Participant')
+
+        for participant_id in touched_participants:
+            participant = self.node_dict[participant_id]
+            if self._base_flags(participant['info']['name']):
+                self._suspicious_participants.add(participant_id)
+            else:
+                self._suspicious_participants.discard(participant_id)
+            for source_id in self.adjacency.predecessors(participant_id):
+                source = self.node_dict.get(source_id)
+                if source and source['type'] in ['Doctor', 'Lawyer']:
+                    touched_professionals.add(source_id)
+
+        # 6. Suspicious professionals: recount suspicious clients of touched professionals
+        for professional_id in touched_professionals:
+            professional = self.node_dict.get(professional_id)
+            if not professional or professional['type'] not in ['Doctor', 'Lawyer']:
+                continue
+            clients = set()
+            first_edge = None
+            for edge_index, target_id in self.adjacency.out_edges(professional_id):
+                if target_id in self._suspicious_participants:
+                    clients.add(target_id)
+                    if first_edge is None or edge_index < first_edge:
+                        first_edge = edge_index
+
+            name = self._professional_name(professional)
+            was_flagged = professional_id in self._professionals
+            if len(clients) >= self.min_suspicious_clients:
+                self._professionals[professional_id] = (len(clients), first_edge)
+                if not was_flagged:
+                    self._professional_flag_count[name] += 1
+            elif was_flagged:
+                del self._professionals[professional_id]
+                self._professional_flag_count[name] -= 1
+                if not self._professional_flag_count[name]:
+                    del self._professional_flag_count[name]
+            touched_names.add(name)
+
+        # Diff flags of every touched name, in first-appearance order so the change list is stable
+        changes = []
+        first_seen = self._seq['person']
+        for name in sorted(touched_names, key=lambda name: (first_seen.get(name, len(self.nodes)), name)):
+            old_flags = self._flags.get(name, frozenset())
+            new_flags = frozenset(self._base_flags(name))
+            if name in self._professional_flag_count:
+                new_flags |= {'SUSPICIOUS_PROFESSIONAL'}
+            if new_flags == old_flags:
+                continue
+            if new_flags:
+                self._flags[name] = new_flags
+                self.fraud_flags[name] = [flag for flag in FLAG_ORDER if flag in new_flags]
+            else:
+                del self._flags[name]
+                del self.fraud_flags[name]
+            for flag in FLAG_ORDER:
+                if flag in new_flags and flag not in old_flags:
+                    changes.append({'name': name, 'flag': flag, 'change': 'added'})
+                elif flag in old_flags and flag not in new_flags:
+                    changes.append({'name': name, 'flag': flag, 'change': 'removed'})
+        return changes
+
+    def _base_flags(self, name):
+        """Flags from the participant-level detectors (everything but SUSPICIOUS_PROFESSIONAL)"""
+        flags = set()
+        if name in self._outliers:
+            flags.add('STATISTICAL_OUTLIER')
+        if name in self._time_clusters:
+            flags.add('TIME_CLUSTER')
+        if name in self._car_flag_count:
+            flags.add('REPEATED_CAR')
+        if len(self.witness_to_accidents.get(name, ())) > 1:
+            flags.add('REPEATED_WITNESS')
+        if len(self.person_roles.get(name, ())) > 1:
+            flags.add('ROLE_SWITCHING')
+        return flags
+
+    def compute_risk_scores(self, **kwargs):
+        """Risk scores for the current graph, warm-started from the previous call's scores"""
+        kwargs.setdefault('initial', self.risk_scores)
+        self.risk_scores = super().compute_risk_scores(**kwargs)
+        return self.risk_scores
+
+    def results(self):
+        """Findings and flags in the same shape and order as run_all_detections()"""
+        seq = self._seq
+        threshold = self.outlier_stats['threshold']
+
+        outliers = sorted(self._outliers, key=seq['count'].get)
+        time_patterns = sorted(self._time_clusters, key=seq['person'].get)
+        repeated_cars = sorted(self._car_supporters, key=seq['car'].get)
+        repeated_witnesses = sorted(
+            (name for name in self.witness_to_accidents if len(self.witness_to_accidents[name]) > 1),
+            key=seq['witness'].get)
+        role_switchers = sorted(
+            (name for name in self.person_roles if len(self.person_roles[name]) > 1),
+            key=seq['role'].get)
+        professionals = sorted(self._professionals, key=lambda pid: self._professionals[pid][1])
+
+        findings = {
+            'statistical_outliers': [
+                self._outlier_finding(name, len(self.person_dates[name]), threshold) for name in outliers],
+            'time_patterns': [
+                self._time_cluster_finding(name, count, self.days_window, max_counts)
+                for name in time_patterns
+                for count, max_counts in [self._time_clusters[name]]],
+            'repeated_cars': [
+                self._repeated_car_finding(plate, len(self.car_to_accidents[plate])) for plate in repeated_cars],
+            'repeated_witnesses': [
+                self._repeated_witness_finding(name, len(self.witness_to_accidents[name]))
+                for name in repeated_witnesses],
+            'role_switching': [
+                self._role_switching_finding(name, self.person_roles[name]) for name in role_switchers],
+            'suspicious_professionals': [
+                self._professional_finding(self.node_dict[pid], self._professionals[pid][0])
+                for pid in professionals],
+            # Graph-wide group findings are recomputed from the current state
+            'fraud_rings': self.detect_fraud_rings(),
+            'co_participation': self.detect_co_participation(),
+        }
+        return findings, self.fraud_flags
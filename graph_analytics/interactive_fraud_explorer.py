@@ -4,45 +4,115 @@ Interactive Insurance Fraud Detection Explorer
 Built with Gradio for interactive exploration of fraud patterns
 """
 
-import json
-import re
+import functools
+import inspect
+import threading
+import time
 import gradio as gr
 import plotly.graph_objects as go
 import networkx as nx
-from collections import defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date
+import numpy as np
 import pandas as pd
 
-def parse_js_object_file(filepath):
-    """Parse JavaScript object notation file to Python dict"""
-    with open(filepath, 'r') as f:
-        content = f.read()
-
-    content = re.sub(r"(\w+):", r'"\1":', content)
-    content = content.replace("'", '"')
-    data = json.loads(content)
-    return data
+from background_jobs import JobRunner, QueueFull, report
+from entity_resolution import expand_aliases
+from graph_index import EDGE_TYPES, AdjacencyIndex
+from graph_layout import compute_layout, load_or_compute_layout
+from graph_lod import MAX_MARKERS, LODHierarchy
+from graph_loader import load_graph
+from graph_raster import NODE_COLORS
+from graph_store import NodeSequence
+from hot_reload import WATCH_INTERVAL, HotReloader
+from results_store import load_results, results_paths
+from search_index import FUZZY, PAGE_SIZE, TIER_NAMES, EntitySearchIndex, node_label
+from time_index import TimeIndex
+
+DATA_FILE = '/home/user/existing_project/graph_analytics/insurance-fraud-data.json'
+RESULTS_FILE = '/home/user/existing_project/graph_analytics/fraud_detection_results.json'
+SUMMARY_DETECTORS = ('statistical_outliers', 'suspicious_professionals', 'fraud_rings')  # Findings read in full
+VIEW_CACHE_SIZE = 32  # Filtered graphs / figures kept per explorer
+EGO_NODE_LIMIT = 300  # Default cap on nodes pulled in by "expand this node"
+PROGRESS_EVERY = 5000  # Nodes/edges between progress reports (and cancellation checks) in long loops
+REQUEST_QUEUE_SIZE = 64  # Gradio requests waiting beyond this are turned away
+RISK_COLUMNS = ['Rank', 'Name', 'Type', 'Node ID', 'Risk Score', 'Fraud Indicators']  # Propagated-risk table
+
+class LRUCache:
+    """Bounded, thread-safe least-recently-used cache (Gradio serves requests from several threads)"""
+
+    def __init__(self, maxsize=VIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
 
 class InteractiveFraudExplorer:
-    def __init__(self):
-        # Load data
-        print("Loading data...")
-        self.data = parse_js_object_file('/home/user/existing_project/graph_analytics/insurance-fraud-data.json')
-        self.nodes = self.data['nodesSource']
-        self.edges = self.data['edgesSource']
-
-        with open('/home/user/existing_project/graph_analytics/fraud_detection_results.json', 'r') as f:
-            self.fraud_results = json.load(f)
+    def __init__(self, nodes, edges, fraud_results, layout=None, jobs=None):
+        """
+        Explorer over an in-memory graph and a fraud_detector results dict (findings, fraud_flags)
+        layout maps node ID -> (x, y); without one it is computed here and not persisted
+        """
+        self.nodes, self.edges = nodes, edges
+        self.fraud_results = fraud_results
 
-        self.fraud_flags = self.fraud_results['fraud_flags']
+        # Flags are keyed by canonical name; resolved runs also list the name variants
+        self.fraud_flags = expand_aliases(self.fraud_results['fraud_flags'],
+                                          self.fraud_results.get('entity_aliases', {}))
 
         # Build indexes
         self.node_dict = {node['id']: node for node in self.nodes}
         self.build_indexes()
-
+        self.search_index = EntitySearchIndex(self.nodes, self.edges, self.adjacency)
+
+        # Positions come from one full-graph layout; views are cached by filter
+        self.layout = layout if layout is not None else compute_layout(self.nodes, self.edges)
+        self.lod = LODHierarchy(self.nodes, self.edges, self.layout, self.fraud_nodes, self.search_index.labels)
+        self.graph_cache = LRUCache()  # (fraud filter, node type) -> filtered DiGraph
+        self.figure_cache = LRUCache()  # (fraud filter, node type, max nodes) -> figure
+        # Graph builds and entity details run here, off the request threads (shared when reloading)
+        self.jobs = jobs if jobs is not None else JobRunner()
+
+    @classmethod
+    def from_files(cls, data_file=DATA_FILE, results_file=RESULTS_FILE, jobs=None):
+        """Explorer over a data file and its fraud_detector results, with the persisted layout"""
+        print("Loading data...")
+        nodes, edges = load_graph(data_file)
+        # Only the findings listed in the summary are read when the columnar results are current
+        fraud_results = load_results(results_file, SUMMARY_DETECTORS)
+        explorer = cls(nodes, edges, fraud_results, load_or_compute_layout(data_file, nodes, edges), jobs)
         print("Data loaded successfully!")
+        return explorer
 
     def build_indexes(self):
         """Build helper indexes"""
+        # Typed forward/reverse adjacency for neighbor rings and node expansion
+        if isinstance(self.nodes, NodeSequence) and self.edges is self.nodes.store.edges:
+            self.adjacency = AdjacencyIndex.from_snapshot(self.nodes.store)
+        else:
+            self.adjacency = AdjacencyIndex.from_records(self.nodes, self.edges)
+
         self.fraud_nodes = set()
         self.fraud_professionals = set()  # Doctors/Lawyers with multiple suspicious clients
 
@@ -56,14 +126,292 @@ class InteractiveFraudExplorer:
                         if 'SUSPICIOUS_PROFESSIONAL' in self.fraud_flags.get(name, []):
                             self.fraud_professionals.add(node['id'])
 
-    def create_interactive_graph(self, fraud_filter="All", node_type_filter="All", max_nodes=500):
+        # Enter/exit interval index behind the time slider's slices
+        self.time_index = TimeIndex.for_graph(self.nodes, self.edges)
+
+        # Guilt-by-association risk per node (personalized PageRank from the detector run), ranked
+        self.risk_scores = {int(node_id): score
+                            for node_id, score in self.fraud_results.get('risk_scores', {}).items()}
+        self.risk_ranking = sorted(self.risk_scores, key=lambda node_id: (-self.risk_scores[node_id], node_id))
+        self.risk_rank = {node_id: rank for rank, node_id in enumerate(self.risk_ranking, 1)}
+
+    def create_interactive_graph(self, fraud_filter="All", node_type_filter="All", max_nodes=500,
+                                 time_range=None, job=None):
         """
         Create an interactive Plotly graph
+        time_range: (first day, last day) ordinals to show only the entities active then, or None
+        Figures are cached per filter combination; the filtered graph is shared across max_nodes
+        When run as a background job, progress is reported to job (and cancellation honored)
+        """
+        key = (fraud_filter, node_type_filter, int(max_nodes), time_range)
+        fig = self.figure_cache.get(key)
+        if fig is None:
+            G = self._filtered_graph(fraud_filter, node_type_filter, time_range, job)
+            fig = self._build_figure(G, int(max_nodes), job=job)
+            self.figure_cache.put(key, fig)
+        return fig
+
+    def _submit(self, kind, request, fn, *args):
+        """
+        Run fn(*args, job=job) in the background; each browser session has one slot per kind,
+        so a newer request of the same kind cancels the one it replaces
         """
+        session = getattr(request, 'session_hash', None)
+        return self.jobs.submit(fn, *args, name=kind, slot=(session, kind) if session else None)
+
+    def _stream_figure(self, request, fn, *args):
+        """Generator for Gradio: (figure update, status line) while the job runs, then its figure"""
+        try:
+            job = self._submit('graph', request, fn, *args)
+        except QueueFull:
+            yield gr.update(), "⚠ The server is busy with other graphs; please try again shortly"
+            return
+        try:
+            for progress, message in job.updates():
+                yield gr.update(), f"⏳ {message} ({progress:.0%})"
+            if job.cancelled:
+                yield gr.update(), "Cancelled"
+            elif job.error is not None:
+                yield self._message_figure(f"Error: {job.error}"), f"⚠ {job.error}"
+            else:
+                yield job.result, f"Ready in {job.elapsed:.1f}s"
+        finally:
+            job.cancel()  # The caller went away (or a filter changed): stop the work too
+
+    def _time_range(self, slice_start, slice_days):
+        """Day ordinals (first, last) picked on the time slider, or None when it spans every date"""
+        first_day, last_day = self.time_index.first_day, self.time_index.last_day
+        if first_day is None or slice_start is None or slice_days is None:
+            return None
+        start = first_day + max(int(slice_start), 0)
+        end = start + max(int(slice_days), 1) - 1
+        if start <= first_day and end >= last_day:
+            return None
+        return start, end
+
+    def graph_job(self, fraud_filter, node_type_filter, max_nodes, slice_start=None, slice_days=None,
+                  request: gr.Request = None):
+        """Background create_interactive_graph with streamed progress"""
+        yield from self._stream_figure(request, self.create_interactive_graph,
+                                       fraud_filter, node_type_filter, max_nodes,
+                                       self._time_range(slice_start, slice_days))
+
+    def expand_job(self, node_ref, hops, edge_types, max_nodes, request: gr.Request = None):
+        """Background expand_node with streamed progress"""
+        yield from self._stream_figure(request, self.expand_node, node_ref, hops, edge_types, max_nodes)
+
+    def details_job(self, entity_name, page=1, request: gr.Request = None):
+        """Background get_entity_details, streaming a progress line until the details are ready"""
+        try:
+            job = self._submit('details', request, self.get_entity_details, entity_name, page)
+        except QueueFull:
+            yield "⚠ The server is busy; please try again shortly"
+            return
+        try:
+            for progress, message in job.updates():
+                yield f"⏳ {message} ({progress:.0%})"
+            if job.error is not None:
+                yield f"⚠ Error: {job.error}"
+            elif not job.cancelled:
+                yield job.result
+        finally:
+            job.cancel()
+
+    def ego_network(self, node_id, hops=1, edge_types=None, limit=EGO_NODE_LIMIT):
+        """
+        Graph of the nodes within hops of node_id (following edges either way), capped at limit nodes
+        Walks the adjacency index, so nothing outside the neighborhood is touched
+        """
+        distances, edge_indices, truncated = self.adjacency.ego_network(node_id, int(hops), edge_types, int(limit))
+        G = nx.DiGraph(truncated=truncated)
+        for member, hop in distances.items():
+            node = self.node_dict.get(member)
+            if node is not None:
+                G.add_node(member, type=node['type'], label=node_label(node),
+                           is_fraud=member in self.fraud_nodes, hop=hop)
+        for edge_index in edge_indices:
+            edge = self.edges[edge_index]
+            if edge['from'] in G and edge['to'] in G:
+                G.add_edge(edge['from'], edge['to'], type=edge['type'])
+        return G
+
+    def _resolve_node(self, node_ref):
+        """Node ID for an ID or the best search match of a name/plate, or None"""
+        node_ref = str(node_ref or '').strip()
+        if node_ref.isdigit() and int(node_ref) in self.node_dict:
+            return int(node_ref)
+        _, hits = self.search_index.search(node_ref, 1, 1, fuzzy=False)
+        return hits[0][0]['id'] if hits else None
+
+    def expand_node(self, node_ref, hops=1, edge_types=None, max_nodes=EGO_NODE_LIMIT, job=None):
+        """Figure of the neighborhood around one node ("expand this node"), cached like the filtered views"""
+        node_id = self._resolve_node(node_ref)
+        if node_id is None:
+            return self._message_figure(f"No entity matches '{node_ref}'")
+
+        edge_types = tuple(edge_types) if edge_types else None
+        key = ('ego', node_id, int(hops), edge_types, int(max_nodes))
+        fig = self.figure_cache.get(key)
+        if fig is None:
+            report(job, 0.1, "Walking the neighborhood")
+            G = self.ego_network(node_id, hops, edge_types, max_nodes)
+            label = node_label(self.node_dict[node_id])
+            cut_off = f", cut off at {int(max_nodes)} nodes" if G.graph['truncated'] else ""
+            title = (f"Neighborhood of {label} (ID: {node_id})<br><sub>{int(hops)} hop(s): "
+                     f"{len(G.nodes())} nodes and {len(G.edges())} edges{cut_off}</sub>")
+            fig = self._build_figure(G, int(max_nodes), title=title, center=node_id, job=job)
+            self.figure_cache.put(key, fig)
+        return fig
+
+    def create_lod_graph(self, expanded=()):
+        """
+        Level-of-detail overview: accident clusters (or regions of clusters on very large graphs)
+        drawn as supernodes sized by entity count and shaded by fraud density, with expanded
+        supernodes opened up; at most MAX_MARKERS markers regardless of graph size
+        """
+        key = ('lod', tuple(sorted(expanded)))
+        fig = self.figure_cache.get(key)
+        if fig is None:
+            fig = self._build_lod_figure(expanded)
+            self.figure_cache.put(key, fig)
+        return fig
+
+    def lod_reset(self):
+        """Collapsed overview and an empty expansion list"""
+        return self.create_lod_graph(()), []
+
+    def lod_expand(self, key, expanded):
+        """
+        Expand one supernode (C<n>, R<n>, or a node ID/name, which opens that node's cluster)
+        Expansions that would push the view past MAX_MARKERS are refused
+        """
+        expanded = list(expanded or [])
+        key = str(key or '').strip().upper()
+        if not self.lod.has_key(key):
+            node_id = self._resolve_node(key)
+            key = self.lod.cluster_of(node_id) if node_id is not None else None
+        if key is None:
+            gr.Warning("No supernode or entity matches that key")
+            return self.create_lod_graph(expanded), expanded
+        if key not in expanded:
+            if self.lod.marker_count(expanded + [key]) > MAX_MARKERS:
+                gr.Warning(f"Expanding {key} would show more than {MAX_MARKERS} markers; collapse the overview first")
+                return self.create_lod_graph(expanded), expanded
+            expanded.append(key)
+        return self.create_lod_graph(expanded), expanded
+
+    def _build_lod_figure(self, expanded):
+        markers, links = self.lod.view(expanded)
+
+        # Links bucketed by edge count so heavier bundles draw thicker
+        edge_traces = []
+        for low, high, width in ((1, 1, 0.5), (2, 5, 1.5), (6, None, 3)):
+            edge_x, edge_y = [], []
+            for a, b, count in links:
+                if count >= low and (high is None or count <= high):
+                    edge_x.extend([markers[a]['x'], markers[b]['x'], None])
+                    edge_y.extend([markers[a]['y'], markers[b]['y'], None])
+            if edge_x:
+                edge_traces.append(go.Scatter(
+                    x=edge_x, y=edge_y,
+                    line=dict(width=width, color='#999999'),
+                    hoverinfo='none',
+                    mode='lines',
+                    name=f"{low}+ edges" if high is None else (f"{low}-{high} edges" if high > low else f"{low} edge"),
+                    showlegend=True
+                ))
+
+        supernodes = [m for m in markers if m['kind'] != 'node']
+        members = [m for m in markers if m['kind'] == 'node']
+        node_traces = []
+        if supernodes:
+            density = [m['fraud'] / m['size'] for m in supernodes]
+            node_traces.append(go.Scatter(
+                x=[m['x'] for m in supernodes],
+                y=[m['y'] for m in supernodes],
+                mode='markers',
+                name='Supernodes (size = entities, color = fraud density)',
+                marker=dict(
+                    size=[8 + 4 * np.log2(m['size']) for m in supernodes],
+                    symbol=['square' if m['kind'] == 'region' else 'circle' for m in supernodes],
+                    color=density,
+                    colorscale='Reds',
+                    cmin=0,
+                    cmax=max(max(density), 0.05),
+                    colorbar=dict(title="Fraud density", x=1.02),
+                    line=dict(width=1, color='#333333')
+                ),
+                text=[f"<b>{m['label']}</b><br>Supernode {m['key']}: {m['size']} entities, "
+                      f"{m['fraud']} suspicious ({m['fraud'] / m['size']:.0%})<br>Expand with key {m['key']}"
+                      for m in supernodes],
+                hoverinfo='text',
+                customdata=[m['key'] for m in supernodes],
+                showlegend=True
+            ))
+        for node_type in sorted({m['type'] for m in members}):
+            typed = [m for m in members if m['type'] == node_type]
+            node_traces.append(go.Scatter(
+                x=[m['x'] for m in typed],
+                y=[m['y'] for m in typed],
+                mode='markers',
+                name=node_type,
+                marker=dict(
+                    size=[14 if m['fraud'] else 8 for m in typed],
+                    color=['#FF0000' if m['fraud'] else NODE_COLORS.get(node_type, '#CCCCCC') for m in typed],
+                    line=dict(width=1, color='#333333')
+                ),
+                text=[f"<b>{m['label']}</b><br>Type: {node_type}<br>ID: {m['key']}<br>In {m['cluster']}"
+                      + ("<br><b style='color:red'>⚠ SUSPICIOUS</b>" if m['fraud'] else "") for m in typed],
+                hoverinfo='text',
+                customdata=[m['key'] for m in typed],
+                showlegend=True
+            ))
+
+        fig = go.Figure(data=edge_traces + node_traces)
+        opened = f", expanded: {', '.join(expanded)}" if expanded else ""
+        fig.update_layout(
+            title=f"Network Overview<br><sub>{len(supernodes)} supernodes, {len(members)} entities, "
+                  f"{len(links)} links (of {len(self.nodes)} entities{opened})</sub>",
+            showlegend=True,
+            hovermode='closest',
+            margin=dict(b=20, l=5, r=5, t=80),
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            plot_bgcolor='#f5f5f5',
+            height=700,
+            legend=dict(
+                yanchor="top",
+                y=0.99,
+                xanchor="left",
+                x=0.01,
+                bgcolor="rgba(255,255,255,0.8)"
+            )
+        )
+        return fig
+
+    def _filtered_graph(self, fraud_filter, node_type_filter, time_range=None, job=None):
+        """Graph of the nodes passing the filters (plus neighbors for Suspicious Only); treat as read-only"""
+        key = (fraud_filter, node_type_filter, time_range)
+        G = self.graph_cache.get(key)
+        if G is None:
+            G = self._build_filtered_graph(fraud_filter, node_type_filter, time_range, job)
+            self.graph_cache.put(key, G)
+        return G
+
+    def _build_filtered_graph(self, fraud_filter, node_type_filter, time_range=None, job=None):
+        # A time range narrows everything below to a slice view of the nodes and edges active then
+        nodes, edges, active = self.nodes, self.edges, None
         G = nx.DiGraph()
+        if time_range is not None:
+            window = self.time_index.slice(self.nodes, self.edges, *time_range)
+            nodes, edges = window.nodes, window.edges
+            active = set(window.node_ids.tolist())
+            G.graph['period'] = window.period
 
         # Add nodes with attributes
-        for node in self.nodes:
+        for position, node in enumerate(nodes):
+            if position % PROGRESS_EVERY == 0:
+                report(job, 0.3 * position / len(nodes), "Filtering nodes")
             node_id = node['id']
             node_type = node['type']
             info = node.get('info', '')
@@ -85,7 +433,9 @@ class InteractiveFraudExplorer:
             G.add_node(node_id, type=node_type, label=label, is_fraud=is_fraud)
 
         # Add edges
-        for edge in self.edges:
+        for position, edge in enumerate(edges):
+            if position % PROGRESS_EVERY == 0:
+                report(job, 0.3 + 0.2 * position / len(edges), "Collecting edges")
             if edge['from'] in G.nodes() and edge['to'] in G.nodes():
                 G.add_edge(edge['from'], edge['to'], type=edge['type'])
 
@@ -95,15 +445,12 @@ class InteractiveFraudExplorer:
             for node_id in list(G.nodes()):
                 if G.nodes[node_id]['is_fraud']:
                     # Add all neighbors from original graph
-                    for edge in self.edges:
-                        if edge['from'] == node_id:
-                            nodes_to_add.add(edge['to'])
-                        if edge['to'] == node_id:
-                            nodes_to_add.add(edge['from'])
+                    nodes_to_add.update(self.adjacency.successors(node_id))
+                    nodes_to_add.update(self.adjacency.predecessors(node_id))
 
             # Add neighboring nodes
             for node_id in nodes_to_add:
-                if node_id not in G.nodes() and node_id in self.node_dict:
+                if node_id not in G.nodes() and node_id in self.node_dict and (active is None or node_id in active):
                     node = self.node_dict[node_id]
                     node_type = node['type']
                     info = node.get('info', '')
@@ -114,11 +461,29 @@ class InteractiveFraudExplorer:
                     G.add_node(node_id, type=node_type, label=label, is_fraud=False)
 
             # Add edges between these nodes
-            for edge in self.edges:
+            for position, edge in enumerate(edges):
+                if position % PROGRESS_EVERY == 0:
+                    report(job, 0.5 + 0.1 * position / len(edges), "Adding neighbor edges")
                 if edge['from'] in G.nodes() and edge['to'] in G.nodes():
                     if not G.has_edge(edge['from'], edge['to']):
                         G.add_edge(edge['from'], edge['to'], type=edge['type'])
 
+        return G
+
+    def _message_figure(self, text):
+        """Empty figure showing a message"""
+        fig = go.Figure()
+        fig.add_annotation(
+            text=text,
+            xref="paper", yref="paper",
+            x=0.5, y=0.5, showarrow=False,
+            font=dict(size=20)
+        )
+        return fig
+
+    def _build_figure(self, G, max_nodes, title=None, center=None, job=None):
+        report(job, 0.6, "Sampling nodes")
+
         # Limit nodes for performance
         if len(G.nodes()) > max_nodes:
             # Keep fraud nodes + random sample
@@ -133,17 +498,11 @@ class InteractiveFraudExplorer:
 
         if len(G.nodes()) == 0:
             # Return empty figure with message
-            fig = go.Figure()
-            fig.add_annotation(
-                text="No nodes match the current filters",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False,
-                font=dict(size=20)
-            )
-            return fig
+            return self._message_figure("No nodes match the current filters")
 
-        # Calculate layout
-        pos = nx.spring_layout(G, k=0.5, iterations=50, seed=42)
+        # Positions from the precomputed global layout
+        pos = self.layout
+        report(job, 0.7, "Drawing edges")
 
         # Create edge traces
         edge_traces = []
@@ -197,6 +556,7 @@ class InteractiveFraudExplorer:
         suspicious_professional_traces = defaultdict(lambda: {'x': [], 'y': [], 'text': [], 'customdata': []})
         fraud_trace_data = {'x': [], 'y': [], 'text': [], 'customdata': []}
 
+        report(job, 0.8, "Drawing nodes")
         for node_id in G.nodes():
             x, y = pos[node_id]
             node_data = G.nodes[node_id]
@@ -289,11 +649,27 @@ class InteractiveFraudExplorer:
                 )
                 node_traces.append(node_trace)
 
+        # Ring around the expanded node
+        if center is not None and center in G:
+            x, y = pos[center]
+            node_traces.append(go.Scatter(
+                x=[x], y=[y],
+                mode='markers',
+                name='Expanded Node',
+                marker=dict(size=32, color='rgba(0,0,0,0)', line=dict(width=3, color='#1f77b4')),
+                hoverinfo='skip',
+                showlegend=True
+            ))
+
         # Create figure
+        report(job, 0.95, "Building figure")
         fig = go.Figure(data=edge_traces + node_traces)
 
+        if title is None:
+            period = " from {} to {}".format(*G.graph['period']) if 'period' in G.graph else ""
+            title = f"Insurance Fraud Detection Network<br><sub>Showing {len(G.nodes())} nodes and {len(G.edges())} edges{period}</sub>"
         fig.update_layout(
-            title=f"Insurance Fraud Detection Network<br><sub>Showing {len(G.nodes())} nodes and {len(G.edges())} edges</sub>",
+            title=title,
             showlegend=True,
             hovermode='closest',
             margin=dict(b=20, l=5, r=5, t=80),
@@ -312,52 +688,58 @@ class InteractiveFraudExplorer:
 
         return fig
 
-    def search_entity(self, search_term):
-        """Search for entities by name or ID"""
+    def _page_header(self, total, page, page_size=PAGE_SIZE):
+        """'Showing 21-40 of 57 (page 2 of 3)' line, or None when the page is past the end"""
+        pages = (total + page_size - 1) // page_size
+        page = max(int(page), 1)
+        if page > pages:
+            return None
+        first = (page - 1) * page_size + 1
+        last = min(page * page_size, total)
+        return f"*Showing {first}-{last} of {total} (page {page} of {pages})*"
+
+    def search_entity(self, search_term, page=1):
+        """Search for entities by name, plate or ID (ranked, paged)"""
         if not search_term:
             return "Please enter a search term"
 
-        search_term = search_term.upper()
-        results = []
+        total, hits = self.search_index.search(search_term, page)
+        if not total:
+            return "No entities found matching your search"
+        header = self._page_header(total, page)
+        if header is None:
+            return f"No more results ({total} matches)"
 
-        for node in self.nodes:
+        results = [header]
+        for node, tier, score in hits:
             node_id = node['id']
-            node_type = node['type']
-            info = node.get('info', '')
-
-            if isinstance(info, dict) and 'name' in info:
-                label = info['name']
-            else:
-                label = str(info)
-
-            # Check if matches search
-            if search_term in label.upper() or search_term in str(node_id):
-                is_fraud = node_id in self.fraud_nodes
-                fraud_status = "⚠ SUSPICIOUS" if is_fraud else "Normal"
+            label = node_label(node)
+            is_fraud = node_id in self.fraud_nodes
+            fraud_status = "⚠ SUSPICIOUS" if is_fraud else "Normal"
 
-                result_text = f"**{label}** (ID: {node_id})\n"
-                result_text += f"- Type: {node_type}\n"
-                result_text += f"- Status: {fraud_status}\n"
+            result_text = f"**{label}** (ID: {node_id})\n"
+            result_text += f"- Type: {node['type']}\n"
+            result_text += f"- Status: {fraud_status}\n"
+            if tier == FUZZY:
+                result_text += f"- Match: {TIER_NAMES[tier]} ({score:.0%})\n"
 
-                if is_fraud and label in self.fraud_flags:
-                    flags = self.fraud_flags[label]
-                    result_text += f"- Fraud Indicators: {', '.join(flags)}\n"
+            if is_fraud and label in self.fraud_flags:
+                flags = self.fraud_flags[label]
+                result_text += f"- Fraud Indicators: {', '.join(flags)}\n"
 
-                results.append(result_text)
-
-        if not results:
-            return "No entities found matching your search"
+            results.append(result_text)
 
-        return "\n\n".join(results[:20])  # Limit to top 20 results
+        return "\n\n".join(results)
 
     def get_fraud_summary(self):
         """Get summary statistics"""
         findings = self.fraud_results['findings']
+        counts = self.fraud_results['finding_counts']
 
         summary = "## Fraud Detection Summary\n\n"
         summary += f"**Total Entities**: {len(self.nodes)}\n"
         summary += f"**Total Relationships**: {len(self.edges)}\n"
-        summary += f"**Suspicious Entities**: {len(self.fraud_flags)}\n\n"
+        summary += f"**Suspicious Entities**: {len(self.fraud_results['fraud_flags'])}\n\n"
 
         summary += "### Detection Results by Category:\n\n"
 
@@ -366,26 +748,22 @@ class InteractiveFraudExplorer:
             summary += f"**Statistical Outliers**: {len(outliers)} participants\n"
             summary += "   - Top suspects (6+ accidents): " + ", ".join([x['name'] for x in outliers if x['accident_count'] >= 6][:5]) + "\n\n"
 
-        time_patterns = findings['time_patterns']
-        if time_patterns:
-            summary += f"**Time-Based Patterns**: {len(time_patterns)} cases\n"
+        if counts.get('time_patterns'):
+            summary += f"**Time-Based Patterns**: {counts['time_patterns']} cases\n"
             summary += "   - Multiple accidents within 30 days\n\n"
 
-        repeated_cars = findings['repeated_cars']
-        if repeated_cars:
-            summary += f"**Repeated Cars**: {len(repeated_cars)} vehicles\n\n"
+        if counts.get('repeated_cars'):
+            summary += f"**Repeated Cars**: {counts['repeated_cars']} vehicles\n\n"
         else:
             summary += "**Repeated Cars**: None detected\n\n"
 
-        repeated_witnesses = findings['repeated_witnesses']
-        if repeated_witnesses:
-            summary += f"**Repeated Witnesses**: {len(repeated_witnesses)} individuals\n\n"
+        if counts.get('repeated_witnesses'):
+            summary += f"**Repeated Witnesses**: {counts['repeated_witnesses']} individuals\n\n"
         else:
             summary += "**Repeated Witnesses**: None detected\n\n"
 
-        role_switching = findings['role_switching']
-        if role_switching:
-            summary += f"**Role Switching**: {len(role_switching)} individuals\n\n"
+        if counts.get('role_switching'):
+            summary += f"**Role Switching**: {counts['role_switching']} individuals\n\n"
         else:
             summary += "**Role Switching**: None detected\n\n"
 
@@ -397,6 +775,21 @@ class InteractiveFraudExplorer:
         else:
             summary += "**Suspicious Professionals**: None detected\n\n"
 
+        fraud_rings = findings.get('fraud_rings', [])
+        if fraud_rings:
+            summary += f"**Fraud Rings**: {len(fraud_rings)} groups\n"
+            summary += "   - Sharing accidents, cars and professionals\n"
+            summary += "   - Largest: " + ", ".join([f"{len(x['members'])} people (score {x['score']:.2f})" for x in sorted(fraud_rings, key=lambda x: x['size'], reverse=True)[:3]]) + "\n\n"
+        else:
+            summary += "**Fraud Rings**: None detected\n\n"
+
+        if counts.get('co_participation'):
+            groups = self.fraud_results['type_counts'].get('CO_PARTICIPATION_CLIQUE', 0)
+            summary += f"**Co-Participation**: {counts['co_participation'] - groups} pairs, {groups} cliques\n"
+            summary += "   - People repeatedly in accidents together\n\n"
+        else:
+            summary += "**Co-Participation**: None detected\n\n"
+
         return summary
 
     def get_top_suspects(self):
@@ -418,73 +811,159 @@ class InteractiveFraudExplorer:
         df = pd.DataFrame(data)
         return df
 
-    def get_entity_details(self, entity_name):
-        """Get detailed information about a specific entity"""
+    def get_risk_note(self):
+        """Hint shown above the risk table when the results predate risk propagation"""
+        if self.risk_scores:
+            return ""
+        return ("*No risk scores in the loaded results: re-run `fraud_detector.py` to compute them "
+                "(the explorer picks the new results up automatically).*")
+
+    def get_top_risk_entities(self, limit=20):
+        """Get table of the nodes with the highest propagated risk"""
+        data = []
+        for node_id in self.risk_ranking[:limit]:
+            node = self.node_dict.get(node_id)
+            if node is None:
+                continue
+            label = node_label(node)
+            data.append({
+                'Rank': self.risk_rank[node_id],
+                'Name': label,
+                'Type': node['type'],
+                'Node ID': node_id,
+                'Risk Score': self.risk_scores[node_id],
+                'Fraud Indicators': ', '.join(self.fraud_flags.get(label, [])) or '-'
+            })
+
+        df = pd.DataFrame(data, columns=RISK_COLUMNS)
+        return df
+
+    def get_dataset_overview(self):
+        """Dataset section of the About tab, from the loaded data and results"""
+        type_counts = Counter(node['type'] for node in self.nodes)
+        overview = "### Dataset\n\n"
+        overview += f"- {len(self.nodes):,} entities ({', '.join(f'{count:,} {node_type}' for node_type, count in type_counts.most_common())})\n"
+        overview += f"- {len(self.edges):,} relationships\n"
+        overview += f"- {len(self.fraud_results['fraud_flags']):,} suspicious entities identified\n"
+        if self.risk_scores:
+            overview += f"- {len(self.risk_scores):,} entities with a propagated risk score\n"
+        return overview
+
+    def get_entity_details(self, entity_name, page=1, job=None):
+        """Get detailed information about the entities matching a name (paged)"""
         if not entity_name:
             return "Please enter an entity name"
 
-        entity_name = entity_name.upper()
-        details = ""
+        total, hits = self.search_index.search(entity_name, page, fuzzy=False)
+        if not total:
+            return "Entity not found"
+        header = self._page_header(total, page)
+        if header is None:
+            return f"No more results ({total} matches)"
 
-        for node in self.nodes:
+        details = header + "\n\n"
+        for position, (node, _, _) in enumerate(hits):
+            report(job, position / len(hits), f"Collecting connections ({position + 1} of {len(hits)})")
             node_id = node['id']
             node_type = node['type']
             info = node.get('info', '')
+            label = node_label(node)
 
-            if isinstance(info, dict) and 'name' in info:
-                label = info['name']
+            details += f"## {label}\n\n"
+            details += f"**Node ID**: {node_id}\n"
+            details += f"**Type**: {node_type}\n"
+
+            if isinstance(info, dict):
+                details += f"**Role**: {info.get('role', 'N/A')}\n"
+
+            # Check fraud status
+            is_fraud = node_id in self.fraud_nodes
+            if is_fraud:
+                details += f"\n⚠ **STATUS: SUSPICIOUS**\n"
+                if label in self.fraud_flags:
+                    flags = self.fraud_flags[label]
+                    details += f"**Fraud Indicators**: {', '.join(flags)}\n"
             else:
-                label = str(info)
+                details += f"\n✓ **STATUS: Normal**\n"
 
-            if entity_name in label.upper():
-                details += f"## {label}\n\n"
-                details += f"**Node ID**: {node_id}\n"
-                details += f"**Type**: {node_type}\n"
-
-                if isinstance(info, dict):
-                    details += f"**Role**: {info.get('role', 'N/A')}\n"
-
-                # Check fraud status
-                is_fraud = node_id in self.fraud_nodes
-                if is_fraud:
-                    details += f"\n⚠ **STATUS: SUSPICIOUS**\n"
-                    if label in self.fraud_flags:
-                        flags = self.fraud_flags[label]
-                        details += f"**Fraud Indicators**: {', '.join(flags)}\n"
-                else:
-                    details += f"\n✓ **STATUS: Normal**\n"
-
-                # Find connections
-                details += f"\n### Connections:\n"
-                outgoing = [e for e in self.edges if e['from'] == node_id]
-                incoming = [e for e in self.edges if e['to'] == node_id]
-
-                if outgoing:
-                    details += f"\n**Outgoing ({len(outgoing)})**:\n"
-                    for edge in outgoing[:10]:
-                        target = self.node_dict.get(edge['to'])
-                        if target:
-                            target_label = target.get('info', {}).get('name', str(target.get('info', ''))) if isinstance(target.get('info'), dict) else str(target.get('info', ''))
-                            details += f"- {edge['type']} → {target_label} ({target['type']})\n"
-
-                if incoming:
-                    details += f"\n**Incoming ({len(incoming)})**:\n"
-                    for edge in incoming[:10]:
-                        source = self.node_dict.get(edge['from'])
-                        if source:
-                            source_label = source.get('info', {}).get('name', str(source.get('info', ''))) if isinstance(source.get('info'), dict) else str(source.get('info', ''))
-                            details += f"- {source_label} ({source['type']}) → {edge['type']}\n"
-
-                details += "\n---\n\n"
-
-        if not details:
-            return "Entity not found"
+            if node_id in self.risk_rank:
+                details += (f"**Risk Score**: {self.risk_scores[node_id]:.3f} "
+                            f"(rank {self.risk_rank[node_id]} of {len(self.risk_rank)})\n")
+
+            # Find connections
+            details += f"\n### Connections:\n"
+            outgoing = self.search_index.out_edges(node_id)
+            incoming = self.search_index.in_edges(node_id)
+
+            if outgoing:
+                details += f"\n**Outgoing ({len(outgoing)})**:\n"
+                for edge in outgoing[:10]:
+                    target = self.node_dict.get(edge['to'])
+                    if target:
+                        details += f"- {edge['type']} → {node_label(target)} ({target['type']})\n"
+
+            if incoming:
+                details += f"\n**Incoming ({len(incoming)})**:\n"
+                for edge in incoming[:10]:
+                    source = self.node_dict.get(edge['from'])
+                    if source:
+                        details += f"- {node_label(source)} ({source['type']}) → {edge['type']}\n"
+
+            details += "\n---\n\n"
 
         return details
 
+def _current(name):
+    """LiveExplorer handler running InteractiveFraudExplorer.<name> on the version current at the call"""
+    method = getattr(InteractiveFraudExplorer, name)
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def handler(self, *args, **kwargs):
+            yield from method(self.current, *args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def handler(self, *args, **kwargs):
+            return method(self.current, *args, **kwargs)
+    return handler
+
+class LiveExplorer(HotReloader):
+    """
+    Explorer that follows its data and results files: after a new detector run (or data drop)
+    a fresh InteractiveFraudExplorer is built in the background and swapped in when complete
+    Every handler works on the version current when its request arrived, so requests in flight
+    finish on the data they started with and the server never stops answering
+    """
+
+    def __init__(self, data_file=DATA_FILE, results_file=RESULTS_FILE, interval=WATCH_INTERVAL):
+        self.jobs = JobRunner()  # One pool for all versions keeps the job backlog bounded
+        # The flag table is written last by fraud_detector.py, after the JSON and the findings
+        paths = [data_file, results_file, results_paths(results_file)[1]]
+        super().__init__(lambda previous: InteractiveFraudExplorer.from_files(data_file, results_file, self.jobs),
+                         paths, interval, name='explorer-reload')
+
+    def status(self):
+        """One line naming the data version being served"""
+        loaded = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.loaded_at))
+        line = f"Data version {self.version}, loaded {loaded}"
+        if self.error is not None:
+            line += f" (latest reload failed: {self.error})"
+        return line
+
+    lod_reset = _current('lod_reset')
+    lod_expand = _current('lod_expand')
+    graph_job = _current('graph_job')
+    expand_job = _current('expand_job')
+    search_entity = _current('search_entity')
+    details_job = _current('details_job')
+    get_fraud_summary = _current('get_fraud_summary')
+    get_top_suspects = _current('get_top_suspects')
+    get_top_risk_entities = _current('get_top_risk_entities')
+    get_risk_note = _current('get_risk_note')
+    get_dataset_overview = _current('get_dataset_overview')
+
 def create_gradio_app():
     """Create the Gradio interface"""
-    explorer = InteractiveFraudExplorer()
+    explorer = LiveExplorer().start()
 
     with gr.Blocks(title="Insurance Fraud Detection Explorer", theme=gr.themes.Soft()) as app:
         gr.Markdown("""
@@ -492,6 +971,7 @@ def create_gradio_app():
 
         Interactive graph analytics tool for exploring insurance claim networks and detecting fraud patterns.
         """)
+        gr.Markdown(value=explorer.status)  # Callable values are refreshed on every page load
 
         with gr.Tabs():
             # Tab 1: Interactive Graph
@@ -522,22 +1002,106 @@ def create_gradio_app():
                         label="Max Nodes (for performance)"
                     )
 
+                # Time slice: only the entities active (between enter and exit) in the chosen days
+                time_index = explorer.current.time_index
+                span = 1 if time_index.first_day is None else time_index.last_day - time_index.first_day + 1
+                first_date = "" if time_index.first_day is None else f" after {date.fromordinal(time_index.first_day)}"
+                with gr.Row():
+                    slice_start = gr.Slider(
+                        minimum=0,
+                        maximum=span - 1,
+                        value=0,
+                        step=1,
+                        label=f"Time Slice Start (days{first_date})"
+                    )
+                    slice_days = gr.Slider(
+                        minimum=1,
+                        maximum=span,
+                        value=span,
+                        step=1,
+                        label="Time Slice Length (days)"
+                    )
+
                 graph_button = gr.Button("Generate Graph", variant="primary")
+
+                # Walk out from one suspect instead of redrawing the whole network
+                with gr.Row():
+                    expand_input = gr.Textbox(
+                        label="Expand This Node",
+                        placeholder="Node ID or name (hover a node to see its ID)..."
+                    )
+                    expand_hops = gr.Slider(
+                        minimum=1,
+                        maximum=4,
+                        value=1,
+                        step=1,
+                        label="Hops"
+                    )
+                    expand_edge_types = gr.CheckboxGroup(
+                        choices=list(EDGE_TYPES),
+                        value=list(EDGE_TYPES),
+                        label="Follow Edge Types"
+                    )
+                expand_button = gr.Button("Expand Node")
+
+                # Level-of-detail overview: supernodes that open up on request
+                with gr.Row():
+                    lod_button = gr.Button("Overview (Supernodes)")
+                    lod_input = gr.Textbox(
+                        label="Expand Supernode",
+                        placeholder="Supernode key from the hover text (e.g. C12, R3) or a node ID/name..."
+                    )
+                    lod_expand_button = gr.Button("Expand Supernode")
+                lod_expanded = gr.State([])
+
+                graph_status = gr.Markdown()
                 graph_output = gr.Plot(label="Insurance Network Graph")
 
-                graph_button.click(
-                    fn=explorer.create_interactive_graph,
-                    inputs=[fraud_filter, node_type_filter, max_nodes],
-                    outputs=graph_output
+                lod_button.click(
+                    fn=explorer.lod_reset,
+                    inputs=None,
+                    outputs=[graph_output, lod_expanded]
                 )
-
-                # Auto-generate on load
-                app.load(
-                    fn=explorer.create_interactive_graph,
-                    inputs=[fraud_filter, node_type_filter, max_nodes],
-                    outputs=graph_output
+                lod_expand_button.click(
+                    fn=explorer.lod_expand,
+                    inputs=[lod_input, lod_expanded],
+                    outputs=[graph_output, lod_expanded]
+                )
+                lod_input.submit(
+                    fn=explorer.lod_expand,
+                    inputs=[lod_input, lod_expanded],
+                    outputs=[graph_output, lod_expanded]
                 )
 
+                # Graph builds run as background jobs that stream their progress into graph_status
+                graph_events = [
+                    graph_button.click(
+                        fn=explorer.graph_job,
+                        inputs=[fraud_filter, node_type_filter, max_nodes, slice_start, slice_days],
+                        outputs=[graph_output, graph_status]
+                    ),
+                    expand_button.click(
+                        fn=explorer.expand_job,
+                        inputs=[expand_input, expand_hops, expand_edge_types, max_nodes],
+                        outputs=[graph_output, graph_status]
+                    ),
+                    expand_input.submit(
+                        fn=explorer.expand_job,
+                        inputs=[expand_input, expand_hops, expand_edge_types, max_nodes],
+                        outputs=[graph_output, graph_status]
+                    ),
+                    # Auto-generate on load
+                    app.load(
+                        fn=explorer.graph_job,
+                        inputs=[fraud_filter, node_type_filter, max_nodes, slice_start, slice_days],
+                        outputs=[graph_output, graph_status]
+                    ),
+                ]
+
+                # Changing a filter abandons the graph being built for the old one
+                for control in (fraud_filter, node_type_filter, max_nodes, slice_start, slice_days):
+                    control.change(fn=None, inputs=None, outputs=None, cancels=graph_events)
+
             # Tab 2: Search & Details
             with gr.Tab("🔎 Search & Details"):
                 gr.Markdown("Search for specific entities and view detailed information.")
@@ -548,12 +1112,18 @@ def create_gradio_app():
                             label="Search Entity",
                             placeholder="Enter name or ID..."
                         )
+                        search_page = gr.Number(value=1, precision=0, minimum=1, label="Page")
                         search_button = gr.Button("Search", variant="primary")
                         search_output = gr.Markdown(label="Search Results")
 
                         search_button.click(
                             fn=explorer.search_entity,
-                            inputs=search_input,
+                            inputs=[search_input, search_page],
+                            outputs=search_output
+                        )
+                        search_page.change(
+                            fn=explorer.search_entity,
+                            inputs=[search_input, search_page],
                             outputs=search_output
                         )
 
@@ -562,12 +1132,18 @@ def create_gradio_app():
                             label="Get Entity Details",
                             placeholder="Enter name for full details..."
                         )
+                        detail_page = gr.Number(value=1, precision=0, minimum=1, label="Page")
                         detail_button = gr.Button("Get Details", variant="primary")
                         detail_output = gr.Markdown(label="Entity Details")
 
                         detail_button.click(
-                            fn=explorer.get_entity_details,
-                            inputs=detail_input,
+                            fn=explorer.details_job,
+                            inputs=[detail_input, detail_page],
+                            outputs=detail_output
+                        )
+                        detail_page.change(
+                            fn=explorer.details_job,
+                            inputs=[detail_input, detail_page],
                             outputs=detail_output
                         )
 
@@ -575,14 +1151,21 @@ def create_gradio_app():
             with gr.Tab("📊 Fraud Summary"):
                 gr.Markdown("Overview of fraud detection results and top suspects.")
 
-                summary_output = gr.Markdown(value=explorer.get_fraud_summary())
+                summary_output = gr.Markdown(value=explorer.get_fraud_summary)
 
                 gr.Markdown("### Top 20 Suspicious Entities")
                 suspects_table = gr.Dataframe(
-                    value=explorer.get_top_suspects(),
+                    value=explorer.get_top_suspects,
                     label="Top Suspects"
                 )
 
+                gr.Markdown("### Highest Risk Entities (Guilt by Association)")
+                gr.Markdown(value=explorer.get_risk_note)
+                risk_table = gr.Dataframe(
+                    value=explorer.get_top_risk_entities,
+                    label="Propagated Risk"
+                )
+
             # Tab 4: About
             with gr.Tab("ℹ️ About"):
                 gr.Markdown("""
@@ -612,23 +1195,34 @@ def create_gradio_app():
                    - Tracks people alternating driver/passenger roles
                    - Indicates organized fraud
 
+                6. **Suspicious Professional Detection**
+                   - Doctors and lawyers with 2+ flagged clients
+
+                7. **Fraud Ring Detection**
+                   - Groups tied together by shared accidents, cars and professionals
+
+                8. **Co-Participation Detection**
+                   - Pairs and cliques of people who keep turning up together
+
+                9. **Risk Propagation Score**
+                   - Personalized PageRank from flagged people: guilt by association for every node
+
                 ### How to Use
 
                 - **Interactive Graph Tab**: Visualize and explore the network
                 - **Search & Details Tab**: Look up specific entities
                 - **Fraud Summary Tab**: View overall statistics
 
-                ### Dataset
-
-                - 1,547 entities (Accidents, Cars, Lawyers, Doctors, Participants, Witnesses)
-                - 1,947 relationships
-                - 36 suspicious entities identified
-
+                """)
+                gr.Markdown(value=explorer.get_dataset_overview)  # Refreshed on page load, follows reloads
+                gr.Markdown("""
                 ---
 
                 Built with Gradio, Plotly, and NetworkX
                 """)
 
+    # Bounded request queue; the CPU-heavy work itself is bounded by the explorer's job pool
+    app.queue(max_size=REQUEST_QUEUE_SIZE)
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Streaming and Columnar Fraud Results
+Writes findings as JSON Lines (one finding per line, streamed) and the flags as a column
+file (one row per entity flag, with entity ID, detector, severity and metrics), so readers
+load only the columns and rows they need instead of the whole results JSON
+"""
+
+import json
+import os
+
+import numpy as np
+
+FINDINGS_SUFFIX = '.findings.jsonl'
+FLAGS_SUFFIX = '.flags.npz'
+SEVERITIES = ('LOW', 'MEDIUM', 'HIGH')  # Severity codes are positions in this tuple
+
+def results_paths(results_file):
+    """(findings JSONL path, flag table path) stored next to a results JSON file"""
+    base = os.path.splitext(results_file)[0]
+    return base + FINDINGS_SUFFIX, base + FLAGS_SUFFIX
+
+def finding_counts(findings):
+    """({findings key: count}, {finding type: count}) for a findings dict"""
+    counts = {}
+    type_counts = {}
+    for key, items in findings.items():
+        counts[key] = len(items)
+        for item in items:
+            type_counts[item['type']] = type_counts.get(item['type'], 0) + 1
+    return counts, type_counts
+
+def _line_prefix(detector):
+    return '{"detector": ' + json.dumps(detector) + ','
+
+def write_findings_jsonl(path, findings):
+    """Write every finding as one {'detector': key, ...finding} line, one at a time (temp file + rename)"""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        for key, items in findings.items():
+            for item in items:
+                f.write(json.dumps({'detector': key, **item}))
+                f.write('\n')
+    os.replace(tmp_path, path)
+
+def iter_findings(path, detectors=None):
+    """
+    Stream findings back from a JSONL file as (detector, finding)
+    Lines of detectors not asked for are skipped on their prefix, without being parsed
+    """
+    prefixes = None if detectors is None else tuple(_line_prefix(detector) for detector in detectors)
+    with open(path, 'r') as f:
+        for line in f:
+            if prefixes is not None and not line.startswith(prefixes):
+                continue
+            item = json.loads(line)
+            yield item.pop('detector'), item
+
+def read_findings(path, detectors):
+    """{detector: [findings]} for the given detectors (each present, possibly empty)"""
+    findings = {detector: [] for detector in detectors}
+    if not findings:
+        return findings
+    for detector, item in iter_findings(path, detectors):
+        findings[detector].append(item)
+    return findings
+
+def write_flag_table(path, rows, risk_scores, meta):
+    """
+    Write the flag table (temp file + rename)
+    rows: (entity name, entity ID, flag, severity, metric, risk) per entity flag; risk_scores:
+    {node ID: risk}; meta: JSON-serializable run information (summary, finding counts, ...)
+    """
+    names = {}
+    flag_names = {}
+    entity = np.zeros(len(rows), dtype=np.int32)
+    entity_id = np.zeros(len(rows), dtype=np.int64)
+    flag = np.zeros(len(rows), dtype=np.int16)
+    severity = np.zeros(len(rows), dtype=np.int8)
+    metric = np.zeros(len(rows), dtype=np.float64)
+    risk = np.zeros(len(rows), dtype=np.float32)
+    for i, (name, node_id, flag_name, severity_name, value, entity_risk) in enumerate(rows):
+        entity[i] = names.setdefault(name, len(names))
+        entity_id[i] = node_id
+        flag[i] = flag_names.setdefault(flag_name, len(flag_names))
+        severity[i] = SEVERITIES.index(severity_name)
+        metric[i] = value
+        risk[i] = entity_risk
+
+    risk_ids = np.fromiter(risk_scores.keys(), dtype=np.int64, count=len(risk_scores))
+    risk_values = np.fromiter(risk_scores.values(), dtype=np.float64, count=len(risk_scores))
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:  # Through a file object so numpy keeps the exact name
+        np.savez(f, entity=entity, entity_id=entity_id, flag=flag, severity=severity, metric=metric,
+                 risk=risk, entity_names=np.array(list(names), dtype=str),
+                 flag_names=np.array(list(flag_names), dtype=str),
+                 risk_node_ids=risk_ids, risk_scores=risk_values, meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)  # Readers (such as a hot-reloading explorer) never see a partial table
+
+class FlagTable:
+    """
+    Reader for a flag table; each column is loaded from the file only when first used
+    Columns: entity (code into entity_names), entity_id, flag (code into flag_names),
+    severity (code into SEVERITIES), metric, risk
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = np.load(path, allow_pickle=False)
+        self.meta = json.loads(str(self.data['meta']))
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = self.data[name]
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self.column('flag'))
+
+    def rows(self, columns, flags=None, min_severity=None):
+        """{column: values} for the rows with one of the given flags and at least min_severity"""
+        mask = np.ones(len(self), dtype=bool)
+        if flags is not None:
+            codes = [i for i, name in enumerate(self.column('flag_names').tolist()) if name in flags]
+            mask &= np.isin(self.column('flag'), codes)
+        if min_severity is not None:
+            mask &= self.column('severity') >= SEVERITIES.index(min_severity)
+        return {name: self.column(name)[mask] for name in columns}
+
+    def fraud_flags(self):
+        """{entity name: [flags]} as in the results JSON"""
+        names = self.column('entity_names')
+        flag_names = self.column('flag_names').tolist()
+        flags = {}
+        for entity, flag in zip(self.column('entity').tolist(), self.column('flag').tolist()):
+            flags.setdefault(str(names[entity]), []).append(flag_names[flag])
+        return flags
+
+    def risk_scores(self):
+        """{node ID: risk} as in the results JSON"""
+        return dict(zip(self.column('risk_node_ids').tolist(), self.column('risk_scores').tolist()))
+
+def open_flag_table(results_file):
+    """FlagTable written alongside results_file, or None if missing or older than the JSON"""
+    _, flags_path = results_paths(results_file)
+    if not os.path.exists(flags_path):
+        return None
+    if os.path.exists(results_file) and os.path.getmtime(results_file) > os.path.getmtime(flags_path):
+        return None
+    return FlagTable(flags_path)
+
+def load_results(results_file, detectors=()):
+    """
+    Results dict shaped like the results JSON, read from the columnar output when it is fresh:
+    only the findings of the given detectors are parsed (other lines are skipped) and only the
+    flag and risk columns are loaded. 'finding_counts' and 'type_counts' cover every detector
+    Falls back to the full results JSON when there is no up-to-date flag table
+    """
+    table = open_flag_table(results_file)
+    if table is None:
+        with open(results_file, 'r') as f:
+            results = json.load(f)
+        results['finding_counts'], results['type_counts'] = finding_counts(results['findings'])
+        return results
+
+    findings_path, _ = results_paths(results_file)
+    results = dict(table.meta)  # summary, finding/type counts, risk propagation, entity aliases
+    results['findings'] = read_findings(findings_path, detectors)
+    results['fraud_flags'] = table.fraud_flags()
+    results['risk_scores'] = table.risk_scores()
+    return results
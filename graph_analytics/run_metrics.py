@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Run Metrics for Fraud Detection
+Per-stage wall time and peak memory measurement, plus a local JSON-lines metrics sink
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+@contextmanager
+def measure_stage(metrics, trace_memory=True):
+    """
+    Record 'seconds' (and 'peak_mb' when trace_memory) of the enclosed block into metrics
+    Memory is only traced if nothing else is tracing already, so nested stages report time only
+    """
+    traced = trace_memory and not tracemalloc.is_tracing()
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics['seconds'] = round(time.perf_counter() - start, 6)
+        if traced:
+            metrics['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 3)
+            tracemalloc.stop()
+
+def iter_stage_metrics(metrics):
+    """Flatten a run's metrics section into (stage, values) pairs, detectors as 'detector:<key>'"""
+    for stage, values in metrics.items():
+        if stage == 'detectors':
+            for key, detector_values in values.items():
+                yield f'detector:{key}', detector_values
+        elif isinstance(values, dict):
+            yield stage, values
+
+class JsonlMetricsSink:
+    """
+    Metrics hook that appends one JSON line per stage to a local file
+    Each line carries the timestamp and run labels, so the file can be tailed or bulk-loaded
+    """
+
+    def __init__(self, path, **labels):
+        self.path = path
+        self.labels = labels
+
+    def __call__(self, metrics):
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with open(self.path, 'a') as f:
+            for stage, values in iter_stage_metrics(metrics):
+                record = {'timestamp': timestamp, **self.labels, 'stage': stage, **values}
+                f.write(json.dumps(record) + '\n')
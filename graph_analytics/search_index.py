@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Inverted Trigram Index for Entity Search
+Indexes normalized names, plates and IDs once so prefix, substring and fuzzy lookups
+touch only the posting lists of the query's trigrams instead of every node
+"""
+
+import re
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+from graph_index import AdjacencyIndex
+from graph_store import NodeSequence
+
+PAGE_SIZE = 20
+FUZZY_MIN_SCORE = 0.5  # Share of the query's trigrams a fuzzy match must contain
+FUZZY_MIN_LENGTH = 4  # Shorter queries match too much to rank fuzzily
+QUERY_CACHE_SIZE = 256
+
+# Match tiers, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+TIER_NAMES = ('exact', 'prefix', 'word prefix', 'substring', 'similar')
+
+_NON_ALNUM = re.compile(r'[^0-9A-Z]+')
+
+def normalize(text):
+    """Upper-case, punctuation to spaces, whitespace collapsed: 'James K. Clarke' -> 'JAMES K CLARKE'"""
+    return ' '.join(_NON_ALNUM.sub(' ', str(text).upper()).split())
+
+def trigrams(text):
+    """Distinct trigrams of text padded with one space on each side"""
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def node_label(node):
+    """Display label of a node: the person's name, else the info string (plate, accident)"""
+    info = node.get('info', '')
+    if isinstance(info, dict) and 'name' in info:
+        return info['name']
+    return str(info)
+
+class EntitySearchIndex:
+    """
+    Trigram postings over normalized labels and node IDs plus a per-node adjacency lookup
+    search() ranks exact > prefix > word prefix > substring > fuzzy matches and pages the results
+    """
+
+    def __init__(self, nodes, edges, adjacency=None):
+        self.nodes = nodes
+        self.edges = edges
+        self.labels = []
+        self.keys = []
+        self.node_ids = []
+        postings = {}
+
+        for position, node in enumerate(nodes):
+            label = node_label(node)
+            normalized = normalize(label)
+            self.labels.append(label)
+            self.keys.append(f"{normalized}|{node['id']}")
+            self.node_ids.append(node['id'])
+            for gram in trigrams(normalized) | trigrams(node['id']):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('i')
+                posting.append(position)
+
+        self.postings = postings
+        if adjacency is not None:
+            self.adjacency = adjacency
+        elif isinstance(nodes, NodeSequence) and edges is nodes.store.edges:
+            self.adjacency = AdjacencyIndex.from_snapshot(nodes.store)
+        else:
+            self.adjacency = AdjacencyIndex.from_records(nodes, edges)
+        self._ranked = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._rank)
+
+    def _candidates(self, query):
+        """Positions whose key contains query (a superset for short queries is filtered later)"""
+        if len(query) < 3:
+            # Every occurrence of a short query lies inside some indexed trigram containing it
+            candidates = set()
+            for gram, posting in self.postings.items():
+                if query in gram:
+                    candidates.update(posting)
+            return candidates
+
+        grams = sorted((query[i:i + 3] for i in range(len(query) - 2)),
+                       key=lambda gram: len(self.postings.get(gram, ())))
+        if grams[0] not in self.postings:
+            return set()
+        candidates = set(self.postings[grams[0]])
+        for gram in grams[1:]:
+            candidates.intersection_update(self.postings.get(gram, ()))
+            if not candidates:
+                break
+        return candidates
+
+    def _fuzzy(self, query, exclude):
+        """(share of query trigrams found, position) for keys sharing enough trigrams with the query"""
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+        matches = []
+        for position, count in shared.items():
+            if position in exclude:
+                continue
+            score = count / len(query_grams)
+            if score >= FUZZY_MIN_SCORE:
+                matches.append((score, position))
+        return matches
+
+    def _tier(self, query, position):
+        label, node_id = self.keys[position].rsplit('|', 1)
+        if label == query or node_id == query:
+            return EXACT
+        if label.startswith(query):
+            return PREFIX
+        if f' {query}' in f' {label}':
+            return WORD_PREFIX
+        return SUBSTRING
+
+    def _rank(self, query, fuzzy):
+        matches = [position for position in self._candidates(query) if query in self.keys[position]]
+        ranked = sorted(((self._tier(query, position), 0.0, self.labels[position], position)
+                         for position in matches),
+                        key=lambda item: (item[0], item[2], self.node_ids[item[3]]))
+        if fuzzy and len(query) >= FUZZY_MIN_LENGTH:
+            similar = self._fuzzy(query, set(matches))
+            similar.sort(key=lambda item: (-item[0], self.labels[item[1]], self.node_ids[item[1]]))
+            ranked.extend((FUZZY, score, self.labels[position], position) for score, position in similar)
+        return tuple((position, tier, score) for tier, score, _, position in ranked)
+
+    def search(self, query, page=1, page_size=PAGE_SIZE, fuzzy=True):
+        """
+        Ranked matches for a query, one page at a time
+        Returns (total matches, [(node, match tier, fuzzy score)]) for the requested 1-based page
+        """
+        query = normalize(query)
+        if not query:
+            return 0, []
+        ranked = self._ranked(query, fuzzy)
+        start = max(int(page) - 1, 0) * page_size
+        return len(ranked), [(self.nodes[position], tier, score)
+                             for position, tier, score in ranked[start:start + page_size]]
+
+    def out_edges(self, node_id):
+        """Edges leaving node_id, in edge-list order"""
+        return [self.edges[edge_index] for edge_index, _ in self.adjacency.out_edges(node_id)]
+
+    def in_edges(self, node_id):
+        """Edges entering node_id, in edge-list order"""
+        return [self.edges[edge_index] for edge_index, _ in self.adjacency.in_edges(node_id)]
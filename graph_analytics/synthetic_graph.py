@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Synthetic Insurance Claim Graph Generator
+Streams graphs in the nodesSource/edgesSource format at any scale, with injected fraud rings
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+FIRST_NAMES = [
+    'AALIYAH', 'ADDISON', 'ANNA', 'AVA', 'BENJAMIN', 'CADENCE', 'CAMILA', 'CHARLOTTE', 'CHLOE',
+    'CHRISTOPHER', 'DANIEL', 'DAVID', 'ELIJAH', 'ELLA', 'EMILY', 'EMMA', 'ETHAN', 'EVELYN',
+    'GABRIEL', 'GIANNA', 'GRACE', 'HANNAH', 'HARPER', 'ISABELLA', 'JACKSON', 'JAMES', 'JAYDEN',
+    'JOHN', 'JOSEPH', 'JULIAN', 'KAELYN', 'LAUREN', 'LEAH', 'LIAM', 'LILY', 'LOGAN', 'LUCAS',
+    'LUNA', 'MADISON', 'MARIA', 'MATTHEW', 'MAYA', 'MIA', 'MICHAEL', 'NATALIE', 'NOAH', 'OLIVIA',
+    'OWEN', 'RILEY', 'SAMUEL', 'SARAH', 'SCARLETT', 'SEBASTIAN', 'SOFIA', 'SOPHIA', 'VICTORIA',
+    'WILLIAM', 'WYATT', 'ZOE', 'ZOEY',
+]
+
+# Surnames are two syllables, giving len(FIRST_NAMES) * 26 * len(SURNAME_SYLLABLES)**2 unique names
+SURNAME_SYLLABLES = [
+    'AB', 'AL', 'AN', 'AR', 'BAR', 'BEL', 'BER', 'BRI', 'CAR', 'CAS', 'COL', 'COR', 'DAL', 'DAN',
+    'DEN', 'DOR', 'ED', 'EL', 'EM', 'FAR', 'FER', 'FIN', 'FOR', 'GAR', 'GIL', 'GOR', 'HAL', 'HAR',
+    'HEN', 'HOL', 'IN', 'IS', 'JAR', 'JEN', 'KEL', 'KEN', 'KIR', 'LAN', 'LEE', 'LIN', 'LOW', 'MAR',
+    'MEL', 'MOR', 'NEL', 'NOR', 'OL', 'OR', 'PAR', 'PER', 'POT', 'RAM', 'RED', 'RIC', 'ROS', 'SAN',
+    'SEL', 'SON', 'STA', 'TAL', 'TAY', 'TER', 'TON', 'TOR', 'VAL', 'VAN', 'VER', 'WAL', 'WAR', 'WEL',
+    'WIL', 'WIN', 'WOOD', 'YAR', 'YOR', 'ZAN', 'LER', 'MAN', 'STON', 'TEN',
+]
+
+START_DATE = date(2021, 1, 1)
+SPAN_DAYS = 3 * 365  # Accident dates are spread over this many days
+NODES_PER_ACCIDENT = 25  # Rough average, used to spread dates evenly for a target size
+
+RING_SIZE = (4, 8)  # Members per fraud ring
+RING_ACCIDENTS = (3, 6)  # Staged accidents per ring
+RING_SPAN_DAYS = 60  # A ring stages all its accidents within this many days
+
+_SCRAMBLE = 7919  # Prime multiplier; coprime to the name/plate spaces so i -> i * 7919 % space is a bijection
+
+class _UniqueNames:
+    """Unique 'FIRST M. SURNAME' names and 'AB 1234' plates, scrambled so neighbors look unrelated"""
+
+    def __init__(self, seed):
+        self.name_space = len(FIRST_NAMES) * 26 * len(SURNAME_SYLLABLES) ** 2
+        self.plate_space = 26 * 26 * 10000
+        offset = random.Random(seed)
+        self.name_offset = offset.randrange(self.name_space)
+        self.plate_offset = offset.randrange(self.plate_space)
+        self.names_used = 0
+        self.plates_used = 0
+
+    def person(self):
+        if self.names_used >= self.name_space:
+            raise ValueError(f"More than {self.name_space} people requested; the name space is exhausted")
+        i = (self.names_used * _SCRAMBLE + self.name_offset) % self.name_space
+        self.names_used += 1
+        i, first = divmod(i, len(FIRST_NAMES))
+        i, middle = divmod(i, 26)
+        i, second = divmod(i, len(SURNAME_SYLLABLES))
+        surname = SURNAME_SYLLABLES[i] + SURNAME_SYLLABLES[second]
+        return f"{FIRST_NAMES[first]} {chr(ord('A') + middle)}. {surname}"
+
+    def plate(self):
+        if self.plates_used >= self.plate_space:
+            raise ValueError(f"More than {self.plate_space} cars requested; the plate space is exhausted")
+        i = (self.plates_used * _SCRAMBLE + self.plate_offset) % self.plate_space
+        self.plates_used += 1
+        letters, digits = divmod(i, 10000)
+        first, second = divmod(letters, 26)
+        return f"{chr(ord('A') + first)}{chr(ord('A') + second)} {digits:04d}"
+
+class _OpenNode:
+    """A node whose dates and roles are still accumulating; written once it is closed"""
+
+    def __init__(self, node_id, node_type, name, role=None):
+        self.id = node_id
+        self.type = node_type
+        self.name = name
+        self.role = role
+        self.roles = []
+        self.days = []
+
+class _GraphWriter:
+    """Writes nodes straight to the output file and buffers edges in a temporary file"""
+
+    def __init__(self, path):
+        self.f = open(path, 'w')
+        directory = os.path.dirname(os.path.abspath(path))
+        self.edge_file = tempfile.TemporaryFile('w+', dir=directory)
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.f.write('{\n  nodesSource: [\n')
+
+    def node(self, node_id, node_type, enter, exit, info):
+        if isinstance(info, dict):
+            info_text = '{ ' + ', '.join(f"{k}: '{v}'" for k, v in info.items()) + ' }'
+        else:
+            info_text = f"'{info}'"
+        enter_text = ', '.join(f"'{d}'" for d in enter)
+        exit_text = ', '.join(f"'{d}'" for d in exit)
+        if self.num_nodes:
+            self.f.write(',\n')
+        self.f.write(f"    {{\n      id: {node_id},\n      type: '{node_type}',\n"
+                     f"      enter: [{enter_text}],\n      exit: [{exit_text}],\n"
+                     f"      info: {info_text}\n    }}")
+        self.num_nodes += 1
+
+    def edge(self, source, target, edge_type):
+        if self.num_edges:
+            self.edge_file.write(',\n')
+        self.edge_file.write(f"    {{ from: {source}, to: {target}, type: '{edge_type}' }}")
+        self.num_edges += 1
+
+    def close(self):
+        self.f.write('\n  ],\n  edgesSource: [\n')
+        self.edge_file.seek(0)
+        shutil.copyfileobj(self.edge_file, self.f)
+        self.edge_file.close()
+        self.f.write('\n  ]\n}\n')
+        self.f.close()
+
+class SyntheticGraphGenerator:
+    """
+    Streams a claim graph of roughly num_nodes nodes with the same shape as the sample data:
+    accidents with cars, drivers, passengers and witnesses, plus lawyers and doctors drawn from
+    a rolling pool. Fraud rings reuse one plate, a fixed crew with switching roles, and their
+    own lawyer and doctor across several accidents a few weeks apart
+    """
+
+    def __init__(self, num_nodes, num_rings=None, seed=0, professional_pool=40):
+        self.num_nodes = num_nodes
+        self.num_rings = max(1, num_nodes // 5000) if num_rings is None else num_rings
+        self.professional_pool = professional_pool
+        self.rng = random.Random(seed)
+        self.names = _UniqueNames(seed)
+
+    def _new_id(self):
+        node_id = self.next_id
+        self.next_id += 1
+        return node_id
+
+    def _day(self, day):
+        return (START_DATE + timedelta(days=day)).isoformat()
+
+    def _close(self, node):
+        """Write an accumulated person node; roles are comma-joined like the sample data"""
+        days = [self._day(d) for d in node.days]
+        role = node.role or ','.join(node.roles)
+        self.writer.node(node.id, node.type, days, days, {'name': node.name, 'role': role})
+
+    def _person(self, node_type, day, role):
+        node_id = self._new_id()
+        d = self._day(day)
+        self.writer.node(node_id, node_type, [d], [d], {'name': self.names.person(), 'role': role})
+        return node_id
+
+    def _professional(self, pool, node_type, day):
+        """Pick from a rolling pool; retired professionals are written with all their dates"""
+        if len(pool) < self.professional_pool or self.rng.random() < 0.3:
+            node = _OpenNode(self._new_id(), node_type, self.names.person(), role=node_type)
+            pool.append(node)
+            if len(pool) > self.professional_pool:
+                self._close(pool.pop(0))
+        else:
+            node = self.rng.choice(pool)
+        node.days.append(day)
+        return node.id
+
+    def _accident_node(self, day):
+        node_id = self._new_id()
+        self.accidents += 1
+        self.writer.node(node_id, 'Accident', [self._day(day)],
+                         [self._day(day + self.rng.randint(0, 40))], f'Accident {self.accidents}')
+        return node_id
+
+    def _car(self, accident_id, day, plate=None):
+        car_id = self._new_id()
+        self.writer.node(car_id, 'Car', [self._day(day)], [self._day(day + self.rng.randint(0, 10))],
+                         plate or self.names.plate())
+        self.writer.edge(car_id, accident_id, 'involves')
+        return car_id
+
+    def _represent_and_heal(self, person_id, day):
+        if self.rng.random() < 0.75:
+            self.writer.edge(self._professional(self.lawyers, 'Lawyer', day), person_id, 'represents')
+        if self.rng.random() < 0.2:
+            self.writer.edge(self._professional(self.doctors, 'Doctor', day), person_id, 'heals')
+
+    def _normal_accident(self, day):
+        accident_id = self._accident_node(day)
+        for _ in range(self.rng.randint(2, 4)):
+            car_id = self._car(accident_id, day)
+            driver_id = self._person('Participant', day, 'Driver')
+            self.writer.edge(driver_id, car_id, 'drives')
+            self._represent_and_heal(driver_id, day)
+            for _ in range(self.rng.choice((0, 1, 2, 3, 4))):
+                passenger_id = self._person('Participant', day, 'Passenger')
+                self.writer.edge(passenger_id, car_id, 'isPassenger')
+                self._represent_and_heal(passenger_id, day)
+        for _ in range(self.rng.randint(2, 6)):
+            witness_id = self._person('Participant', day, 'Witness')
+            self.writer.edge(witness_id, accident_id, 'witnesses')
+
+    def _new_ring(self, ring_number, start_day):
+        members = [_OpenNode(self._new_id(), 'Participant', self.names.person())
+                   for _ in range(self.rng.randint(*RING_SIZE))]
+        ring = {
+            'ring': ring_number,
+            'plate': self.names.plate(),
+            'members': members,
+            'lawyer': _OpenNode(self._new_id(), 'Lawyer', self.names.person(), role='Lawyer'),
+            'doctor': _OpenNode(self._new_id(), 'Doctor', self.names.person(), role='Doctor'),
+            'accident_ids': [],
+        }
+        staged = sorted(self.rng.sample(range(RING_SPAN_DAYS), self.rng.randint(*RING_ACCIDENTS)))
+        return ring, [start_day + offset for offset in staged]
+
+    def _staged_accident(self, ring, day, stages_left):
+        """Ring members swap driver/passenger seats in the ring car; the ring's lawyer and doctor take every claim"""
+        accident_id = self._accident_node(day)
+        ring['accident_ids'].append(accident_id)
+        car_id = self._car(accident_id, day, plate=ring['plate'])
+
+        # Members not seen yet take seats first, so every member is in at least one accident
+        unused = [member for member in ring['members'] if not member.days]
+        seats = max(self.rng.randint(2, 4), -(-len(unused) // stages_left))
+        crew = unused[:seats]
+        crew += self.rng.sample([m for m in ring['members'] if m not in crew], seats - len(crew))
+        self.rng.shuffle(crew)
+        for seat, member in enumerate(crew):
+            role = 'Driver' if seat == 0 else 'Passenger'
+            member.roles.append(role)
+            member.days.append(day)
+            self.writer.edge(member.id, car_id, 'drives' if seat == 0 else 'isPassenger')
+            self.writer.edge(ring['lawyer'].id, member.id, 'represents')
+            self.writer.edge(ring['doctor'].id, member.id, 'heals')
+        ring['lawyer'].days.append(day)
+        ring['doctor'].days.append(day)
+
+        # An innocent second car keeps staged accidents from looking isolated
+        other_car = self._car(accident_id, day)
+        driver_id = self._person('Participant', day, 'Driver')
+        self.writer.edge(driver_id, other_car, 'drives')
+        self._represent_and_heal(driver_id, day)
+
+    def _finish_ring(self, ring):
+        for node in ring['members'] + [ring['lawyer'], ring['doctor']]:
+            self._close(node)
+        return {
+            'ring': ring['ring'],
+            'members': [member.name for member in ring['members']],
+            'plate': ring['plate'],
+            'lawyer': ring['lawyer'].name,
+            'doctor': ring['doctor'].name,
+            'accident_ids': ring['accident_ids'],
+        }
+
+    def write(self, path):
+        """Write the graph to path; returns a summary with the injected rings as ground truth"""
+        self.writer = _GraphWriter(path)
+        self.next_id = 0
+        self.accidents = 0
+        self.lawyers = []
+        self.doctors = []
+
+        expected_accidents = max(1, self.num_nodes // NODES_PER_ACCIDENT)
+        ring_starts = sorted(self.rng.randrange(SPAN_DAYS - RING_SPAN_DAYS) for _ in range(self.num_rings))
+
+        staged = []  # Heap of (day, ring number, stage index)
+        rings = {}
+        remaining_stages = {}
+        truth = []
+
+        def run_staged(until_day):
+            while staged and staged[0][0] <= until_day:
+                day, ring_number, _ = heapq.heappop(staged)
+                self._staged_accident(rings[ring_number], day, remaining_stages[ring_number])
+                remaining_stages[ring_number] -= 1
+                if remaining_stages[ring_number] == 0:
+                    truth.append(self._finish_ring(rings.pop(ring_number)))
+
+        next_ring = 0
+        i = 0
+        while self.next_id < self.num_nodes:
+            day = min(i * SPAN_DAYS // expected_accidents, SPAN_DAYS - 1) if i < expected_accidents \
+                else self.rng.randrange(SPAN_DAYS)
+            while next_ring < len(ring_starts) and ring_starts[next_ring] <= day:
+                ring, days = self._new_ring(next_ring, ring_starts[next_ring])
+                rings[next_ring] = ring
+                remaining_stages[next_ring] = len(days)
+                for stage, staged_day in enumerate(days):
+                    heapq.heappush(staged, (staged_day, next_ring, stage))
+                next_ring += 1
+            run_staged(day)
+            self._normal_accident(day)
+            i += 1
+
+        # Rings not started yet still get all their accidents, so the requested ring count holds
+        while next_ring < len(ring_starts):
+            ring, days = self._new_ring(next_ring, ring_starts[next_ring])
+            rings[next_ring] = ring
+            remaining_stages[next_ring] = len(days)
+            for stage, staged_day in enumerate(days):
+                heapq.heappush(staged, (staged_day, next_ring, stage))
+            next_ring += 1
+        run_staged(float('inf'))
+
+        for node in self.lawyers + self.doctors:
+            self._close(node)
+        self.writer.close()
+
+        return {
+            'nodes': self.writer.num_nodes,
+            'edges': self.writer.num_edges,
+            'accidents': self.accidents,
+            'rings': sorted(truth, key=lambda ring: ring['ring']),
+        }
+
+def generate_graph_file(path, num_nodes, num_rings=None, seed=0):
+    """Write a synthetic graph of about num_nodes nodes to path and return its summary"""
+    return SyntheticGraphGenerator(num_nodes, num_rings=num_rings, seed=seed).write(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic insurance claim graph")
+    parser.add_argument('output', help="path of the data file to write")
+    parser.add_argument('--nodes', type=int, default=10000, help="approximate number of nodes")
+    parser.add_argument('--rings', type=int, default=None,
+                        help="fraud rings to inject (default: one per 5,000 nodes)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--truth', default=None,
+                        help="also write the injected rings as JSON to this path")
+    args = parser.parse_args()
+
+    summary = generate_graph_file(args.output, args.nodes, num_rings=args.rings, seed=args.seed)
+    print(f"Wrote {summary['nodes']} nodes, {summary['edges']} edges, {summary['accidents']} accidents "
+          f"and {len(summary['rings'])} fraud ring(s) to {args.output}")
+
+    if args.truth:
+        with open(args.truth, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
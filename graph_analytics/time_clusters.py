@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Vectorized Time-Cluster Engine
+Holds every person's accident dates as one grouped int array of day ordinals and
+counts accidents per sliding window with sorted-array searchsorted sweeps
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_WINDOWS = (7, 30, 90)
+
+_day_cache = {}
+
+def parse_day(date_str):
+    """'%Y-%m-%d' string -> day ordinal (None if unparseable); each distinct string is parsed once"""
+    day = _day_cache.get(date_str)
+    if day is None and date_str not in _day_cache:
+        try:
+            day = datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+        except (TypeError, ValueError):
+            day = None
+        _day_cache[date_str] = day
+    return day
+
+class TimeClusterEngine:
+    """
+    Accident dates of all people, sorted and grouped per person
+    Group g occupies days[offsets[g]:offsets[g + 1]]
+    """
+
+    def __init__(self, names, group_ids, days):
+        self.names = list(names)
+        group_ids = np.asarray(group_ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+
+        order = np.lexsort((days, group_ids))
+        self.group_ids = group_ids[order]
+        self.days = days[order]
+        self.offsets = np.zeros(len(self.names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.group_ids, minlength=len(self.names)), out=self.offsets[1:])
+
+    @classmethod
+    def from_person_nodes(cls, person_to_nodes, node_type='Participant'):
+        """Collect the enter dates of each person's nodes of the given type"""
+        names = []
+        group_ids = []
+        days = []
+        for name, node_list in person_to_nodes.items():
+            group = len(names)
+            names.append(name)
+            for node in node_list:
+                if node['type'] != node_type:
+                    continue
+                for date_str in node.get('enter', []):
+                    day = parse_day(date_str)
+                    if day is not None:
+                        group_ids.append(group)
+                        days.append(day)
+        return cls(names, group_ids, days)
+
+    def window_counts(self, days_window):
+        """
+        For each date, the number of the same person's dates in [date, date + days_window]
+        (the date itself included); groups are kept apart by offsetting keys per person
+        """
+        if len(self.days) == 0:
+            return np.zeros(0, dtype=np.int64)
+        base = self.days.min()
+        span = int(self.days.max() - base) + days_window + 1
+        keys = self.group_ids * span + (self.days - base)
+        ends = np.searchsorted(keys, keys + days_window, side='right')
+        return ends - np.arange(len(keys))
+
+    def evaluate(self, windows=DEFAULT_WINDOWS, min_count=2):
+        """
+        Evaluate several windows in one pass
+        Returns {window: {'max': per-person max count, 'first': per-person count at the
+        earliest date reaching min_count (0 if none)}}
+        """
+        num_groups = len(self.names)
+        non_empty = np.flatnonzero(np.diff(self.offsets) > 0)
+        results = {}
+
+        for days_window in sorted(set(windows)):
+            counts = self.window_counts(days_window)
+
+            max_counts = np.zeros(num_groups, dtype=np.int64)
+            if len(non_empty):
+                max_counts[non_empty] = np.maximum.reduceat(counts, self.offsets[non_empty])
+
+            first_counts = np.zeros(num_groups, dtype=np.int64)
+            hits = np.flatnonzero(counts >= min_count)
+            if len(hits):
+                groups, first = np.unique(self.group_ids[hits], return_index=True)
+                first_counts[groups] = counts[hits[first]]
+
+            results[days_window] = {'max': max_counts, 'first': first_counts}
+
+        return results
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Interval Index and Time-Sliced Graph Views
+Indexes every node's enter/exit intervals in a static centered interval tree, so the nodes and
+edges active in [t0, t1] are found without scanning the graph, and serves each time slice as
+a view over the existing node and edge sequences instead of a copy
+"""
+
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+from graph_store import NodeSequence
+from time_clusters import parse_day
+
+def as_day(value):
+    """Day ordinal of a 'YYYY-MM-DD' string (or of an ordinal, returned as is)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    day = parse_day(value)
+    if day is None:
+        raise ValueError(f"Not a 'YYYY-MM-DD' date: {value!r}")
+    return day
+
+class IntervalTree:
+    """
+    Static centered interval tree over the closed intervals [starts[i], ends[i]]
+    Every tree node keeps the intervals containing its center, sorted by start and by end. A
+    stabbing query follows one root-to-leaf path (O(log n) tree nodes) and takes a prefix of one
+    sorted list per node, found by binary search, so it touches only the k intervals it returns
+    """
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+        # Start order answers "starts inside (t0, t1]" for overlap queries
+        self.start_order = np.argsort(self.starts, kind='stable')
+        self.sorted_starts = self.starts[self.start_order]
+
+        self.center = []
+        self.left = []
+        self.right = []
+        self.by_start = []  # interval IDs containing the center, by ascending start
+        self.start_keys = []
+        self.by_end = []  # the same intervals by descending end
+        self.end_keys = []  # negated ends, ascending
+        self.root = self._build()
+
+    def _build(self):
+        root = -1
+        if not len(self.starts):
+            return root
+        stack = [(np.arange(len(self.starts)), -1, None)]
+        while stack:
+            ids, parent, side = stack.pop()
+            starts, ends = self.starts[ids], self.ends[ids]
+            # Median endpoint: at most half of the intervals lie wholly on either side
+            center = int(np.median(np.concatenate([starts, ends])))
+            left = ends < center
+            right = starts > center
+            inside = ~(left | right)
+
+            node = len(self.center)
+            self.center.append(center)
+            self.left.append(-1)
+            self.right.append(-1)
+            by_start = np.argsort(starts[inside], kind='stable')
+            self.by_start.append(ids[inside][by_start])
+            self.start_keys.append(starts[inside][by_start])
+            by_end = np.argsort(-ends[inside], kind='stable')
+            self.by_end.append(ids[inside][by_end])
+            self.end_keys.append(-ends[inside][by_end])
+
+            if parent == -1:
+                root = node
+            else:
+                (self.left if side == 'left' else self.right)[parent] = node
+            if left.any():
+                stack.append((ids[left], node, 'left'))
+            if right.any():
+                stack.append((ids[right], node, 'right'))
+        return root
+
+    def stab(self, day):
+        """IDs of the intervals containing day"""
+        found = [np.zeros(0, dtype=np.int64)]
+        node = self.root
+        while node != -1:
+            center = self.center[node]
+            if day < center:  # Every interval here ends at or after center > day
+                found.append(self.by_start[node][:np.searchsorted(self.start_keys[node], day, 'right')])
+                node = self.left[node]
+            elif day > center:  # Every interval here starts at or before center < day
+                found.append(self.by_end[node][:np.searchsorted(self.end_keys[node], -day, 'right')])
+                node = self.right[node]
+            else:
+                found.append(self.by_start[node])
+                break
+        return np.concatenate(found)
+
+    def overlapping(self, start, end):
+        """IDs of the intervals overlapping [start, end]: those containing start plus those starting after it"""
+        later = self.start_order[np.searchsorted(self.sorted_starts, start, 'right'):
+                                 np.searchsorted(self.sorted_starts, end, 'right')]
+        return np.concatenate([self.stab(start), later])
+
+class TimeIndex:
+    """
+    Active periods of a graph's nodes (one interval per enter/exit pair) plus the edges by
+    source node, so the nodes and edges active in a period are found in time proportional to
+    the answer. An edge is active when both its endpoints are. Nodes without dates are never
+    active. Positions index the node and edge sequences the index was built from
+    """
+
+    def __init__(self, owners, starts, ends, node_ids, edge_from, edge_to):
+        """owners: node position of each interval; edge_from/edge_to: node positions (-1 if unknown)"""
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.tree = IntervalTree(starts, ends)
+        self.node_ids = np.asarray(node_ids)
+        self.first_day = int(self.tree.starts.min()) if len(self.owners) else None
+        self.last_day = int(self.tree.ends.max()) if len(self.owners) else None
+
+        # Edges grouped by source position (CSR), with each edge's target position
+        edge_from = np.asarray(edge_from, dtype=np.int64)
+        self.edge_to = np.asarray(edge_to, dtype=np.int64)
+        known = np.flatnonzero((edge_from >= 0) & (self.edge_to >= 0))
+        self.out_edges = known[np.argsort(edge_from[known], kind='stable')]
+        self.out_offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edge_from[known], minlength=len(self.node_ids)), out=self.out_offsets[1:])
+
+    @staticmethod
+    def _intervals(enter_days, exit_days):
+        """(start, end) per enter/exit pair; a missing exit makes a one-day interval"""
+        for i, start in enumerate(enter_days):
+            end = exit_days[i] if i < len(exit_days) else start
+            yield min(start, end), max(start, end)
+
+    @classmethod
+    def from_records(cls, nodes, edges):
+        """Build from node/edge dicts (as produced by graph_loader)"""
+        owners, starts, ends = [], [], []
+        position = {}
+        for i, node in enumerate(nodes):
+            position[node['id']] = i
+            enter_days = [day for day in map(parse_day, node.get('enter', [])) if day is not None]
+            exit_days = [day for day in map(parse_day, node.get('exit', [])) if day is not None]
+            for start, end in cls._intervals(enter_days, exit_days):
+                owners.append(i)
+                starts.append(start)
+                ends.append(end)
+        return cls(owners, starts, ends, [node['id'] for node in nodes],
+                   [position.get(edge['from'], -1) for edge in edges],
+                   [position.get(edge['to'], -1) for edge in edges])
+
+    @classmethod
+    def from_store(cls, store):
+        """Build from a GraphStore's day-ordinal date columns, without touching node views"""
+        enter_counts = np.diff(store.enter_offsets)
+        exit_counts = np.diff(store.exit_offsets)
+        owners = np.repeat(np.arange(len(enter_counts)), enter_counts)
+        rank = np.arange(len(owners)) - np.repeat(store.enter_offsets[:-1], enter_counts)
+        starts = np.asarray(store.enter_days, dtype=np.int64)
+        has_exit = rank < exit_counts[owners]
+        ends = starts.copy()
+        ends[has_exit] = store.exit_days[store.exit_offsets[owners[has_exit]] + rank[has_exit]]
+
+        def positions(ids):
+            found = np.searchsorted(store.sorted_ids, ids)
+            found = np.minimum(found, len(store.sorted_ids) - 1)
+            return np.where(store.sorted_ids[found] == ids, store.id_order[found], -1)
+
+        return cls(owners, np.minimum(starts, ends), np.maximum(starts, ends), store.node_id,
+                   positions(store.edge_from), positions(store.edge_to))
+
+    @classmethod
+    def for_graph(cls, nodes, edges):
+        """Index for a graph from graph_loader, using the columns directly when it is compact"""
+        if isinstance(nodes, NodeSequence) and edges is nodes.store.edges:
+            return cls.from_store(nodes.store)
+        return cls.from_records(nodes, edges)
+
+    def _period(self, start, end):
+        start = self.first_day if start is None else as_day(start)
+        end = self.last_day if end is None else as_day(end)
+        return start, end
+
+    def active_nodes(self, start=None, end=None):
+        """Sorted positions of the nodes active at some day in [start, end] (dates or ordinals)"""
+        start, end = self._period(start, end)
+        if self.first_day is None or end < start:
+            return np.zeros(0, dtype=np.int64)
+        return np.unique(self.owners[self.tree.overlapping(start, end)])
+
+    def active_edges(self, start=None, end=None, nodes=None):
+        """Sorted positions of the edges whose endpoints are both active in [start, end]"""
+        if nodes is None:
+            nodes = self.active_nodes(start, end)
+        counts = self.out_offsets[nodes + 1] - self.out_offsets[nodes]
+        # Concatenated out-edge ranges of the active nodes: each range's start plus a running rank
+        run_starts = np.repeat(self.out_offsets[nodes] - (np.cumsum(counts) - counts), counts)
+        candidates = self.out_edges[run_starts + np.arange(counts.sum())]
+        return np.sort(candidates[np.isin(self.edge_to[candidates], nodes)])
+
+    def slice(self, nodes, edges, start=None, end=None):
+        """TimeSlice of the given node/edge sequences (the ones this index was built from)"""
+        return TimeSlice(self, nodes, edges, *self._period(start, end))
+
+class SliceSequence(Sequence):
+    """The items of a base sequence at the given positions, fetched on access (nothing is copied)"""
+
+    def __init__(self, base, positions):
+        self.base = base
+        self.positions = positions
+        self._list = positions.tolist()
+
+    def __len__(self):
+        return len(self._list)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.base[j] for j in self._list[i]]
+        return self.base[self._list[i]]
+
+    def __iter__(self):
+        base = self.base
+        for position in self._list:
+            yield base[position]
+
+class TimeSlice:
+    """
+    Subgraph active in [start, end] (day ordinals): `nodes` and `edges` are views that detectors,
+    layouts and the explorer iterate like the full sequences. Nodes keep their full date lists
+    """
+
+    def __init__(self, index, nodes, edges, start, end):
+        self.start = start
+        self.end = end
+        node_positions = index.active_nodes(start, end)
+        self.node_ids = index.node_ids[node_positions]
+        self.nodes = SliceSequence(nodes, node_positions)
+        self.edges = SliceSequence(edges, index.active_edges(start, end, node_positions))
+
+    @property
+    def period(self):
+        """('YYYY-MM-DD', 'YYYY-MM-DD') bounds of the slice"""
+        return date.fromordinal(self.start).isoformat(), date.fromordinal(self.end).isoformat()
@@ -4,30 +4,30 @@ Graph Visualization for Insurance Fraud Detection
 Creates visual representations of the insurance claim network
 """
 
-import json
-import re
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import networkx as nx
+import numpy as np
 from collections import defaultdict
 
-def parse_js_object_file(filepath):
-    """Parse JavaScript object notation file to Python dict"""
-    with open(filepath, 'r') as f:
-        content = f.read()
+from entity_resolution import expand_aliases
+from graph_layout import force_directed_layout, graph_layout
+from graph_loader import load_graph
+from graph_raster import EDGE_COLORS, NODE_COLORS, GraphRasterizer, palette
+from results_store import load_results
 
-    # Convert JavaScript object notation to valid JSON
-    content = re.sub(r"(\w+):", r'"\1":', content)
-    content = content.replace("'", '"')
-    data = json.loads(content)
-    return data
+RASTER_MIN_NODES = 5000  # Larger full-graph images are rasterized instead of drawn artist by artist
 
-def create_full_graph_visualization(nodes, edges, fraud_flags, output_file='graph_full.png'):
+def create_full_graph_visualization(nodes, edges, fraud_flags, output_file='graph_full.png', renderer='auto'):
     """
     Create a complete graph visualization with all nodes and edges
+    renderer: 'artists' (matplotlib per node/edge), 'raster', or 'auto' (raster above RASTER_MIN_NODES)
     """
     print(f"Creating full graph visualization with {len(nodes)} nodes and {len(edges)} edges...")
 
+    if renderer == 'raster' or (renderer == 'auto' and len(nodes) > RASTER_MIN_NODES):
+        return create_raster_graph_visualization(nodes, edges, fraud_flags, output_file)
+
     # Create directed graph
     G = nx.DiGraph()
 
@@ -98,9 +98,9 @@ def create_full_graph_visualization(nodes, edges, fraud_flags, output_file='grap
             node_colors.append(node_colors_map.get(node_type, '#CCCCCC'))
             node_sizes.append(50)
 
-    # Use spring layout for better visualization
-    print("Calculating layout (this may take a moment for large graphs)...")
-    pos = nx.spring_layout(G, k=0.3, iterations=50, seed=42)
+    # Spring layout, or the multilevel engine for large graphs
+    print("Calculating layout...")
+    pos = graph_layout(G, k=0.3, iterations=50, seed=42)
 
     # Create figure
     fig, ax = plt.subplots(figsize=(20, 16))
@@ -149,6 +149,81 @@ def create_full_graph_visualization(nodes, edges, fraud_flags, output_file='grap
     print(f"Saved full graph visualization to: {output_file}")
     plt.close()
 
+def create_raster_graph_visualization(nodes, edges, fraud_flags, output_file='graph_full.png'):
+    """
+    Full graph as one density image: edges and nodes are binned into a pixel grid (per-type
+    colors, log density shading) with suspicious entities overlaid; matplotlib only composites
+    """
+    node_ids = [node['id'] for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    node_types = list(NODE_COLORS)
+    type_code = {node_type: i for i, node_type in enumerate(node_types)}
+
+    node_codes = np.empty(len(nodes), dtype=np.int64)
+    suspicious = []
+    professionals = []
+    for i, node in enumerate(nodes):
+        node_type = node['type']
+        if node_type not in type_code:
+            type_code[node_type] = len(node_types)
+            node_types.append(node_type)
+        node_codes[i] = type_code[node_type]
+        info = node.get('info')
+        if isinstance(info, dict) and 'name' in info and info['name'] in fraud_flags:
+            if node_type in ['Doctor', 'Lawyer'] and 'SUSPICIOUS_PROFESSIONAL' in fraud_flags[info['name']]:
+                professionals.append(i)
+            else:
+                suspicious.append(i)
+
+    edge_types = list(EDGE_COLORS)
+    edge_code = {edge_type: i for i, edge_type in enumerate(edge_types)}
+    src, dst, edge_codes = [], [], []
+    for edge in edges:
+        if edge['from'] in index and edge['to'] in index:
+            if edge['type'] not in edge_code:
+                edge_code[edge['type']] = len(edge_types)
+                edge_types.append(edge['type'])
+            src.append(index[edge['from']])
+            dst.append(index[edge['to']])
+            edge_codes.append(edge_code[edge['type']])
+
+    print("Calculating layout...")
+    positions = force_directed_layout(node_ids, ((node_ids[a], node_ids[b]) for a, b in zip(src, dst)),
+                                      iterations=50, seed=42)
+    xy = np.array([positions[node_id] for node_id in node_ids])
+
+    print("Rasterizing...")
+    node_palette = palette(node_types, NODE_COLORS)
+    rasterizer = GraphRasterizer(xy)
+    rasterizer.add_edges(src, dst, edge_codes, palette(edge_types, EDGE_COLORS))
+    rasterizer.add_nodes(np.arange(len(nodes)), node_codes, node_palette, radius=1)
+    rasterizer.add_overlay(suspicious, '#FF0000', radius=4)
+    rasterizer.add_overlay(professionals, '#FF0000', radius=7)
+    rasterizer.add_overlay(professionals, node_palette, radius=5, type_codes=node_codes[professionals])
+    image = rasterizer.render()
+
+    fig, ax = plt.subplots(figsize=(20, 16))
+    ax.imshow(image, interpolation='antialiased')
+
+    legend_elements = [mpatches.Patch(color=color, label=node_type) for node_type, color in NODE_COLORS.items()]
+    legend_elements.append(mpatches.Patch(color='#FF0000', label='Suspicious Participant (Red)'))
+    legend_elements.append(mpatches.Patch(facecolor='#FFE66D', edgecolor='#FF0000', linewidth=2,
+                                          label='Suspicious Doctor/Lawyer (red ring)'))
+    legend_elements.extend(mpatches.Patch(color=color, label=f"{edge_type} edge")
+                           for edge_type, color in EDGE_COLORS.items())
+    ax.legend(handles=legend_elements, loc='upper left', fontsize=10)
+
+    plt.title(f'Insurance Claims Network - Full Graph ({len(nodes):,} nodes, {len(src):,} edges)\n'
+              '(Red = Suspicious Participants | Ringed = Suspicious Doctors/Lawyers | Shading = log density)',
+              fontsize=16, fontweight='bold')
+    plt.axis('off')
+    plt.tight_layout()
+
+    plt.savefig(f'/home/user/existing_project/graph_analytics/{output_file}',
+                dpi=200, bbox_inches='tight')
+    print(f"Saved full graph visualization to: {output_file}")
+    plt.close()
+
 def create_fraud_subgraph_visualization(nodes, edges, fraud_flags, output_file='graph_fraud.png'):
     """
     Create a focused visualization showing only fraud-related subgraphs
@@ -247,7 +322,7 @@ def create_fraud_subgraph_visualization(nodes, edges, fraud_flags, output_file='
 
     # Calculate layout
     print("Calculating layout for fraud subgraph...")
-    pos = nx.spring_layout(subgraph, k=0.5, iterations=100, seed=42)
+    pos = graph_layout(subgraph, k=0.5, iterations=100, seed=42)
 
     # Create figure
     fig, ax = plt.subplots(figsize=(24, 20))
@@ -320,38 +395,51 @@ def create_fraud_statistics_chart(fraud_results, output_file='fraud_statistics.p
     """
     print("Creating fraud statistics chart...")
 
-    findings = fraud_results['findings']
+    # Counts per detector (the columnar results carry them without the findings themselves)
+    finding_counts = fraud_results.get('finding_counts')
+    if finding_counts is None:
+        finding_counts = {key: len(items) for key, items in fraud_results['findings'].items()}
 
     # Count findings by type
     categories = []
     counts = []
     colors = []
 
-    if findings['statistical_outliers']:
+    if finding_counts.get('statistical_outliers'):
         categories.append('Statistical\nOutliers')
-        counts.append(len(findings['statistical_outliers']))
+        counts.append(finding_counts['statistical_outliers'])
         colors.append('#FF6B6B')
 
-    if findings['time_patterns']:
+    if finding_counts.get('time_patterns'):
         categories.append('Time-based\nPatterns')
-        counts.append(len(findings['time_patterns']))
+        counts.append(finding_counts['time_patterns'])
         colors.append('#4ECDC4')
 
-    if findings['repeated_cars']:
+    if finding_counts.get('repeated_cars'):
         categories.append('Repeated\nCars')
-        counts.append(len(findings['repeated_cars']))
+        counts.append(finding_counts['repeated_cars'])
         colors.append('#FFE66D')
 
-    if findings['repeated_witnesses']:
+    if finding_counts.get('repeated_witnesses'):
         categories.append('Repeated\nWitnesses')
-        counts.append(len(findings['repeated_witnesses']))
+        counts.append(finding_counts['repeated_witnesses'])
         colors.append('#95E1D3')
 
-    if findings['role_switching']:
+    if finding_counts.get('role_switching'):
         categories.append('Role\nSwitching')
-        counts.append(len(findings['role_switching']))
+        counts.append(finding_counts['role_switching'])
         colors.append('#F38181')
 
+    if finding_counts.get('fraud_rings'):
+        categories.append('Fraud\nRings')
+        counts.append(finding_counts['fraud_rings'])
+        colors.append('#AA96DA')
+
+    if finding_counts.get('co_participation'):
+        categories.append('Co-\nParticipation')
+        counts.append(finding_counts['co_participation'])
+        colors.append('#FFA500')
+
     # Create bar chart
     fig, ax = plt.subplots(figsize=(12, 8))
 
@@ -383,20 +471,20 @@ def main():
 
     # Load data
     print("Loading insurance fraud data...")
-    data = parse_js_object_file('/home/user/existing_project/graph_analytics/insurance-fraud-data.json')
-    nodes = data['nodesSource']
-    edges = data['edgesSource']
+    nodes, edges = load_graph('/home/user/existing_project/graph_analytics/insurance-fraud-data.json')
 
     # Load fraud detection results
     print("Loading fraud detection results...")
-    with open('/home/user/existing_project/graph_analytics/fraud_detection_results.json', 'r') as f:
-        fraud_results = json.load(f)
+    fraud_results = load_results('/home/user/existing_project/graph_analytics/fraud_detection_results.json')
 
     fraud_flags = fraud_results['fraud_flags']
 
     print(f"Loaded {len(nodes)} nodes, {len(edges)} edges, {len(fraud_flags)} suspicious entities")
     print()
 
+    # Flags are keyed by canonical name; resolved runs also list the name variants
+    fraud_flags = expand_aliases(fraud_flags, fraud_results.get('entity_aliases', {}))
+
     # Create visualizations
     create_full_graph_visualization(nodes, edges, fraud_flags)
     print()